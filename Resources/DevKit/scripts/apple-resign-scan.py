@@ -1,18 +1,171 @@
 #!/usr/bin/env python3
 
+import argparse
+import json
 import os
-import subprocess
+import stat
+import struct
 import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Optional
 
+import devkit_profile
+from bundle_manifest import BundleManifest
 
-def scan_binaries(app_path: str) -> list[str]:
-    all_paths: set[str] = set()
-    for root, dirs, files in os.walk(app_path):
-        for d in dirs:
-            if d.endswith(".framework") or d.endswith(".app"):
-                all_paths.add(os.path.join(root, d))
-        for f in files:
-            all_paths.add(os.path.join(root, f))
+# Thin Mach-O headers (32/64-bit) in either byte order, as the first 4 bytes.
+MACHO_THIN_MAGICS = {
+    b"\xfe\xed\xfa\xce",  # MH_MAGIC (big-endian)
+    b"\xce\xfa\xed\xfe",  # MH_CIGAM
+    b"\xfe\xed\xfa\xcf",  # MH_MAGIC_64 (big-endian)
+    b"\xcf\xfa\xed\xfe",  # MH_CIGAM_64
+}
+# Universal binaries; the fat header is big-endian on disk, but accept both.
+MACHO_FAT_MAGICS = {
+    b"\xca\xfe\xba\xbe": ">I",  # FAT_MAGIC
+    b"\xbe\xba\xfe\xca": "<I",  # FAT_CIGAM
+    b"\xca\xfe\xba\xbf": ">I",  # FAT_MAGIC_64
+    b"\xbf\xba\xfe\xca": "<I",  # FAT_CIGAM_64
+}
+# 0xcafebabe is shared with Java class files, where the next word is the
+# class file version; `file` treats small counts as architectures.
+MAX_FAT_ARCHS = 20
+MIN_MACHO_SIZE = 28  # sizeof(struct mach_header)
+
+# Resource types that never hold code; skipped without opening them.
+NON_CODE_EXTENSIONS = {
+    ".car",
+    ".css",
+    ".gif",
+    ".html",
+    ".jpeg",
+    ".jpg",
+    ".json",
+    ".m4a",
+    ".md",
+    ".mov",
+    ".mp3",
+    ".mp4",
+    ".nib",
+    ".otf",
+    ".pdf",
+    ".plist",
+    ".png",
+    ".strings",
+    ".stringsdict",
+    ".ttf",
+    ".txt",
+    ".wav",
+}
+
+# Bundles are signed as a whole rather than classified as files.
+BUNDLE_SUFFIXES = (".framework", ".app")
+# Localizations and asset catalogs never contain code.
+PRUNED_DIR_SUFFIXES = (".lproj", ".xcassets")
+
+# Classification is I/O bound, so use more threads than cores.
+DEFAULT_JOBS = min(32, (os.cpu_count() or 1) + 4)
+
+
+def is_macho(path: str) -> bool:
+    """Classify a file as Mach-O from its magic bytes, like `file` (without -L) does."""
+    if os.path.splitext(path)[1].lower() in NON_CODE_EXTENSIONS:
+        return False
+    try:
+        if os.path.islink(path):
+            return False
+        with open(path, "rb") as handle:
+            header = handle.read(8)
+    except OSError:
+        return False
+
+    magic = header[:4]
+    if magic in MACHO_THIN_MAGICS:
+        try:
+            return os.path.getsize(path) >= MIN_MACHO_SIZE
+        except OSError:
+            return False
+    byte_order = MACHO_FAT_MAGICS.get(magic)
+    if byte_order is not None and len(header) == 8:
+        (arch_count,) = struct.unpack(byte_order, header[4:8])
+        return 0 < arch_count < MAX_FAT_ARCHS
+    return False
+
+
+def _scan_dir(path: str) -> tuple[list[tuple[str, str, bool]], list[str]]:
+    """List one directory like os.walk does: (name, path, is_symlink) of subdirectories, and file paths."""
+    dirs: list[tuple[str, str, bool]] = []
+    files: list[str] = []
+    try:
+        with os.scandir(path) as it:
+            for entry in it:
+                try:
+                    is_dir = entry.is_dir()
+                except OSError:
+                    is_dir = False
+                if is_dir:
+                    dirs.append((entry.name, entry.path, entry.is_symlink()))
+                else:
+                    files.append(entry.path)
+    except OSError:
+        pass
+    return dirs, files
+
+
+def _classify(path: str, manifest: Optional[BundleManifest] = None) -> bool:
+    if manifest is None:
+        return os.path.isfile(path) and is_macho(path)
+    try:
+        st = os.lstat(path)
+    except OSError:
+        return False
+    # Symlinks and special files are never candidates; is_macho skips links too.
+    if not stat.S_ISREG(st.st_mode):
+        return False
+    facts = manifest.lookup(path, st)
+    if facts is None:
+        facts = {"macho": is_macho(path)}
+        manifest.record(path, st, facts)
+    return bool(facts.get("macho"))
+
+
+def scan_bundle(
+    app_path: str, jobs: int = DEFAULT_JOBS, manifest: Optional[BundleManifest] = None
+) -> tuple[list[str], list[str], dict[str, int]]:
+    """
+    Walk app_path and classify its files on a thread pool.
+
+    Returns (candidates, app_paths, stats): Mach-O files and frameworks, then
+    nested apps, both deepest first, in the order they have to be signed.
+    Directories listed in PRUNED_DIR_SUFFIXES are not descended into. With a
+    manifest, files unchanged since the last scan are not reopened.
+    """
+    all_paths: list[str] = []
+    classified: dict[str, Future] = {}
+    stats = {"dirs": 0, "files": 0, "pruned": 0}
+
+    with ThreadPoolExecutor(max_workers=max(1, jobs)) as executor:
+        pending = {executor.submit(_scan_dir, app_path)}
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                dirs, files = future.result()
+                stats["dirs"] += 1
+                for name, path, is_link in dirs:
+                    if name.endswith(BUNDLE_SUFFIXES):
+                        all_paths.append(path)
+                    if is_link:
+                        continue
+                    if name.endswith(PRUNED_DIR_SUFFIXES):
+                        stats["pruned"] += 1
+                        continue
+                    pending.add(executor.submit(_scan_dir, path))
+                for path in files:
+                    all_paths.append(path)
+                    if not path.endswith(BUNDLE_SUFFIXES):
+                        classified[path] = executor.submit(_classify, path, manifest)
+        stats["files"] = len(classified)
+        macho = {path for path, future in classified.items() if future.result()}
 
     sorted_paths = sorted(all_paths, key=lambda x: (x.count(os.sep), x), reverse=True)
     app_paths: list[str] = []
@@ -21,36 +174,115 @@ def scan_binaries(app_path: str) -> list[str]:
     for path in sorted_paths:
         if path.endswith(".framework"):
             candidates.append(path)
-            continue
-        if path.endswith(".app"):
+        elif path.endswith(".app"):
             app_paths.append(path)
-            continue
-        try:
-            if os.path.isfile(path):
-                r = subprocess.run(
-                    ["file", path],
-                    stdout=subprocess.PIPE,
-                    stderr=subprocess.DEVNULL,
-                    text=True,
-                    check=False,
-                )
-                if "Mach-O" in r.stdout:
-                    candidates.append(path)
-        except Exception:
-            pass
-
-    for p in candidates:
-        print(p)
-    for p in app_paths:
-        print(p)
-    print(app_path)
+        elif path in macho:
+            candidates.append(path)
+    return candidates, app_paths, stats
+
+
+def signing_levels(app_path: str, candidates: list[str], app_paths: list[str]) -> list[list[str]]:
+    """
+    Group the signing order into levels of the containment DAG.
+
+    An item must be signed after every item nested inside it, so its level is
+    one above the highest level it contains. Items within a level are
+    independent and can be signed concurrently; each level keeps the flat
+    order. Unlike the flat list, an app nested inside a framework (e.g. an
+    updater helper) lands before that framework.
+    """
+    items = candidates + app_paths + [app_path]
+    levels: dict[str, int] = dict.fromkeys(items, 0)
+    for path in sorted(items, key=lambda x: x.count(os.sep), reverse=True):
+        parent = os.path.dirname(path)
+        while len(parent) >= len(app_path):
+            if parent in levels:
+                levels[parent] = max(levels[parent], levels[path] + 1)
+                break
+            parent = os.path.dirname(parent)
+
+    plan: list[list[str]] = [[] for _ in range(levels[app_path] + 1)]
+    for path in items:
+        plan[levels[path]].append(path)
+    return plan
+
+
+def print_plan(plan: list[list[str]], fmt: str) -> None:
+    if fmt == "json":
+        print(json.dumps({"levels": plan}, indent=2))
+        return
+    # One NUL after each path and an empty record closing each level.
+    out = sys.stdout.buffer
+    for level in plan:
+        for path in level:
+            out.write(os.fsencode(path) + b"\0")
+        out.write(b"\0")
+    out.flush()
+
+
+def scan_binaries(
+    app_path: str,
+    jobs: int = DEFAULT_JOBS,
+    plan_format: Optional[str] = None,
+    manifest_path: Optional[str] = None,
+) -> list[str]:
+    started = time.perf_counter()
+    manifest = BundleManifest.load(manifest_path) if manifest_path else None
+    with devkit_profile.phase("scan_bundle"):
+        candidates, app_paths, stats = scan_bundle(app_path, jobs, manifest)
+        devkit_profile.count("files", stats["files"])
+        devkit_profile.count("dirs", stats["dirs"])
+    cached = ""
+    if manifest is not None:
+        manifest.save()
+        cached = f" ({manifest.hits} from manifest)"
+    elapsed = time.perf_counter() - started
+
+    levels = ""
+    if plan_format is None:
+        for p in candidates:
+            print(p)
+        for p in app_paths:
+            print(p)
+        print(app_path)
+    else:
+        with devkit_profile.phase("signing_levels"):
+            plan = signing_levels(app_path, candidates, app_paths)
+        print_plan(plan, plan_format)
+        levels = f" over {len(plan)} levels"
+    print(
+        f"[resign-scan] {stats['dirs']} dirs ({stats['pruned']} pruned), "
+        f"{stats['files']} files classified{cached}, {len(candidates) + len(app_paths) + 1} to sign{levels} "
+        f"in {elapsed:.3f}s with {jobs} jobs",
+        file=sys.stderr,
+    )
+    return candidates + app_paths + [app_path]
 
 
 if __name__ == "__main__":
-    if len(sys.argv) != 2:
-        sys.exit(1)
-    app_path = sys.argv[1]
+    parser = argparse.ArgumentParser(description="List the binaries of an app bundle in signing order.")
+    parser.add_argument("app_path", help="Path to the .app bundle")
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        default=DEFAULT_JOBS,
+        help=f"Number of threads walking and classifying files (default: {DEFAULT_JOBS})",
+    )
+    parser.add_argument(
+        "--plan",
+        choices=("json", "nul"),
+        help="Print signing levels instead of a flat list: a JSON document, "
+        "or NUL-terminated paths with an empty record after each level",
+    )
+    parser.add_argument(
+        "--manifest",
+        metavar="PATH",
+        help="Manifest file remembering which files are Mach-O, so unchanged files are not reopened",
+    )
+    devkit_profile.add_arguments(parser)
+    args = parser.parse_args()
+    app_path = args.app_path
     if not os.path.exists(app_path) or not app_path.endswith(".app"):
         sys.exit(1)
-    scan_binaries(app_path)
-
+    scan_binaries(app_path, args.jobs, args.plan, args.manifest)
@@ -0,0 +1,377 @@
+#!/usr/bin/env python3
+"""
+Benchmark the localization pipeline on synthetic string catalogs.
+
+Catalogs are generated at multiples of the main catalog's 1,272 keys, with
+a configurable number of locales and a share of plural and device
+variations. Each stage (load, checks, update, save) is timed over several
+runs on a fresh copy of the document, then run once more under tracemalloc
+to record its peak memory. Results are written as JSON so runs from
+different commits can be compared with --compare.
+
+Usage:
+    python3 benchmark_i18n.py                        # 1x, 10x and 100x, 7 locales
+    python3 benchmark_i18n.py --scales 1,10 --locales 21 -o after.json
+    python3 benchmark_i18n.py --scales 1 --compare before.json
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import i18n_cache
+import xcstrings_format
+import xcstrings_lazy
+from i18n_tools import (
+    DEFAULT_KEEP_LANGUAGES,
+    UNTRANSLATED_EXCEPTIONS,
+    audit_since,
+    audit_strings,
+    find_incomplete_translations,
+    find_untranslated,
+    load_catalog,
+    load_strings,
+    prune_stale_strings,
+    save_strings,
+    update_missing_translations,
+)
+
+BASE_KEYS = 1272
+RESULTS_FORMAT = 1
+
+# Locales in the order they are added; the first 7 match the main catalog.
+LOCALES = [
+    "en", "de", "es", "fr", "ja", "ko", "zh-Hans",
+    "it", "pt-BR", "ru", "zh-Hant", "nl", "sv", "pl", "tr", "uk",
+    "ar", "he", "hi", "id", "th", "vi", "cs", "da", "fi", "nb",
+    "el", "hu", "ro", "sk", "ca", "hr", "ms",
+]
+
+WORDS = (
+    "model conversation message server token settings export import chat "
+    "attachment image prompt search memory account sync cloud backup title "
+    "history template shortcut provider key language network error request"
+).split()
+
+PLURAL_CATEGORIES = ("one", "other")
+DEVICE_CATEGORIES = ("iphone", "mac", "other")
+
+
+def _unit(value: str, state: str = "translated") -> Dict[str, Any]:
+    return {"stringUnit": {"state": state, "value": value}}
+
+
+def _localization(rng: random.Random, value: str, plural: bool, device: bool) -> Dict[str, Any]:
+    if plural:
+        return {
+            "variations": {
+                "plural": {category: _unit(f"{value} ({category})") for category in PLURAL_CATEGORIES}
+            }
+        }
+    if device:
+        return {
+            "variations": {
+                "device": {category: _unit(f"{value} [{category}]") for category in DEVICE_CATEGORIES}
+            }
+        }
+    state = "translated" if rng.random() > 0.01 else "needs_review"
+    return _unit(value, state)
+
+
+def generate_catalog(
+    keys: int,
+    locales: int,
+    plural_ratio: float = 0.05,
+    device_ratio: float = 0.02,
+    seed: int = 0,
+) -> Dict[str, Any]:
+    """Build a catalog shaped like the main one: mostly translated, with some gaps."""
+    rng = random.Random(seed)
+    languages = LOCALES[:locales]
+    strings: Dict[str, Any] = {}
+    for index in range(keys):
+        words = " ".join(rng.choice(WORDS) for _ in range(rng.randint(1, 8)))
+        if rng.random() < 0.1:
+            words += " %@"
+        elif rng.random() < 0.05:
+            words += " %lld"
+        key = f"{words.capitalize()} {index}"
+        entry: Dict[str, Any] = {}
+        if rng.random() < 0.02:
+            entry["comment"] = f"Shown in {rng.choice(WORDS)} view"
+        if rng.random() < 0.02:
+            entry["shouldTranslate"] = False
+        if rng.random() < 0.01:
+            entry["extractionState"] = "stale"
+
+        plural = rng.random() < plural_ratio
+        device = not plural and rng.random() < device_ratio
+        locs: Dict[str, Any] = {}
+        for language in languages:
+            # Leave a few cells for the checks and the update to find.
+            if language != "en" and rng.random() < 0.005:
+                continue
+            value = key if language == "en" else f"[{language}] {key}"
+            locs[language] = _localization(rng, value, plural, device)
+        if rng.random() < 0.01:
+            locs.pop("en", None)
+        entry["localizations"] = locs
+        strings[key] = entry
+    return {"sourceLanguage": "en", "strings": strings, "version": "1.0"}
+
+
+def _measure(
+    prepare: Callable[[], Any],
+    stage: Callable[[Any], Any],
+    repeat: int,
+) -> Dict[str, Any]:
+    """Time stage over fresh inputs and record the peak memory of one more run."""
+    times: List[float] = []
+    for _ in range(repeat):
+        argument = prepare()
+        started = time.perf_counter()
+        stage(argument)
+        times.append(time.perf_counter() - started)
+
+    argument = prepare()
+    tracemalloc.start()
+    try:
+        stage(argument)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return {
+        "min_s": min(times),
+        "median_s": sorted(times)[len(times) // 2],
+        "peak_bytes": peak,
+    }
+
+
+def benchmark_scale(
+    workdir: str,
+    scale: int,
+    locales: int,
+    plural_ratio: float,
+    device_ratio: float,
+    repeat: int,
+) -> Dict[str, Any]:
+    keys = BASE_KEYS * scale
+    file_path = os.path.join(workdir, f"Bench-{scale}x.xcstrings")
+    document = generate_catalog(keys, locales, plural_ratio, device_ratio, seed=scale)
+    xcstrings_format.write_strings(file_path, document)
+    with open(file_path, "rb") as f:
+        original = f.read()
+    del document
+    # Date the catalog back past the parse cache's racy window so cached
+    # loads are served from stat data, as they are for a checked-out file.
+    settled = time.time() - 60
+
+    def restore() -> None:
+        with open(file_path, "wb") as f:
+            f.write(original)
+        os.utime(file_path, (settled, settled))
+
+    def fresh() -> Dict[str, Any]:
+        return load_strings(file_path)
+
+    def modified() -> Dict[str, Any]:
+        restore()
+        data = fresh()
+        strings = data["strings"]
+        for key in list(strings)[:: max(1, len(strings) // 100)]:
+            strings[key].setdefault("comment", "Benchmark edit")
+        return data
+
+    def cold_load(_: Any) -> Dict[str, Any]:
+        os.environ["FLOWDOWN_I18N_CACHE"] = "0"
+        try:
+            return load_strings(file_path)
+        finally:
+            del os.environ["FLOWDOWN_I18N_CACHE"]
+
+    def full_write(data: Dict[str, Any]) -> Any:
+        return xcstrings_format.write_strings(file_path, data)
+
+    def pipeline_audit(data: Any) -> Any:
+        # What i18n_pipeline does between its load and save.
+        prune_stale_strings(data)
+        update_missing_translations(data)
+        return audit_strings(
+            data,
+            checks=["incomplete", "untranslated"],
+            target_langs=DEFAULT_KEEP_LANGUAGES,
+            exceptions=UNTRANSLATED_EXCEPTIONS,
+        )
+
+    def untranslated_since(revision: Optional[str]) -> Any:
+        with contextlib.redirect_stdout(io.StringIO()):
+            return audit_since(
+                file_path,
+                None,
+                revision,
+                checks=["untranslated"],
+                target_langs=DEFAULT_KEEP_LANGUAGES,
+                exceptions=UNTRANSLATED_EXCEPTIONS,
+            )
+
+    def lazy_lookup(_: Any) -> Dict[str, Any]:
+        with xcstrings_lazy.open_strings(file_path) as document:
+            strings = document["strings"]
+            return strings[next(iter(strings))]
+
+    restore()
+    fresh()  # Populate the parse cache.
+    edited = None
+    if shutil.which("git"):
+        # Commit the catalog so --base runs compare against it, then edit 1% of it.
+        for args in (["init", "-q"], ["add", os.path.basename(file_path)], ["commit", "-qm", "base"]):
+            subprocess.run(
+                ["git", "-C", workdir, "-c", "user.name=bench", "-c", "user.email=bench@localhost", *args],
+                check=True,
+            )
+        xcstrings_format.write_strings(file_path, modified())
+        with open(file_path, "rb") as f:
+            edited = f.read()
+        restore()
+
+    def edit() -> None:
+        with open(file_path, "wb") as f:
+            f.write(edited)
+        os.utime(file_path, (settled, settled))
+
+    stages: Dict[str, Tuple[Callable[[], Any], Callable[[Any], Any]]] = {
+        "load_strings (parse)": (lambda: None, cold_load),
+        "load_strings (cached)": (lambda: None, lambda _: load_strings(file_path)),
+        "open_strings (1 key, lazy)": (lambda: None, lazy_lookup),
+        "find_untranslated": (
+            fresh,
+            lambda data: find_untranslated(data, DEFAULT_KEEP_LANGUAGES, UNTRANSLATED_EXCEPTIONS),
+        ),
+        "find_incomplete_translations": (fresh, find_incomplete_translations),
+        "update_missing_translations": (fresh, update_missing_translations),
+        "pipeline audit (document)": (fresh, pipeline_audit),
+        "pipeline audit (Catalog)": (lambda: load_catalog(file_path), pipeline_audit),
+        "check_untranslated (full)": (edit if edited else restore, lambda _: untranslated_since(None)),
+        "check_untranslated (--base)": (edit if edited else restore, lambda _: untranslated_since("HEAD")),
+        "save_strings (unchanged)": (fresh, lambda data: save_strings(file_path, data)),
+        "save_strings (1% changed)": (modified, lambda data: save_strings(file_path, data)),
+        "save_strings (full encode)": (fresh, full_write),
+    }
+
+    results: Dict[str, Any] = {}
+    for name, (prepare, stage) in stages.items():
+        results[name] = _measure(prepare, stage, repeat)
+        restore()
+        print(f"  {scale:>4}x {name:<30} {results[name]['min_s'] * 1000:10.1f} ms", file=sys.stderr)
+    i18n_cache.evict(0)
+    return {
+        "scale": scale,
+        "keys": keys,
+        "locales": locales,
+        "file_bytes": len(original),
+        "stages": results,
+    }
+
+
+def git_revision() -> Optional[str]:
+    try:
+        result = subprocess.run(
+            ["git", "-C", os.path.dirname(os.path.abspath(__file__)), "rev-parse", "--short", "HEAD"],
+            check=True,
+            capture_output=True,
+            text=True,
+        )
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return result.stdout.strip()
+
+
+def compare(results: Dict[str, Any], baseline_path: str) -> None:
+    """Print the change in min time and peak memory against a previous run."""
+    with open(baseline_path, "r", encoding="utf-8") as f:
+        baseline = json.load(f)
+    previous = {(run["scale"], run["locales"]): run for run in baseline.get("runs", [])}
+    print(f"\n📊 Compared with {baseline_path} ({baseline.get('revision') or 'unknown revision'})")
+    for run in results["runs"]:
+        before = previous.get((run["scale"], run["locales"]))
+        if before is None:
+            continue
+        for name, stage in run["stages"].items():
+            old = before["stages"].get(name)
+            if not old:
+                continue
+            time_ratio = stage["min_s"] / old["min_s"] if old["min_s"] else float("inf")
+            memory_ratio = stage["peak_bytes"] / old["peak_bytes"] if old["peak_bytes"] else float("inf")
+            print(f"  {run['scale']:>4}x {name:<30} time x{time_ratio:5.2f}  memory x{memory_ratio:5.2f}")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark the i18n pipeline on synthetic catalogs.")
+    parser.add_argument("--scales", default="1,10,100", help="Comma separated multiples of 1,272 keys")
+    parser.add_argument(
+        "--locales",
+        type=int,
+        default=7,
+        help=f"Number of locales including English (max {len(LOCALES)})",
+    )
+    parser.add_argument("--plural-ratio", type=float, default=0.05, help="Share of keys with plural variations")
+    parser.add_argument("--device-ratio", type=float, default=0.02, help="Share of keys with device variations")
+    parser.add_argument("--repeat", type=int, default=3, help="Timed runs per stage")
+    parser.add_argument("-o", "--output", help="Write JSON results here instead of stdout")
+    parser.add_argument("--compare", metavar="JSON", help="Previous results to compare against")
+    args = parser.parse_args()
+
+    if not 1 <= args.locales <= len(LOCALES):
+        print(f"❌ --locales must be between 1 and {len(LOCALES)}")
+        return 1
+    scales = [int(scale) for scale in args.scales.split(",") if scale.strip()]
+
+    workdir = tempfile.mkdtemp(prefix="i18n-bench-")
+    # Keep the benchmark's parse cache away from the project's.
+    os.environ["FLOWDOWN_I18N_CACHE_DIR"] = os.path.join(workdir, "cache")
+    try:
+        runs = [
+            benchmark_scale(workdir, scale, args.locales, args.plural_ratio, args.device_ratio, max(1, args.repeat))
+            for scale in scales
+        ]
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    results = {
+        "format": RESULTS_FORMAT,
+        "revision": git_revision(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "parameters": {
+            "plural_ratio": args.plural_ratio,
+            "device_ratio": args.device_ratio,
+            "repeat": args.repeat,
+        },
+        "runs": runs,
+    }
+    document = json.dumps(results, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(document + "\n")
+        print(f"✅ Results written to {args.output}", file=sys.stderr)
+    else:
+        print(document)
+
+    if args.compare:
+        compare(results, args.compare)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
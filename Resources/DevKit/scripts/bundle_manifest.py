@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+"""
+Content manifest for files inside an app bundle.
+
+Steps that walk the same bundle repeatedly (re-signing during notarization
+retries, for example) can remember per-file facts, like whether a file is
+Mach-O, and skip reopening files that did not change. Entries are keyed by
+path and only trusted while the file's size, mtime and inode still match.
+The manifest is an accelerator only: a missing or unreadable file just
+starts empty, and errors writing it are ignored.
+
+A step that rewrites files without changing their facts, as codesign does
+to the Mach-O files it signs, refreshes their entries afterwards.
+Otherwise the facts recorded before the rewrite never match again.
+
+Usage:
+    manifest = BundleManifest.load(manifest_path)
+    st = os.lstat(path)
+    facts = manifest.lookup(path, st)
+    if facts is None:
+        facts = {"macho": is_macho(path)}
+        manifest.record(path, st, facts)
+    manifest.save()
+
+    python3 bundle_manifest.py refresh MANIFEST [PATH ...]   (NUL-separated paths on stdin without PATH)
+"""
+
+import argparse
+import json
+import os
+import stat
+import sys
+import tempfile
+import threading
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+MANIFEST_FORMAT = 1
+
+Signature = Tuple[int, int, int]
+
+
+def file_signature(st: os.stat_result) -> Signature:
+    return (st.st_size, st.st_mtime_ns, st.st_ino)
+
+
+class BundleManifest:
+    """Per-path facts, valid as long as the file's stat signature is unchanged."""
+
+    def __init__(self, path: Optional[str] = None, entries: Optional[Dict[str, Any]] = None) -> None:
+        self.path = path
+        self._entries: Dict[str, Any] = entries or {}
+        # Only paths looked up or recorded in this run are written back, so
+        # files that disappeared from the bundle drop out of the manifest.
+        self._current: Dict[str, Any] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @classmethod
+    def load(cls, path: Optional[str]) -> "BundleManifest":
+        """Read the manifest at path; an absent or unusable file gives an empty one."""
+        if not path:
+            return cls(path)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                document = json.load(f)
+        except (OSError, ValueError):
+            return cls(path)
+        if not isinstance(document, dict) or document.get("format") != MANIFEST_FORMAT:
+            return cls(path)
+        entries = document.get("entries")
+        return cls(path, entries if isinstance(entries, dict) else None)
+
+    def lookup(self, file_path: str, st: os.stat_result) -> Optional[Dict[str, Any]]:
+        """Return the facts recorded for file_path if it is unchanged since, else None."""
+        entry = self._entries.get(file_path)
+        if entry is not None and tuple(entry[0]) == file_signature(st):
+            with self._lock:
+                self._current[file_path] = entry
+                self.hits += 1
+            return entry[1]
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def record(self, file_path: str, st: os.stat_result, facts: Dict[str, Any]) -> None:
+        """Remember facts about file_path as of the stat result st."""
+        entry = [list(file_signature(st)), facts]
+        with self._lock:
+            self._entries[file_path] = entry
+            self._current[file_path] = entry
+
+    def refresh(self, file_paths: Iterable[str]) -> int:
+        """
+        Re-record the current stat of file_paths, keeping the facts they had.
+
+        For files a step rewrote without changing what the manifest knows
+        about them. Paths without an entry, and paths that are no longer
+        regular files, are left alone. Every other entry is kept as well.
+        Returns the number of entries refreshed.
+        """
+        refreshed = 0
+        with self._lock:
+            self._current.update(self._entries)
+            for file_path in file_paths:
+                entry = self._entries.get(file_path)
+                if entry is None:
+                    continue
+                try:
+                    st = os.lstat(file_path)
+                except OSError:
+                    continue
+                if not stat.S_ISREG(st.st_mode):
+                    continue
+                entry[0] = list(file_signature(st))
+                refreshed += 1
+        return refreshed
+
+    def save(self) -> None:
+        """Write the entries seen in this run back to the manifest file."""
+        if not self.path:
+            return
+        directory = os.path.dirname(os.path.abspath(self.path))
+        document = {"format": MANIFEST_FORMAT, "entries": self._current}
+        try:
+            os.makedirs(directory, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+            try:
+                with os.fdopen(fd, "w", encoding="utf-8") as f:
+                    json.dump(document, f, separators=(",", ":"))
+                os.replace(tmp_path, self.path)
+            except BaseException:
+                os.unlink(tmp_path)
+                raise
+        except (OSError, ValueError):
+            pass
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Maintain a bundle manifest.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    refresh_parser = commands.add_parser("refresh", help="Re-record files rewritten with their facts unchanged")
+    refresh_parser.add_argument("manifest")
+    refresh_parser.add_argument("paths", nargs="*", help="Files to refresh (default: NUL-separated on stdin)")
+    args = parser.parse_args()
+
+    paths = args.paths or [path for path in sys.stdin.read().split("\0") if path]
+    manifest = BundleManifest.load(args.manifest)
+    refreshed = manifest.refresh(paths)
+    manifest.save()
+    print(f"[manifest] refreshed {refreshed} of {len(paths)} paths", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,47 @@
+#!/usr/bin/env python3
+"""
+Check that translations keep the format specifiers of the English source.
+Reports translations whose specifiers (%@, %lld, %1$@, ...) differ from the
+English value in count, type or order.
+With --base REV only keys added or modified since that git revision, and
+keys already failing there, are checked, so the exit code matches a full
+run; --all checks every catalog in the project in parallel.
+Exit codes:
+    0 - All translations keep their format specifiers
+    1 - Found mismatched specifiers (or file errors)
+"""
+
+import sys
+from typing import Optional
+
+from i18n_tools import (
+    audit_since,
+    catalog_argument_parser,
+    discover_catalogs,
+    run_catalogs,
+)
+
+
+def check_catalog(file_path: str, base: Optional[str] = None) -> int:
+    print(f"📝 Checking format specifiers in: {file_path}\n")
+    mismatched = audit_since(file_path, None, base, checks=["placeholders"])["placeholders"]
+
+    if mismatched:
+        print(f"❌ Found {len(mismatched)} translations with mismatched specifiers in {file_path}:\n")
+        for key, lang, problem in mismatched:
+            print(f"  Key: {key}")
+            print(f"  {lang}: {problem}\n")
+        return 1
+
+    print(f"✅ All format specifiers match in {file_path}")
+    return 0
+
+
+if __name__ == "__main__":
+    parser = catalog_argument_parser("Check format specifiers in translations.")
+    parser.add_argument("--base", metavar="REV", help="only check keys changed since this git revision")
+    args = parser.parse_args()
+
+    if args.all:
+        sys.exit(run_catalogs(check_catalog, discover_catalogs(), args.base, jobs=args.jobs))
+    sys.exit(check_catalog(args.file, args.base))
\ No newline at end of file
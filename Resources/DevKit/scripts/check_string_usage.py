@@ -0,0 +1,423 @@
+#!/usr/bin/env python3
+"""
+Cross-reference Swift sources with the string catalogs.
+
+Every Swift file of the targets that own a catalog (the top-level
+directories holding an .xcstrings file: FlowDown, FlowDownWidgets,
+FlowDownTranslationProvider) is scanned for string literals, and for the
+literal keys of localization call sites (String(localized:),
+NSLocalizedString, LocalizedStringResource and the SwiftUI initializers
+that take a LocalizedStringKey). Results are cached per file under
+.build/swift-strings.marshal by size and mtime, so a re-run only rescans
+edited files; cold scans are spread over a process pool.
+
+Reported:
+    missing   keys used at a localization call site but in no catalog
+    unused    catalog keys that no literal in the sources produces
+
+By default a key counts as used when any literal matches it, not only a
+call site, because most keys reach String(localized:) through
+String.LocalizationValue parameters (title: "Agreements"). The trade-off is
+that a key whose text also appears in an unlocalized literal, such as a
+log message or a dictionary key, is never reported as unused.
+--call-sites-only counts only the call sites above, which catches those
+but also reports every key passed through a parameter, so use it to
+review candidates rather than as a gate. Interpolated literals match keys
+with format specifiers in their place ("Delete \\(name)" uses "Delete %@").
+InfoPlist catalogs and stale keys are not reported as unused.
+
+Usage:
+    python3 check_string_usage.py [--unused-only | --missing-only] [--call-sites-only] [-j JOBS]
+"""
+
+import argparse
+import marshal
+import os
+import re
+import sys
+import tempfile
+import time
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+import devkit_profile
+from i18n_cache import RACY_WINDOW_SECONDS
+from i18n_tools import (
+    CATALOG_SEARCH_EXCLUDES,
+    FORMAT_SPECIFIER,
+    discover_catalogs,
+    load_strings,
+    project_root,
+)
+
+INDEX_FORMAT = 1
+# Below this many files to scan, a process pool costs more than it saves.
+PARALLEL_THRESHOLD = 64
+
+# Stands in for an interpolation in a literal and a format specifier in a key.
+SLOT = "\x00"
+
+LOCALIZATION_CALL = re.compile(
+    r"(?:\bString\(\s*localized:|\bNSLocalizedString\(|\bLocalizedStringResource\("
+    r"|\bLocalizedStringKey\(|\b(?:Text|Button|Label|Toggle|Section)\(|\.navigationTitle\()\s*(?=#*\")"
+)
+# Skips comments and finds the next literal opener.
+TOKEN = re.compile(r'//[^\n]*|/\*.*?\*/|(#*)("""|")', re.S)
+PLAIN_RUN = re.compile(r'[^"\\\n]+')
+MULTILINE_RUN = re.compile(r'[^"\\]+|"(?!"")')
+ESCAPES = {"0": "\0", "\\": "\\", "t": "\t", "n": "\n", "r": "\r", '"': '"', "'": "'"}
+UNICODE_ESCAPE = re.compile(r"u\{([0-9a-fA-F]{1,8})\}")
+RAW_OPENER = re.compile(r'#+"')
+INTENT_PARAMETER = re.compile(r"\s*\\\.\$?(\w+)\s*")
+
+Literal = Tuple[str, ...]
+
+
+def _skip_interpolation(source: str, pos: int, nested: Optional[List[Tuple[int, Literal]]]) -> int:
+    """Return the index after the ')' closing an interpolation opened before pos."""
+    depth = 1
+    while pos < len(source):
+        char = source[pos]
+        if char == '"' or (char == "#" and RAW_OPENER.match(source, pos)):
+            start = pos
+            parts, pos = read_literal(source, pos, nested)
+            if parts is not None and nested is not None:
+                nested.append((start, parts))
+            continue
+        if char == "(":
+            depth += 1
+        elif char == ")":
+            depth -= 1
+            if depth == 0:
+                return pos + 1
+        pos += 1
+    return pos
+
+
+def read_literal(
+    source: str,
+    pos: int,
+    nested: Optional[List[Tuple[int, Literal]]] = None,
+) -> Tuple[Optional[Literal], int]:
+    """
+    Read the string literal starting at pos (at its first '#' or quote).
+
+    Returns (parts, end): the text between interpolations, so a literal
+    without interpolation is a single part. parts is None when the literal
+    is malformed. Literals inside interpolations are added to nested as
+    (start, parts). An App Intent parameter interpolation, \\(\\.$name), is
+    kept as the ${name} placeholder Xcode puts in the key.
+    """
+    hashes = 0
+    while source.startswith("#", pos + hashes):
+        hashes += 1
+    pos += hashes
+    multiline = source.startswith('"""', pos)
+    pos += 3 if multiline else 1
+    if multiline and source.startswith("\n", pos):
+        pos += 1
+    closing = ('"""' if multiline else '"') + "#" * hashes
+    escape = "\\" + "#" * hashes
+    run = MULTILINE_RUN if multiline else PLAIN_RUN
+
+    parts: List[str] = []
+    text: List[str] = []
+    while pos < len(source):
+        if source.startswith(closing, pos):
+            parts.append("".join(text))
+            pos += len(closing)
+            if multiline:
+                parts = _strip_indentation(parts)
+            return tuple(parts), pos
+        if source.startswith(escape, pos):
+            pos += len(escape)
+            char = source[pos : pos + 1]
+            if char == "(":
+                end = _skip_interpolation(source, pos + 1, nested)
+                parameter = INTENT_PARAMETER.fullmatch(source, pos + 1, end - 1)
+                if parameter:
+                    text.append("${" + parameter.group(1) + "}")
+                else:
+                    parts.append("".join(text))
+                    text = []
+                pos = end
+                continue
+            if char == "u":
+                match = UNICODE_ESCAPE.match(source, pos)
+                if match:
+                    text.append(chr(int(match.group(1), 16)))
+                    pos = match.end()
+                    continue
+            if multiline and char == "\n":
+                # A backslash at the end of a line joins it with the next.
+                pos += 1
+                continue
+            text.append(ESCAPES.get(char, char))
+            pos += 1
+            continue
+        match = run.match(source, pos)
+        if match:
+            text.append(match.group())
+            pos = match.end()
+            continue
+        if source[pos] == "\n" and not multiline:
+            return None, pos
+        text.append(source[pos])
+        pos += 1
+    return None, pos
+
+
+def _strip_indentation(parts: List[str]) -> List[str]:
+    """Apply Swift's multi-line rule: drop the closing line and its indentation from every line."""
+    joined = SLOT.join(parts)
+    lines = joined.split("\n")
+    indentation = lines[-1] if not lines[-1].strip() else ""
+    lines = lines[:-1] if not lines[-1].strip() else lines
+    stripped = [line[len(indentation) :] if line.startswith(indentation) else line for line in lines]
+    return "\n".join(stripped).split(SLOT)
+
+
+def scan_source(source: str) -> Tuple[List[Tuple[Literal, int]], List[Literal]]:
+    """Return (call site keys with their line numbers, every distinct literal) of Swift source."""
+    calls: List[Tuple[Literal, int]] = []
+    call_starts = {match.end(): match.start() for match in LOCALIZATION_CALL.finditer(source)}
+    literals: Set[Literal] = set()
+    pos = 0
+    while True:
+        match = TOKEN.search(source, pos)
+        if match is None:
+            break
+        if match.group(2) is None:
+            pos = match.end()
+            continue
+        nested: List[Tuple[int, Literal]] = []
+        start = match.start()
+        parts, pos = read_literal(source, start, nested)
+        if parts is not None:
+            nested.append((start, parts))
+        for start, parts in sorted(nested):
+            if parts == ("",):
+                continue
+            literals.add(parts)
+            if start in call_starts:
+                calls.append((parts, source.count("\n", 0, start) + 1))
+    return calls, sorted(literals)
+
+
+def scan_file(path: str) -> Tuple[List[Tuple[Literal, int]], List[Literal]]:
+    with open(path, "r", encoding="utf-8", errors="replace") as f:
+        return scan_source(f.read())
+
+
+def catalog_targets(root: Optional[str] = None) -> List[str]:
+    """Return the top-level directories that hold a catalog, sorted."""
+    root = root or project_root()
+    return sorted({os.path.relpath(path, root).split(os.sep)[0] for path in discover_catalogs(root)})
+
+
+def discover_sources(root: Optional[str] = None) -> List[str]:
+    """
+    Return every .swift file of the targets that own a catalog.
+
+    Sample apps (Examples) and unit tests localize nothing through our
+    catalogs, so their literals would only show up as missing keys.
+    """
+    root = root or project_root()
+    found: List[str] = []
+    for target in catalog_targets(root):
+        for directory, dirs, files in os.walk(os.path.join(root, target)):
+            dirs[:] = [d for d in dirs if not d.startswith(".") and d not in CATALOG_SEARCH_EXCLUDES]
+            found.extend(os.path.join(directory, f) for f in files if f.endswith(".swift"))
+    return sorted(found)
+
+
+def default_index_path() -> str:
+    return os.path.join(project_root(), ".build", "swift-strings.marshal")
+
+
+def _load_index(index_path: str) -> Dict[str, Any]:
+    try:
+        with open(index_path, "rb") as f:
+            stored = marshal.loads(f.read())
+    except (OSError, EOFError, ValueError, TypeError):
+        return {}
+    if not isinstance(stored, dict) or stored.get("format") != INDEX_FORMAT:
+        return {}
+    return stored.get("files") or {}
+
+
+def _save_index(index_path: str, files: Dict[str, Any]) -> None:
+    directory = os.path.dirname(index_path)
+    try:
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(marshal.dumps({"format": INDEX_FORMAT, "files": files}))
+            os.replace(tmp_path, index_path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+    except (OSError, ValueError):
+        pass
+
+
+def index_sources(
+    paths: Iterable[str],
+    jobs: Optional[int] = None,
+    index_path: Optional[str] = None,
+) -> Dict[str, Tuple[List[Tuple[Literal, int]], List[Literal]]]:
+    """
+    Return {path: (calls, literals)} for paths, rescanning only changed files.
+
+    Files modified within the racy window are scanned but not trusted from
+    the cache on the next run.
+    """
+    index_path = index_path or default_index_path()
+    cached = _load_index(index_path)
+    root = project_root()
+    results: Dict[str, Tuple[List[Tuple[Literal, int]], List[Literal]]] = {}
+    files: Dict[str, Any] = {}
+    stale: List[Tuple[str, str, Optional[Tuple[int, int]]]] = []
+    now = time.time()
+    with devkit_profile.phase("index_sources"):
+        for path in paths:
+            name = os.path.relpath(path, root)
+            st = os.stat(path)
+            signature = None if now - st.st_mtime < RACY_WINDOW_SECONDS else (st.st_size, st.st_mtime_ns)
+            entry = cached.get(name)
+            if signature is not None and entry is not None and tuple(entry[0]) == signature:
+                results[path] = (entry[1], entry[2])
+                files[name] = entry
+                devkit_profile.count("cache_hits")
+                continue
+            stale.append((path, name, signature))
+
+        devkit_profile.count("files_scanned", len(stale))
+        scan_paths = [path for path, _, _ in stale]
+        jobs = max(1, min(jobs or os.cpu_count() or 1, len(scan_paths)))
+        if jobs > 1 and len(scan_paths) >= PARALLEL_THRESHOLD:
+            # Imported here: it costs ~20 ms, more than a warm run's whole scan.
+            from concurrent.futures import ProcessPoolExecutor
+
+            with ProcessPoolExecutor(max_workers=jobs) as pool:
+                scanned = list(pool.map(scan_file, scan_paths, chunksize=16))
+        else:
+            scanned = [scan_file(path) for path in scan_paths]
+
+    for (path, name, signature), (calls, literals) in zip(stale, scanned):
+        results[path] = (calls, literals)
+        if signature is not None:
+            files[name] = (signature, calls, literals)
+    if stale or len(files) != len(cached):
+        _save_index(index_path, files)
+    return results
+
+
+def key_skeleton(key: str) -> str:
+    """Replace format specifiers with SLOT and unescape %%, to compare keys with interpolated literals."""
+    return FORMAT_SPECIFIER.sub(lambda match: "%" if match.group(3) == "%" else SLOT, key)
+
+
+def literal_key(parts: Literal) -> Tuple[bool, str]:
+    """Return (interpolated, text) for comparing a literal with catalog keys."""
+    return len(parts) > 1, SLOT.join(parts)
+
+
+def cross_reference(
+    sources: Dict[str, Tuple[List[Tuple[Literal, int]], List[Literal]]],
+    catalogs: Dict[str, Dict[str, Any]],
+    call_sites_only: bool = False,
+) -> Tuple[List[Tuple[str, str, int]], Dict[str, List[str]]]:
+    """
+    Compare indexed sources with catalogs ({name: data}).
+
+    Returns (missing, unused): missing lists (key, path, line) of call
+    sites whose key is in no catalog, unused maps catalog names to keys no
+    literal produces, or no call site with call_sites_only.
+    """
+    exact: Set[str] = set()
+    templates: Set[str] = set()
+    for calls, literals in sources.values():
+        for parts in [parts for parts, _ in calls] if call_sites_only else literals:
+            interpolated, text = literal_key(parts)
+            (templates if interpolated else exact).add(text)
+
+    all_keys: Set[str] = set()
+    all_skeletons: Set[str] = set()
+    unused: Dict[str, List[str]] = {}
+    for name, data in catalogs.items():
+        strings = data["strings"]
+        all_keys.update(strings)
+        report = os.path.basename(name) != "InfoPlist.xcstrings"
+        for key, entry in strings.items():
+            skeleton = key_skeleton(key) if "%" in key else None
+            if skeleton is not None:
+                all_skeletons.add(skeleton)
+            if not report or entry.get("extractionState") == "stale":
+                continue
+            if key in exact or (skeleton is not None and skeleton in templates):
+                continue
+            unused.setdefault(name, []).append(key)
+
+    root = project_root()
+    missing: List[Tuple[str, str, int]] = []
+    for path, (calls, _) in sources.items():
+        for parts, line in calls:
+            interpolated, text = literal_key(parts)
+            if interpolated:
+                if text in all_skeletons:
+                    continue
+                text = "\\(…)".join(parts)
+            elif text in all_keys:
+                continue
+            missing.append((text, os.path.relpath(path, root), line))
+    return missing, unused
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Report unused and missing localization keys.")
+    group = parser.add_mutually_exclusive_group()
+    group.add_argument("--unused-only", action="store_true", help="only report catalog keys no source uses")
+    group.add_argument("--missing-only", action="store_true", help="only report call sites missing from catalogs")
+    parser.add_argument(
+        "--call-sites-only",
+        action="store_true",
+        help="count a key as used only at a localization call site, not in any matching literal",
+    )
+    parser.add_argument("-j", "--jobs", type=int, default=None, help="worker processes for scanning")
+    devkit_profile.add_arguments(parser)
+    args = parser.parse_args()
+
+    root = project_root()
+    sources = index_sources(discover_sources(), jobs=args.jobs)
+    catalogs = {os.path.relpath(path, root): load_strings(path) for path in discover_catalogs()}
+    missing, unused = cross_reference(sources, catalogs, args.call_sites_only)
+    calls = sum(len(found) for found, _ in sources.values())
+    print(f"🔎 Indexed {calls} localization call sites in {len(sources)} Swift files")
+
+    problems = False
+    if not args.unused_only:
+        if missing:
+            problems = True
+            print(f"\n❌ {len(missing)} keys used in code are missing from every catalog:")
+            for key, path, line in sorted(missing, key=lambda item: (item[1], item[2])):
+                print(f"  {path}:{line}: {key!r}")
+        else:
+            print("✅ Every localized key in code is in a catalog")
+    if not args.missing_only:
+        total = sum(len(keys) for keys in unused.values())
+        if total:
+            problems = True
+            used_by = "localization call site" if args.call_sites_only else "Swift literal"
+            print(f"\n⚠️ {total} catalog keys are not used by any {used_by}:")
+            for name in sorted(unused):
+                print(f"  {name}:")
+                for key in sorted(unused[name]):
+                    print(f"    - {key!r}")
+        else:
+            print("✅ Every catalog key is used in code")
+    return 1 if problems else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,33 +1,49 @@
 #!/usr/bin/env python3
 """
 Report translation completeness and optionally prune stale keys.
+
+With --base REV only keys added or modified since that git revision, and
+keys already failing there, are checked; the exit code contract is
+unchanged. --all checks every catalog in the project in parallel.
 """
 
 import sys
+from typing import Optional
 
 from i18n_tools import (
-    default_file_path,
-    find_incomplete_translations,
+    audit_since,
+    catalog_argument_parser,
+    catalog_lock,
+    count_strings,
+    discover_catalogs,
     load_strings,
+    remove_strings,
+    run_catalogs,
     save_strings,
 )
 
 
-if __name__ == "__main__":
-    file_path = sys.argv[1] if len(sys.argv) > 1 else default_file_path()
-
-    data = load_strings(file_path)
-    languages, incomplete, removed = find_incomplete_translations(data, clean_stale=True)
+def check_catalog(file_path: str, base: Optional[str] = None) -> int:
+    with catalog_lock(file_path):
+        # Incremental runs only decode the entries they check, unless there is something to prune.
+        data = None if base else load_strings(file_path)
+        results = audit_since(file_path, data, base, checks=["stale", "incomplete"], clean_stale=True)
+        removed = results["stale"]
+        if removed:
+            if data is None:
+                data = load_strings(file_path)
+            remove_strings(data, removed)
+            save_strings(file_path, data)
+    languages, incomplete = results["incomplete"]
 
     if removed:
-        save_strings(file_path, data)
         print("Removed stale strings:")
         for key in removed:
             print(f"  - {key}")
     else:
         print("No stale strings found.")
 
-    translatable_count = len(data["strings"])
+    translatable_count = len(data["strings"]) if data is not None else count_strings(file_path)
     print(f"Found languages: {', '.join(languages)}")
     print(f"Total strings: {translatable_count}")
     print()
@@ -36,7 +52,17 @@ if __name__ == "__main__":
         print(f"Incomplete translations in {file_path}:")
         for key, lang, reason in incomplete:
             print(f"  {key} - {lang}: {reason}")
-        sys.exit(1)
+        return 1
 
     print(f"All translations are complete in {file_path}.")
-    sys.exit(0)
\ No newline at end of file
+    return 0
+
+
+if __name__ == "__main__":
+    parser = catalog_argument_parser("Report translation completeness.")
+    parser.add_argument("--base", metavar="REV", help="only check keys changed since this git revision")
+    args = parser.parse_args()
+
+    if args.all:
+        sys.exit(run_catalogs(check_catalog, discover_catalogs(), args.base, jobs=args.jobs))
+    sys.exit(check_catalog(args.file, args.base))
\ No newline at end of file
@@ -2,42 +2,56 @@
 """
 Check for untranslated strings across all supported languages.
 Reports strings that are missing or have empty values.
+With --base REV only keys added or modified since that git revision, and
+keys already failing there, are checked, so the exit code matches a full
+run; --all checks every catalog in the project in parallel.
 Exit codes:
     0 - All strings are properly translated
     1 - Found untranslated strings (or file errors)
 """
 
 import sys
+from typing import Optional
 
 from i18n_tools import (
     DEFAULT_KEEP_LANGUAGES,
-    default_file_path,
-    find_untranslated,
-    load_strings,
+    UNTRANSLATED_EXCEPTIONS,
+    audit_since,
+    catalog_argument_parser,
+    discover_catalogs,
+    run_catalogs,
 )
 
-EXCEPTIONS: set[str] = {"%@", "%lld"}
+EXCEPTIONS: set[str] = set(UNTRANSLATED_EXCEPTIONS)
 
 
-if __name__ == "__main__":
-    file_path = sys.argv[1] if len(sys.argv) > 1 else default_file_path()
-
+def check_catalog(file_path: str, base: Optional[str] = None) -> int:
     print(f"📝 Checking for untranslated strings in: {file_path}\n")
-    data = load_strings(file_path)
-
-    untranslated = find_untranslated(
-        data,
+    untranslated = audit_since(
+        file_path,
+        None,
+        base,
+        checks=["untranslated"],
         target_langs=DEFAULT_KEEP_LANGUAGES,
         exceptions=EXCEPTIONS,
-    )
+    )["untranslated"]
 
     if untranslated:
         print(f"❌ Found {len(untranslated)} untranslated strings in {file_path}:\n")
         for item in untranslated:
             print(f"  Key: {item['key']}")
             print(f"  Missing: {', '.join(item['missing'])}\n")
-        sys.exit(1)
+        return 1
 
     print(f"✅ All strings are properly translated in {file_path}")
-    sys.exit(0)
+    return 0
+
+
+if __name__ == "__main__":
+    parser = catalog_argument_parser("Check for untranslated strings.")
+    parser.add_argument("--base", metavar="REV", help="only check keys changed since this git revision")
+    args = parser.parse_args()
 
+    if args.all:
+        sys.exit(run_catalogs(check_catalog, discover_catalogs(), args.base, jobs=args.jobs))
+    sys.exit(check_catalog(args.file, args.base))
\ No newline at end of file
@@ -8,6 +8,8 @@ set -euo pipefail
 #   KEYCHAIN_DB (optional)
 #   ENTITLEMENTS_PATH (optional; default FlowDown/Resources/Entitlements/Entitlements-Catalyst.entitlements)
 #   EMBED_PROVISION_PROFILE (optional .provisionprofile to embed)
+#   SIGN_JOBS (optional; concurrent codesign processes per level, default: CPU count)
+#   RESIGN_MANIFEST (optional; scan manifest reused across re-signs of the same bundle)
 # Usage:
 #   ./codesign-macos.sh /path/to/FlowDown.app
 
@@ -51,11 +53,26 @@ if [[ ! -f "$SCANNER" ]]; then
   exit 1
 fi
 
-FILE_CANDIDATES=()
-while IFS= read -r line; do
-  FILE_CANDIDATES+=("$line")
-done < <(python3 "$SCANNER" "$APP_PATH")
-echo "[*] found ${#FILE_CANDIDATES[@]} candidates to sign"
+# The scanner emits signing levels: NUL-terminated paths, with an empty record
+# closing each level. Everything in a level only contains already signed items.
+SCAN_ARGS=(--plan nul)
+if [[ -n "${RESIGN_MANIFEST:-}" ]]; then
+  SCAN_ARGS+=(--manifest "$RESIGN_MANIFEST")
+fi
+SIGN_PLAN=()
+CANDIDATE_COUNT=0
+LEVEL_COUNT=0
+while IFS= read -r -d '' line; do
+  SIGN_PLAN+=("$line")
+  if [[ -z "$line" ]]; then
+    LEVEL_COUNT=$((LEVEL_COUNT + 1))
+  else
+    CANDIDATE_COUNT=$((CANDIDATE_COUNT + 1))
+  fi
+done < <(python3 "$SCANNER" "${SCAN_ARGS[@]}" "$APP_PATH")
+echo "[*] found ${CANDIDATE_COUNT} candidates to sign in ${LEVEL_COUNT} levels"
+
+SIGN_JOBS="${SIGN_JOBS:-$(sysctl -n hw.ncpu 2>/dev/null || echo 4)}"
 
 sign_item() {
   local item_path="$1"
@@ -80,9 +97,28 @@ sign_item() {
   /usr/bin/codesign "${args[@]}" "$item_path" || true
 }
 
-for ITEM in "${FILE_CANDIDATES[@]}"; do
-  sign_item "$ITEM"
+RUNNING=0
+for ITEM in "${SIGN_PLAN[@]}"; do
+  if [[ -z "$ITEM" ]]; then
+    # End of a level: the next one contains these items.
+    wait
+    RUNNING=0
+    continue
+  fi
+  sign_item "$ITEM" &
+  RUNNING=$((RUNNING + 1))
+  if (( RUNNING >= SIGN_JOBS )); then
+    wait
+    RUNNING=0
+  fi
 done
+wait
+
+if [[ -n "${RESIGN_MANIFEST:-}" ]]; then
+  # codesign rewrote the signed binaries; record their new stat so the next
+  # scan of this bundle trusts the manifest instead of reopening them.
+  printf '%s\0' "${SIGN_PLAN[@]}" | python3 "${SCRIPT_DIR}/bundle_manifest.py" refresh "$RESIGN_MANIFEST"
+fi
 
 echo "[*] verifying..."
 VERIFY_ARGS=(--verify --deep --strict)
@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+"""
+One entry point for the DevKit scripts.
+
+    python3 devkit.py COMMAND [args...]
+
+Each command runs an existing script as if it were started directly, with
+the same options and exit codes, and only that script's modules are
+imported. The scripts keep their paths, so codesign-macos.sh, the
+workflows and direct invocations are unaffected.
+
+`devkit.py startup` measures the import time of commands with
+-X importtime and fails when a common command exceeds its budget, so new
+tools can't quietly slow down the hooks.
+"""
+
+import os
+import sys
+import types
+
+SCRIPTS_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Command → (script, summary). Scripts are only loaded when their command runs.
+COMMANDS = {
+    "check": ("check_translations.py", "report incomplete translations and prune stale keys"),
+    "untranslated": ("check_untranslated.py", "report missing or empty target languages"),
+    "update": ("update_missing_i18n.py", "fill English anchors, apply NEW_STRINGS or import vendor files"),
+    "pipeline": ("i18n_pipeline.py", "prune, update and check with one load and one save"),
+    "placeholders": ("check_placeholders.py", "compare format placeholders across languages"),
+    "find-keys": ("find_inconsistent_keys.py", "list keys that differ from their English value"),
+    "fix-keys": ("fix_inconsistent_keys.py", "rename keys to match their English value"),
+    "usage": ("check_string_usage.py", "report unused and missing keys against Swift sources"),
+    "exchange": ("translation_exchange.py", "export vendor work packages"),
+    "memory": ("translation_memory.py", "query the translation memory"),
+    "lookup": ("xcstrings_lazy.py", "show keys in every language"),
+    "watch": ("watch_i18n.py", "re-check a catalog whenever it is saved"),
+    "store": ("i18n_store.py", "import, export and query catalogs in SQLite"),
+    "bench": ("benchmark_i18n.py", "benchmark the i18n pipeline"),
+    "resign-scan": ("apple-resign-scan.py", "list Mach-O binaries in a bundle to re-sign"),
+    "select-xcode": ("select_newest_xcode.py", "switch to the newest installed Xcode"),
+}
+
+# Import budget in milliseconds for the commands hooks and CI run often.
+STARTUP_BUDGET_MS = {
+    "check": 75,
+    "untranslated": 75,
+    "update": 75,
+    "pipeline": 75,
+    "find-keys": 75,
+    "fix-keys": 75,
+    "resign-scan": 75,
+    "select-xcode": 75,
+}
+
+
+def print_usage(out=sys.stdout) -> None:
+    print("usage: devkit.py COMMAND [args...]\n\ncommands:", file=out)
+    for name, (_, summary) in COMMANDS.items():
+        print(f"  {name:<14} {summary}", file=out)
+    print(f"  {'startup':<14} check the import time of commands against their budget", file=out)
+
+
+def run(command: str, args: list) -> None:
+    """Run a command's script as __main__ with args; its sys.exit ends the process."""
+    script = os.path.join(SCRIPTS_DIR, COMMANDS[command][0])
+    with open(script, "rb") as f:
+        code = compile(f.read(), script, "exec")
+    # A fresh __main__ like `python3 script.py` gets; runpy would add ~15 ms of imports.
+    # Process pools started with spawn re-run the script through its __file__.
+    module = types.ModuleType("__main__")
+    module.__file__ = script
+    module.__builtins__ = __builtins__
+    sys.modules["__main__"] = module
+    sys.argv = [script, *args]
+    exec(code, module.__dict__)
+
+
+def import_time_ms(argv: list, repeat: int) -> tuple:
+    """
+    Return (best total ms, {module: cumulative ms}) of the imports argv triggers.
+
+    The total sums the top-level imports reported by -X importtime, taking
+    the fastest of repeat runs to keep scheduler noise out.
+    """
+    import subprocess
+
+    best = None
+    for _ in range(repeat):
+        result = subprocess.run(
+            [sys.executable, "-X", "importtime", *argv],
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.PIPE,
+            text=True,
+            check=False,
+        )
+        modules = {}
+        for line in result.stderr.splitlines():
+            if not line.startswith("import time:") or "|" not in line:
+                continue
+            _, cumulative, name = line.split("|", 2)
+            if name.strip() and not name[1:].startswith(" ") and cumulative.strip().isdigit():
+                modules[name.strip()] = int(cumulative) / 1000
+        total = sum(modules.values())
+        if best is None or total < best[0]:
+            best = (total, modules)
+    return best
+
+
+def startup(args: list) -> int:
+    import argparse
+
+    parser = argparse.ArgumentParser(prog="devkit.py startup", description="Check command import times.")
+    parser.add_argument("commands", nargs="*", help="commands to measure (default: those with a budget)")
+    parser.add_argument("--repeat", type=int, default=5, help="runs per command; the fastest counts")
+    parser.add_argument("--top", type=int, default=3, help="heaviest imports to list per command")
+    options = parser.parse_args(args)
+
+    unknown = [name for name in options.commands if name not in COMMANDS]
+    if unknown:
+        print(f"❌ Unknown commands: {', '.join(unknown)}")
+        return 1
+    baseline, baseline_modules = import_time_ms(["-c", "pass"], options.repeat)
+    print(f"⏱️ Interpreter startup imports: {baseline:.1f} ms (not counted)")
+
+    over = []
+    for name in options.commands or list(STARTUP_BUDGET_MS):
+        total, modules = import_time_ms([os.path.abspath(__file__), name, "--help"], options.repeat)
+        own = {module: ms for module, ms in modules.items() if module not in baseline_modules}
+        spent = sum(own.values())
+        budget = STARTUP_BUDGET_MS.get(name)
+        heaviest = ", ".join(
+            f"{module} {ms:.1f}" for module, ms in sorted(own.items(), key=lambda item: -item[1])[: options.top]
+        )
+        if budget is None:
+            status = "  "
+        elif spent > budget:
+            status = "❌"
+            over.append(name)
+        else:
+            status = "✅"
+        limit = f"/{budget}" if budget is not None else ""
+        print(f"{status} {name:<14} {spent:6.1f}{limit} ms  ({heaviest})")
+    if over:
+        print(f"\n❌ Over the startup budget: {', '.join(over)}")
+        return 1
+    return 0
+
+
+def main() -> int:
+    args = sys.argv[1:]
+    if not args or args[0] in ("-h", "--help"):
+        print_usage()
+        return 0
+    command, rest = args[0], args[1:]
+    if command == "startup":
+        return startup(rest)
+    if command not in COMMANDS:
+        print(f"❌ Unknown command: {command}\n", file=sys.stderr)
+        print_usage(sys.stderr)
+        return 1
+    run(command, rest)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
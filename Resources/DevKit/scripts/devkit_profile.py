@@ -0,0 +1,182 @@
+#!/usr/bin/env python3
+"""
+Opt-in timing and profiling for the DevKit scripts.
+
+Code marks phases with `with devkit_profile.phase("name"):` and counts work
+with `devkit_profile.count("bytes_read", n)`. Both are no-ops unless
+profiling is enabled, by the environment or by the --profile and
+--profile-output options that add_arguments() installs. When enabled, a
+per-phase summary (calls, wall and CPU time, counters) is printed to stderr
+at exit, and the run can be dumped as a cProfile stats file (.pstats,
+.prof) or as a Chrome trace (.json) for chrome://tracing or Perfetto.
+
+Environment:
+    FLOWDOWN_PROFILE=1              print the phase summary
+    FLOWDOWN_PROFILE_OUTPUT=PATH    also dump pstats or a Chrome trace
+
+Phases in --all worker processes are not recorded; use --jobs 1 to profile
+every catalog in one process.
+"""
+
+import argparse
+import atexit
+import contextlib
+import json
+import os
+import sys
+import threading
+import time
+from typing import Any, Dict, Iterator, List, Optional
+
+enabled = False
+
+_output: Optional[str] = None
+_profiler = None
+_events: List[Dict[str, Any]] = []
+_stack: List[Dict[str, Any]] = []
+_totals: Dict[str, int] = {}
+_origin = 0.0
+_NULL = contextlib.nullcontext()
+
+
+def enable(output: Optional[str] = None) -> None:
+    """Start recording; output selects a .pstats/.prof or Chrome trace .json dump."""
+    global enabled, _output, _profiler, _origin
+    if output:
+        _output = output
+    if _output and _output.endswith((".pstats", ".prof")) and _profiler is None:
+        import cProfile
+
+        _profiler = cProfile.Profile()
+        _profiler.enable()
+    if enabled:
+        return
+    enabled = True
+    _origin = time.perf_counter()
+    atexit.register(_finish)
+
+
+def phase(name: str, **counters: int):
+    """Context manager timing a phase; counters are attached to it."""
+    if not enabled:
+        return _NULL
+    return _phase(name, counters)
+
+
+@contextlib.contextmanager
+def _phase(name: str, counters: Dict[str, int]) -> Iterator[None]:
+    event: Dict[str, Any] = {"name": name, "counters": dict(counters)}
+    _stack.append(event)
+    wall = time.perf_counter()
+    cpu = time.process_time()
+    try:
+        yield
+    finally:
+        event["start"] = wall - _origin
+        event["wall"] = time.perf_counter() - wall
+        event["cpu"] = time.process_time() - cpu
+        event["depth"] = len(_stack) - 1
+        _stack.pop()
+        _events.append(event)
+
+
+def count(name: str, value: int = 1) -> None:
+    """Add value to a counter, for the whole run and for the innermost phase."""
+    if not enabled:
+        return
+    _totals[name] = _totals.get(name, 0) + value
+    if _stack:
+        counters = _stack[-1]["counters"]
+        counters[name] = counters.get(name, 0) + value
+
+
+class _EnableAction(argparse.Action):
+    def __call__(self, parser, namespace, values, option_string=None):
+        setattr(namespace, self.dest, values if values is not None else True)
+        enable(values if isinstance(values, str) else None)
+
+
+def add_arguments(parser: argparse.ArgumentParser) -> None:
+    """Add --profile and --profile-output; profiling starts as they are parsed."""
+    group = parser.add_argument_group("profiling")
+    group.add_argument(
+        "--profile",
+        action=_EnableAction,
+        nargs=0,
+        default=False,
+        help="print per-phase wall/CPU time and counters to stderr",
+    )
+    group.add_argument(
+        "--profile-output",
+        action=_EnableAction,
+        metavar="PATH",
+        help="also write a cProfile dump (.pstats, .prof) or a Chrome trace (.json)",
+    )
+
+
+def _summary() -> List[str]:
+    phases: Dict[str, Dict[str, Any]] = {}
+    for event in _events:
+        row = phases.setdefault(event["name"], {"calls": 0, "wall": 0.0, "cpu": 0.0, "counters": {}})
+        row["calls"] += 1
+        row["wall"] += event["wall"]
+        row["cpu"] += event["cpu"]
+        for name, value in event["counters"].items():
+            row["counters"][name] = row["counters"].get(name, 0) + value
+
+    total = time.perf_counter() - _origin
+    lines = [f"⏱️ Profile of {os.path.basename(sys.argv[0]) or 'python'}: {total * 1000:.1f} ms wall"]
+    lines.append(f"  {'phase':<28} {'calls':>5} {'wall ms':>10} {'cpu ms':>10}  counters")
+    for name, row in phases.items():
+        counters = " ".join(f"{key}={value}" for key, value in sorted(row["counters"].items()))
+        lines.append(
+            f"  {name:<28} {row['calls']:>5} {row['wall'] * 1000:>10.1f} {row['cpu'] * 1000:>10.1f}  {counters}"
+        )
+    if _totals:
+        lines.append("  totals: " + " ".join(f"{key}={value}" for key, value in sorted(_totals.items())))
+    return lines
+
+
+def _chrome_trace() -> Dict[str, Any]:
+    pid = os.getpid()
+    tid = threading.get_ident()
+    events = [
+        {
+            "name": event["name"],
+            "ph": "X",
+            "ts": event["start"] * 1e6,
+            "dur": event["wall"] * 1e6,
+            "pid": pid,
+            "tid": tid,
+            "args": dict(event["counters"], cpu_ms=round(event["cpu"] * 1000, 3)),
+        }
+        for event in _events
+    ]
+    return {"traceEvents": events, "displayTimeUnit": "ms", "otherData": {"totals": _totals}}
+
+
+def _finish() -> None:
+    for line in _summary():
+        print(line, file=sys.stderr)
+    if not _output:
+        return
+    try:
+        if _profiler is not None:
+            _profiler.disable()
+            _profiler.dump_stats(_output)
+        elif _output.endswith(".json"):
+            with open(_output, "w", encoding="utf-8") as f:
+                json.dump(_chrome_trace(), f)
+        else:
+            print(f"⚠️ Unknown profile format for {_output}; use .pstats, .prof or .json", file=sys.stderr)
+            return
+    except OSError as e:
+        print(f"⚠️ Could not write profile to {_output}: {e}", file=sys.stderr)
+        return
+    print(f"  written to {_output}", file=sys.stderr)
+
+
+if os.environ.get("FLOWDOWN_PROFILE_OUTPUT"):
+    enable(os.environ["FLOWDOWN_PROFILE_OUTPUT"])
+elif os.environ.get("FLOWDOWN_PROFILE", "0") not in ("", "0"):
+    enable()
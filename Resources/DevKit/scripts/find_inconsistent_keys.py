@@ -7,40 +7,13 @@ import json
 import sys
 from pathlib import Path
 
+from i18n_tools import find_inconsistent_keys as audit_inconsistent_keys
+from i18n_tools import load_strings
+
 
 def find_inconsistent_keys(xcstrings_path):
     """Find entries where key != English value."""
-    with open(xcstrings_path, 'r', encoding='utf-8') as f:
-        data = json.load(f)
-    
-    inconsistent = []
-    
-    for key, entry in data.get('strings', {}).items():
-        # Skip special entries
-        if 'shouldTranslate' in entry and not entry['shouldTranslate']:
-            continue
-        
-        localizations = entry.get('localizations', {})
-        en_value = None
-        
-        # Get English value
-        if 'en' in localizations:
-            en_unit = localizations['en'].get('stringUnit', {})
-            en_value = en_unit.get('value')
-        
-        # If there's no explicit English localization, the key is the English value
-        if en_value is None:
-            continue
-        
-        # Check if key matches English value
-        if key != en_value:
-            inconsistent.append({
-                'key': key,
-                'en_value': en_value,
-                'has_zh': 'zh-Hans' in localizations
-            })
-    
-    return inconsistent
+    return audit_inconsistent_keys(load_strings(str(xcstrings_path)))
 
 
 def main():
@@ -2,78 +2,72 @@
 """
 Fix localization entries where the key doesn't match the English translation.
 Updates the key to match the English value.
+
+Renames can also come from a JSON mapping file (--mapping), either
+{"old": "new"} or the key_mapping.json this script writes. Renames whose
+target already exists, or that share a target, are reported and skipped;
+the script exits 1 when any rename was skipped.
 """
 
+import argparse
 import json
 import sys
 from pathlib import Path
 
+import devkit_profile
+from i18n_tools import catalog_lock, load_key_mapping, load_strings, plan_key_fixes, rename_keys, save_strings
+
 
-def fix_inconsistent_keys(xcstrings_path, dry_run=False):
-    """Fix entries where key != English value by updating the key."""
-    with open(xcstrings_path, 'r', encoding='utf-8') as f:
-        data = json.load(f)
+def fix_inconsistent_keys(xcstrings_path, dry_run=False, renames=None):
+    """
+    Fix entries where key != English value by updating the key.
+
+    Returns (fixed, skipped): the applied renames and the old keys whose
+    rename was refused.
+    """
+    with catalog_lock(str(xcstrings_path)):
+        data = load_strings(str(xcstrings_path))
+        if renames is None:
+            renames = plan_key_fixes(data)
+        result = rename_keys(data, renames)
+        if result['renamed'] and not dry_run:
+            save_strings(str(xcstrings_path), data)
     
-    strings = data.get('strings', {})
-    fixed = []
-    new_strings = {}
+    fixed = [{'old_key': old, 'new_key': new} for old, new in result['renamed']]
+    skipped = [old for old, _, _ in result['collisions']] + result['missing']
     
-    for key, entry in strings.items():
-        # Skip special entries
-        if 'shouldTranslate' in entry and not entry['shouldTranslate']:
-            new_strings[key] = entry
-            continue
-        
-        localizations = entry.get('localizations', {})
-        en_value = None
-        
-        # Get English value
-        if 'en' in localizations:
-            en_unit = localizations['en'].get('stringUnit', {})
-            en_value = en_unit.get('value')
-        
-        # If there's no explicit English localization, keep original key
-        if en_value is None:
-            new_strings[key] = entry
-            continue
-        
-        # Check if key matches English value
-        if key != en_value:
-            # Use English value as the new key
-            new_strings[en_value] = entry
-            fixed.append({
-                'old_key': key,
-                'new_key': en_value
-            })
-        else:
-            new_strings[key] = entry
+    for old, new, reason in result['collisions']:
+        print(f"⚠️ Skipped {old[:70]!r} → {new[:70]!r}: {reason}")
+    for old in result['missing']:
+        print(f"⚠️ Skipped {old[:70]!r}: key not found")
+    for cycle in result['cycles']:
+        print(f"🔁 Renaming in a cycle: {' → '.join(repr(key[:40]) for key in cycle)}")
     
+    if skipped:
+        print(f"⚠️ Skipped {len(skipped)} of {len(renames)} renames\n")
     if not fixed:
-        print("✅ All keys already match their English translations!")
-        return []
+        if not skipped:
+            print("✅ All keys already match their English translations!")
+        return [], skipped
     
     if not dry_run:
-        # Update the data
-        data['strings'] = new_strings
-        
-        # Write back to file
-        with open(xcstrings_path, 'w', encoding='utf-8') as f:
-            json.dump(data, f, ensure_ascii=False, indent=2)
-        
         print(f"✅ Fixed {len(fixed)} entries in {xcstrings_path}")
     else:
         print(f"🔍 DRY RUN: Would fix {len(fixed)} entries")
     
-    return fixed
+    return fixed, skipped
 
 
 def main():
-    if len(sys.argv) < 2:
-        print("Usage: python3 fix_inconsistent_keys.py <path_to_Localizable.xcstrings> [--dry-run]")
-        sys.exit(1)
+    parser = argparse.ArgumentParser(description="Rename keys to match their English value.")
+    parser.add_argument('path', help="path to Localizable.xcstrings")
+    parser.add_argument('--dry-run', action='store_true')
+    parser.add_argument('--mapping', help="JSON file with the renames to apply instead")
+    devkit_profile.add_arguments(parser)
+    args = parser.parse_args()
     
-    xcstrings_path = Path(sys.argv[1])
-    dry_run = '--dry-run' in sys.argv
+    xcstrings_path = Path(args.path)
+    dry_run = args.dry_run
     
     if not xcstrings_path.exists():
         print(f"Error: File not found: {xcstrings_path}")
@@ -81,7 +75,8 @@ def main():
     
     print(f"{'[DRY RUN] ' if dry_run else ''}Fixing: {xcstrings_path}\n")
     
-    fixed = fix_inconsistent_keys(xcstrings_path, dry_run)
+    renames = load_key_mapping(args.mapping) if args.mapping else None
+    fixed, skipped = fix_inconsistent_keys(xcstrings_path, dry_run, renames)
     
     if fixed:
         print(f"\nFixed {len(fixed)} entries:")
@@ -99,8 +94,10 @@ def main():
             with open(mapping_file, 'w', encoding='utf-8') as f:
                 json.dump(fixed, f, ensure_ascii=False, indent=2)
             print(f"\n\nKey mapping saved to: {mapping_file}")
+    
+    if skipped:
+        sys.exit(1)
 
 
 if __name__ == '__main__':
     main()
-
@@ -0,0 +1,251 @@
+#!/usr/bin/env python3
+"""
+On-disk parse cache for .xcstrings catalogs.
+
+Decoding the main catalog dominates the runtime of the localization scripts,
+so the decoded document is kept as a marshal blob under .build/i18n-cache.
+Entries are validated against the catalog's size and mtime, and fall back
+to a content hash when the stat information no longer matches (checkouts,
+touch). The cache is an accelerator only: any problem reading or writing it
+silently falls back to parsing the file.
+
+Other values computed from a catalog file, such as the entry index of the
+incremental audits, are validated the same way under their own kind.
+Derived values, such as the findings for a git revision of a catalog, are
+kept next to the documents with remember() and recall().
+
+Environment:
+    FLOWDOWN_I18N_CACHE=0      disable the cache
+    FLOWDOWN_I18N_CACHE_DIR    override the cache directory
+"""
+
+import hashlib
+import marshal
+import os
+import struct
+import sys
+import tempfile
+import time
+from typing import Any, Callable, Optional, Tuple
+
+import devkit_profile
+
+# Bump when the payload layout changes; marshal itself is tied to the interpreter.
+CACHE_FORMAT = 1
+CACHE_MAX_BYTES = 16 * 1024 * 1024
+
+# Stat data is only trusted when the catalog is older than this at write time,
+# so an edit landing within the same mtime tick can't be mistaken for a hit.
+RACY_WINDOW_SECONDS = 2.0
+
+_CACHE_TAG = (CACHE_FORMAT, marshal.version, sys.version_info[:2])
+_HEADER_SIZE = struct.Struct("<I")
+
+
+def cache_enabled() -> bool:
+    return os.environ.get("FLOWDOWN_I18N_CACHE", "1") != "0"
+
+
+def cache_dir() -> str:
+    """Return the cache directory, .build/i18n-cache at the project root by default."""
+    override = os.environ.get("FLOWDOWN_I18N_CACHE_DIR")
+    if override:
+        return os.path.abspath(override)
+    return os.path.abspath(
+        os.path.join(os.path.dirname(__file__), "..", "..", "..", ".build", "i18n-cache")
+    )
+
+
+def _entry_path(file_path: str, kind: str = "document") -> str:
+    source = os.path.abspath(file_path)
+    if kind != "document":
+        source = f"{kind}:{source}"
+    name = hashlib.sha256(source.encode("utf-8")).hexdigest()[:32]
+    return os.path.join(cache_dir(), f"{name}.marshal")
+
+
+def _stat_key(st: os.stat_result) -> Optional[Tuple[int, int]]:
+    if time.time() - st.st_mtime < RACY_WINDOW_SECONDS:
+        return None
+    return (st.st_size, st.st_mtime_ns)
+
+
+def _read_entry(entry_path: str):
+    """Return (header, payload bytes) or None when the entry is absent or unusable."""
+    try:
+        with open(entry_path, "rb") as handle:
+            blob = handle.read()
+        (header_size,) = _HEADER_SIZE.unpack_from(blob)
+        offset = _HEADER_SIZE.size + header_size
+        header = marshal.loads(blob[_HEADER_SIZE.size:offset])
+    except (OSError, EOFError, ValueError, TypeError, struct.error):
+        return None
+    if not isinstance(header, tuple) or len(header) != 3 or header[0] != _CACHE_TAG:
+        return None
+    return header, memoryview(blob)[offset:]
+
+
+def _write_entry(entry_path: str, stat_key, digest: bytes, data: Any) -> None:
+    directory = os.path.dirname(entry_path)
+    header = marshal.dumps((_CACHE_TAG, stat_key, digest))
+    try:
+        payload = marshal.dumps(data)
+        if len(payload) > CACHE_MAX_BYTES:
+            # Eviction would drop it right away; leave the previous entry alone.
+            return
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as handle:
+                handle.write(_HEADER_SIZE.pack(len(header)))
+                handle.write(header)
+                handle.write(payload)
+            os.replace(tmp_path, entry_path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+        evict(CACHE_MAX_BYTES)
+    except (OSError, ValueError):
+        pass
+
+
+def evict(max_bytes: int) -> None:
+    """Drop least recently used entries until the cache fits into max_bytes."""
+    directory = cache_dir()
+    try:
+        names = os.listdir(directory)
+    except OSError:
+        return
+
+    entries = []
+    total = 0
+    for name in names:
+        if not name.endswith(".marshal"):
+            continue
+        path = os.path.join(directory, name)
+        try:
+            st = os.stat(path)
+        except OSError:
+            continue
+        entries.append((st.st_mtime, st.st_size, path))
+        total += st.st_size
+
+    entries.sort()
+    for _, size, path in entries:
+        if total <= max_bytes:
+            break
+        try:
+            os.unlink(path)
+            total -= size
+        except OSError:
+            pass
+
+
+def load(file_path: str, decode: Callable[[bytes], Any], kind: str = "document") -> Any:
+    """
+    Return the decoded catalog at file_path, served from the cache when valid.
+
+    decode turns the raw file bytes into the document on a miss; its
+    exceptions propagate, as do errors opening the catalog itself. Other
+    values computed from the whole file are cached under their own kind.
+    """
+    if not cache_enabled():
+        with open(file_path, "rb") as f:
+            raw = f.read()
+        devkit_profile.count("bytes_read", len(raw))
+        return decode(raw)
+
+    st = os.stat(file_path)
+    entry_path = _entry_path(file_path, kind)
+    entry = _read_entry(entry_path)
+    raw = None
+
+    if entry is not None:
+        (_, stat_key, digest), payload = entry
+        hit = stat_key is not None and stat_key == (st.st_size, st.st_mtime_ns)
+        if not hit:
+            with open(file_path, "rb") as f:
+                raw = f.read()
+            devkit_profile.count("bytes_read", len(raw))
+            hit = hashlib.sha256(raw).digest() == digest
+        if hit:
+            try:
+                data = marshal.loads(payload)
+            except (EOFError, ValueError, TypeError):
+                data = None
+            if data is not None:
+                devkit_profile.count("cache_hits")
+                if raw is not None:
+                    # Content matched but stat didn't: refresh the fast path.
+                    _write_entry(entry_path, _stat_key(st), digest, data)
+                else:
+                    _touch(entry_path)
+                return data
+
+    if raw is None:
+        with open(file_path, "rb") as f:
+            raw = f.read()
+        devkit_profile.count("bytes_read", len(raw))
+    devkit_profile.count("cache_misses")
+    data = decode(raw)
+    _write_entry(entry_path, _stat_key(st), hashlib.sha256(raw).digest(), data)
+    return data
+
+
+def store(file_path: str, data: Any, digest: Optional[bytes] = None) -> None:
+    """
+    Record data as the decoded form of file_path, e.g. right after saving it.
+
+    Pass the SHA-256 of the bytes just written to avoid reading them back.
+    """
+    if not cache_enabled():
+        return
+    try:
+        st = os.stat(file_path)
+        if digest is None:
+            with open(file_path, "rb") as f:
+                digest = hashlib.sha256(f.read()).digest()
+    except OSError:
+        return
+    _write_entry(_entry_path(file_path), _stat_key(st), digest, data)
+
+
+def _touch(entry_path: str) -> None:
+    try:
+        os.utime(entry_path)
+    except OSError:
+        pass
+
+
+def _value_path(name: str) -> str:
+    return os.path.join(cache_dir(), f"{hashlib.sha256(name.encode('utf-8')).hexdigest()[:32]}.marshal")
+
+
+def recall(name: str) -> Any:
+    """
+    Return the value stored under name with remember(), or None.
+
+    Meant for results derived from content that never changes, like the
+    audit of a git blob, so name should contain that content's digest.
+    """
+    if not cache_enabled():
+        return None
+    entry = _read_entry(_value_path(name))
+    if entry is None:
+        return None
+    (_, _, digest), payload = entry
+    if digest != hashlib.sha256(name.encode("utf-8")).digest():
+        return None
+    try:
+        value = marshal.loads(payload)
+    except (EOFError, ValueError, TypeError):
+        return None
+    devkit_profile.count("cache_hits")
+    _touch(_value_path(name))
+    return value
+
+
+def remember(name: str, value: Any) -> None:
+    """Store a marshal-able value under name for recall()."""
+    if cache_enabled():
+        _write_entry(_value_path(name), None, hashlib.sha256(name.encode("utf-8")).digest(), value)
@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+Run the localization maintenance steps on a catalog in one process.
+
+Replaces running update_missing_i18n.py, check_translations.py and
+check_untranslated.py one after another: the catalog is loaded once, then
+    1. stale keys are pruned
+    2. NEW_STRINGS are merged (main catalog only)
+    3. missing English anchors are filled
+    4. the result is saved once, atomically, only if something changed
+    5. completeness and untranslated checks run in a single audit pass
+An advisory lock is held from load to audit, so concurrent hooks on the
+same catalog wait for each other instead of overwriting each other's edits.
+
+With --base REV the checks only look at keys changed since that git
+revision and keys already failing there. --all runs the pipeline for every
+catalog in parallel.
+Exit codes:
+    0 - All strings are complete and translated
+    1 - Found incomplete or untranslated strings (or file errors)
+"""
+
+import sys
+from typing import Dict, Optional
+
+from i18n_tools import (
+    DEFAULT_KEEP_LANGUAGES,
+    UNTRANSLATED_EXCEPTIONS,
+    audit_since,
+    catalog_argument_parser,
+    catalog_lock,
+    discover_catalogs,
+    is_default_catalog,
+    load_strings,
+    print_update_summary,
+    prune_stale_strings,
+    run_catalogs,
+    save_strings,
+    update_missing_translations,
+)
+from update_missing_i18n import NEW_STRINGS
+
+
+def run_pipeline(
+    file_path: str,
+    new_strings: Optional[Dict[str, Dict[str, str]]] = None,
+    base: Optional[str] = None,
+) -> int:
+    with catalog_lock(file_path):
+        data = load_strings(file_path)
+        removed = prune_stale_strings(data)
+        counts = update_missing_translations(
+            data,
+            new_strings=new_strings,
+            keep_languages=DEFAULT_KEEP_LANGUAGES,
+        )
+        written = save_strings(file_path, data)
+        # Audited after the save: incremental runs compare the file's bytes with the base.
+        results = audit_since(
+            file_path,
+            data,
+            base,
+            checks=["incomplete", "untranslated"],
+            clean_stale=True,
+            target_langs=DEFAULT_KEEP_LANGUAGES,
+            exceptions=UNTRANSLATED_EXCEPTIONS,
+        )
+
+    if removed:
+        print("Removed stale strings:")
+        for key in removed:
+            print(f"  - {key}")
+    print_update_summary(file_path, counts)
+    print(f"💾 {'Saved' if written else 'No changes to'} {file_path}\n")
+
+    languages, incomplete = results["incomplete"]
+    untranslated = results["untranslated"]
+    print(f"Found languages: {', '.join(languages)}")
+    print(f"Total strings: {len(data['strings'])}")
+    if incomplete:
+        print(f"\n❌ Incomplete translations in {file_path}:")
+        for key, lang, reason in incomplete:
+            print(f"  {key} - {lang}: {reason}")
+    if untranslated:
+        print(f"\n❌ Found {len(untranslated)} untranslated strings in {file_path}:")
+        for item in untranslated:
+            print(f"  {item['key']} - missing: {', '.join(item['missing'])}")
+    if incomplete or untranslated:
+        return 1
+
+    print(f"✅ All strings are complete and translated in {file_path}")
+    return 0
+
+
+def run_project_pipeline(file_path: str, base: Optional[str] = None) -> int:
+    main_catalog = is_default_catalog(file_path)
+    return run_pipeline(file_path, NEW_STRINGS if main_catalog else {}, base)
+
+
+if __name__ == "__main__":
+    parser = catalog_argument_parser("Prune, update and check catalogs with one load and one save.")
+    parser.add_argument("--base", metavar="REV", help="only check keys changed since this git revision")
+    args = parser.parse_args()
+
+    if args.all:
+        sys.exit(run_catalogs(run_project_pipeline, discover_catalogs(), args.base, jobs=args.jobs))
+    sys.exit(run_pipeline(args.file, NEW_STRINGS, args.base))
@@ -0,0 +1,517 @@
+#!/usr/bin/env python3
+"""
+SQLite store for .xcstrings catalogs.
+
+Imports a catalog into indexed tables so ad-hoc questions become SQL:
+
+    keys           one row per key: catalog position, shouldTranslate,
+                   extractionState, comment, other fields as JSON, and a
+                   digest of the entry for incremental re-imports
+    localizations  one row per (key, language): the stringUnit's state and
+                   value, and the full localization as JSON when it holds
+                   more than a plain string unit (variations, substitutions)
+    variations     every string unit nested in variations or substitutions,
+                   flattened to a path such as "plural.one" or
+                   "substitutions.count.plural.other"
+    imports        one row per import; cells record the import in which
+                   they last changed (changed_in)
+
+Each catalog has its own store under .build/i18n-store, mirroring the
+catalog's path in the project, and the store records the catalog it was
+imported from. Re-importing only rewrites keys whose entry changed, so
+importing a release tag and then the working tree answers "which zh-Hans
+strings changed since the release?". Export rebuilds the exact document
+and saves it in Xcode's canonical format; it refuses to write a store to
+a different catalog than it was imported from unless --force is given.
+The checks of i18n_tools are available as queries with matching results.
+
+Usage:
+    python3 i18n_store.py [--db PATH] import [file] [--force]
+    python3 i18n_store.py [--db PATH] export [file] [--force]
+    python3 i18n_store.py [--db PATH] check [file]
+    python3 i18n_store.py [--db PATH] sql "SELECT k.key, l.value FROM keys k JOIN localizations l ON l.key_id = k.id
+                                           WHERE l.language = 'de' AND length(l.value) > 40" [file]
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import sqlite3
+import sys
+import time
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from i18n_tools import (
+    DEFAULT_KEEP_LANGUAGES,
+    UNTRANSLATED_EXCEPTIONS,
+    compare_format_signatures,
+    default_file_path,
+    format_signature,
+    load_strings,
+    project_root,
+    save_strings,
+)
+from xcstrings_units import iter_units, plural_fallback
+
+SCHEMA_VERSION = 1
+KEY_FIELDS = ("comment", "extractionState", "localizations")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (name TEXT PRIMARY KEY, value TEXT NOT NULL);
+CREATE TABLE IF NOT EXISTS imports (
+    id INTEGER PRIMARY KEY,
+    source TEXT NOT NULL,
+    imported_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS keys (
+    id INTEGER PRIMARY KEY,
+    key TEXT NOT NULL UNIQUE,
+    position INTEGER NOT NULL,
+    should_translate INTEGER NOT NULL,
+    extraction_state TEXT,
+    comment TEXT,
+    extra TEXT,
+    has_localizations INTEGER NOT NULL,
+    digest BLOB NOT NULL
+);
+CREATE TABLE IF NOT EXISTS localizations (
+    key_id INTEGER NOT NULL REFERENCES keys(id),
+    language TEXT NOT NULL,
+    has_unit INTEGER NOT NULL,
+    state TEXT,
+    value TEXT,
+    raw TEXT,
+    changed_in INTEGER NOT NULL REFERENCES imports(id),
+    PRIMARY KEY (key_id, language)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS variations (
+    key_id INTEGER NOT NULL REFERENCES keys(id),
+    language TEXT NOT NULL,
+    path TEXT NOT NULL,
+    state TEXT,
+    value TEXT,
+    PRIMARY KEY (key_id, language, path)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS keys_position ON keys(position);
+CREATE INDEX IF NOT EXISTS keys_extraction_state ON keys(extraction_state);
+CREATE INDEX IF NOT EXISTS localizations_language_state ON localizations(language, state);
+CREATE INDEX IF NOT EXISTS localizations_changed_in ON localizations(changed_in, language);
+CREATE INDEX IF NOT EXISTS variations_language_state ON variations(language, state);
+"""
+
+# Why a unit is incomplete, as xcstrings_units reports it; {0} is the table alias.
+UNIT_PROBLEM = "CASE WHEN {0}.state IS NOT 'translated' THEN 'state: ' || coalesce({0}.state, 'None') ELSE 'empty value' END"
+
+
+def default_db_path(file_path: str) -> str:
+    """The catalog's own store: .build/i18n-store/<path of the catalog in the project>.sqlite."""
+    root = project_root()
+    relative = os.path.relpath(os.path.abspath(file_path), root)
+    if relative.startswith(os.pardir + os.sep):
+        # Outside the project: keep stores of same-named catalogs apart by their full path.
+        digest = hashlib.sha256(os.path.abspath(file_path).encode("utf-8")).hexdigest()[:16]
+        relative = os.path.join("external", f"{digest}-{os.path.basename(file_path)}")
+    return os.path.join(root, ".build", "i18n-store", os.path.splitext(relative)[0] + ".sqlite")
+
+
+def _blank(value: Optional[str]) -> int:
+    """Python's notion of an empty value, so queries match the dict-based checks."""
+    return int(value is None or not value.strip())
+
+
+def _format_problem(expected: Optional[str], found: Optional[str]) -> Optional[str]:
+    if found is None:
+        return None
+    return compare_format_signatures(format_signature(expected), format_signature(found))
+
+
+def connect(db_path: str) -> sqlite3.Connection:
+    """Open (and create) the store, with the helper SQL functions registered."""
+    directory = os.path.dirname(os.path.abspath(db_path))
+    os.makedirs(directory, exist_ok=True)
+    conn = sqlite3.connect(db_path)
+    conn.executescript(SCHEMA)
+    conn.create_function("blank", 1, _blank, deterministic=True)
+    conn.create_function("format_problem", 2, _format_problem, deterministic=True)
+    conn.create_function("plural_fallback", 1, plural_fallback, deterministic=True)
+    version = conn.execute("SELECT value FROM meta WHERE name = 'schema'").fetchone()
+    if version is None:
+        conn.execute("INSERT INTO meta VALUES ('schema', ?)", (str(SCHEMA_VERSION),))
+        conn.commit()
+    elif int(version[0]) != SCHEMA_VERSION:
+        raise RuntimeError(f"{db_path} uses schema {version[0]}, expected {SCHEMA_VERSION}; delete it to rebuild")
+    return conn
+
+
+def store_source(conn: sqlite3.Connection) -> Optional[str]:
+    """The absolute path of the catalog last imported into the store, or None for an empty store."""
+    row = conn.execute("SELECT value FROM meta WHERE name = 'source'").fetchone()
+    return row[0] if row else None
+
+
+def _entry_digest(entry: Dict[str, Any]) -> bytes:
+    encoded = json.dumps(entry, sort_keys=True, ensure_ascii=False, separators=(",", ":"))
+    return hashlib.sha1(encoded.encode("utf-8")).digest()
+
+
+def _is_plain(loc: Any) -> bool:
+    return (
+        isinstance(loc, dict)
+        and len(loc) == 1
+        and isinstance(loc.get("stringUnit"), dict)
+        and set(loc["stringUnit"]) == {"state", "value"}
+    )
+
+
+def _key_row(key: str, entry: Dict[str, Any], position: int) -> Tuple[Any, ...]:
+    extra = {name: value for name, value in entry.items() if name not in KEY_FIELDS}
+    should_translate = extra.get("shouldTranslate")
+    if isinstance(should_translate, bool):
+        del extra["shouldTranslate"]
+    return (
+        key,
+        position,
+        # 1 translatable by default, 0 explicit false, 2 explicit true; anything else stays in extra
+        0 if should_translate is False else (2 if should_translate is True else 1),
+        entry.get("extractionState"),
+        json.dumps(entry["comment"], ensure_ascii=False) if "comment" in entry else None,
+        json.dumps(extra, ensure_ascii=False) if extra else None,
+        int("localizations" in entry),
+        _entry_digest(entry),
+    )
+
+
+def _cell_row(key_id: int, language: str, loc: Any) -> Tuple[Any, ...]:
+    unit = loc.get("stringUnit") if isinstance(loc, dict) else None
+    unit = unit if isinstance(unit, dict) else None
+    return (
+        key_id,
+        language,
+        int(bool(unit)),
+        unit.get("state") if unit else None,
+        unit.get("value") if unit else None,
+        None if _is_plain(loc) else json.dumps(loc, ensure_ascii=False),
+    )
+
+
+def import_catalog(conn: sqlite3.Connection, data: Dict[str, Any], source: str) -> Dict[str, int]:
+    """
+    Load a decoded catalog into the store in one transaction.
+
+    Keys whose entry is unchanged since the previous import are left alone;
+    changed keys have their rows replaced, and cells keep the import that
+    last changed them. Keys missing from data are removed, so a store holds
+    one catalog; source, the catalog's path, is recorded for export to
+    check. Returns counts of added, changed, removed and unchanged keys.
+    """
+    strings = data["strings"]
+    counts = {"added": 0, "changed": 0, "removed": 0, "unchanged": 0}
+    with conn:
+        import_id = conn.execute(
+            "INSERT INTO imports (source, imported_at) VALUES (?, ?)", (source, time.time())
+        ).lastrowid
+        document = {name: value for name, value in data.items() if name != "strings"}
+        conn.execute("INSERT OR REPLACE INTO meta VALUES ('document', ?)", (json.dumps(document, ensure_ascii=False),))
+        conn.execute("INSERT OR REPLACE INTO meta VALUES ('source', ?)", (source,))
+
+        existing = {key: (key_id, digest) for key_id, key, digest in conn.execute("SELECT id, key, digest FROM keys")}
+        removed = [existing[key][0] for key in existing.keys() - strings.keys()]
+        counts["removed"] = len(removed)
+
+        rewrite: List[Tuple[str, int]] = []
+        positions: List[Tuple[int, int]] = []
+        for position, (key, entry) in enumerate(strings.items()):
+            known = existing.get(key)
+            if known is None:
+                counts["added"] += 1
+                rewrite.append((key, position))
+            elif known[1] != _entry_digest(entry):
+                counts["changed"] += 1
+                rewrite.append((key, position))
+            else:
+                counts["unchanged"] += 1
+                positions.append((position, known[0]))
+
+        # Remember when each cell of a changed key last changed.
+        previous_cells: Dict[Tuple[int, str], Tuple[Tuple[Any, ...], int]] = {}
+        changed_ids = [existing[key][0] for key, _ in rewrite if key in existing]
+        for chunk in _chunks(changed_ids):
+            marks = ",".join("?" * len(chunk))
+            for row in conn.execute(
+                f"SELECT key_id, language, has_unit, state, value, raw, changed_in FROM localizations "
+                f"WHERE key_id IN ({marks})",
+                chunk,
+            ):
+                previous_cells[(row[0], row[1])] = (row[:6], row[6])
+
+        doomed = removed + changed_ids
+        for table, column in (("variations", "key_id"), ("localizations", "key_id"), ("keys", "id")):
+            conn.executemany(f"DELETE FROM {table} WHERE {column} = ?", ((key_id,) for key_id in doomed))
+        conn.executemany("UPDATE keys SET position = ? WHERE id = ?", positions)
+
+        # Changed keys keep their id so cells can be matched with their previous state.
+        conn.executemany(
+            "INSERT INTO keys (id, key, position, should_translate, extraction_state, comment, extra, "
+            "has_localizations, digest) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (
+                (existing[key][0] if key in existing else None,) + _key_row(key, strings[key], position)
+                for key, position in rewrite
+            ),
+        )
+        ids = dict(conn.execute("SELECT key, id FROM keys")) if rewrite else {}
+
+        cells: List[Tuple[Any, ...]] = []
+        nested: List[Tuple[Any, ...]] = []
+        for key, _ in rewrite:
+            key_id = ids[key]
+            for language, loc in (strings[key].get("localizations") or {}).items():
+                row = _cell_row(key_id, language, loc)
+                before = previous_cells.get((key_id, language))
+                cells.append(row + (before[1] if before and before[0] == row else import_id,))
+                if row[5] is not None:
+                    nested.extend(
+                        (key_id, language, path, unit.get("state"), unit.get("value"))
+                        for path, unit in iter_units(loc)
+                        if path
+                    )
+        conn.executemany("INSERT INTO localizations VALUES (?, ?, ?, ?, ?, ?, ?)", cells)
+        conn.executemany("INSERT OR REPLACE INTO variations VALUES (?, ?, ?, ?, ?)", nested)
+    return counts
+
+
+def _chunks(values: List[Any], size: int = 500) -> Iterator[List[Any]]:
+    for start in range(0, len(values), size):
+        yield values[start : start + size]
+
+
+def export_catalog(conn: sqlite3.Connection) -> Dict[str, Any]:
+    """Rebuild the decoded catalog from the store."""
+    row = conn.execute("SELECT value FROM meta WHERE name = 'document'").fetchone()
+    data: Dict[str, Any] = json.loads(row[0]) if row else {"sourceLanguage": "en", "version": "1.0"}
+
+    locs_by_key: Dict[int, Dict[str, Any]] = {}
+    for key_id, language, state, value, raw in conn.execute(
+        "SELECT key_id, language, state, value, raw FROM localizations ORDER BY key_id, language"
+    ):
+        loc = json.loads(raw) if raw is not None else {"stringUnit": {"state": state, "value": value}}
+        locs_by_key.setdefault(key_id, {})[language] = loc
+
+    strings: Dict[str, Any] = {}
+    for key_id, key, should_translate, extraction_state, comment, extra, has_locs in conn.execute(
+        "SELECT id, key, should_translate, extraction_state, comment, extra, has_localizations "
+        "FROM keys ORDER BY position"
+    ):
+        entry: Dict[str, Any] = json.loads(extra) if extra else {}
+        if comment is not None:
+            entry["comment"] = json.loads(comment)
+        if extraction_state is not None:
+            entry["extractionState"] = extraction_state
+        if should_translate != 1:
+            entry["shouldTranslate"] = should_translate == 2
+        if has_locs:
+            entry["localizations"] = locs_by_key.get(key_id, {})
+        strings[key] = entry
+    data["strings"] = strings
+    return data
+
+
+# Checks as queries. Results match the dict-based helpers in i18n_tools.
+
+
+def stale_keys(conn: sqlite3.Connection) -> List[str]:
+    return [key for (key,) in conn.execute("SELECT key FROM keys WHERE extraction_state = 'stale' ORDER BY position")]
+
+
+def find_untranslated(
+    conn: sqlite3.Connection,
+    target_langs: Optional[Iterable[str]] = None,
+    exceptions: Optional[Iterable[str]] = None,
+) -> List[Dict[str, Any]]:
+    langs = sorted(set(target_langs or DEFAULT_KEEP_LANGUAGES))
+    exceptions = set(exceptions or [])
+    rows = conn.execute(
+        f"""
+        WITH targets(language) AS (VALUES {",".join(["(?)"] * len(langs))})
+        SELECT k.key, t.language
+        FROM keys k CROSS JOIN targets t
+        LEFT JOIN localizations l ON l.key_id = k.id AND l.language = t.language
+        WHERE k.should_translate != 0
+          AND (l.key_id IS NULL OR (l.has_unit AND blank(l.value))
+               -- Only localizations kept as raw JSON have nested units.
+               OR (l.raw IS NOT NULL AND (
+                   EXISTS (SELECT 1 FROM variations v
+                           WHERE v.key_id = k.id AND v.language = t.language AND blank(v.value))
+                   OR (NOT l.has_unit AND NOT EXISTS (SELECT 1 FROM variations v
+                                                      WHERE v.key_id = k.id AND v.language = t.language)))))
+        ORDER BY k.position, t.language
+        """,
+        langs,
+    )
+    items: List[Dict[str, Any]] = []
+    for key, language in rows:
+        if key in exceptions:
+            continue
+        if items and items[-1]["key"] == key:
+            items[-1]["missing"].append(language)
+        else:
+            items.append({"key": key, "missing": [language]})
+    return items
+
+
+def find_incomplete(conn: sqlite3.Connection, clean_stale: bool = True) -> Tuple[List[str], List[Tuple[str, str, str]]]:
+    scope = "k.should_translate != 0" + (" AND k.extraction_state IS NOT 'stale'" if clean_stale else "")
+    languages = [
+        language
+        for (language,) in conn.execute(
+            f"SELECT DISTINCT l.language FROM localizations l JOIN keys k ON k.id = l.key_id "
+            f"WHERE {scope} ORDER BY l.language"
+        )
+    ]
+    if not languages:
+        return [], []
+    rows = conn.execute(
+        f"""
+        WITH langs(language) AS (VALUES {",".join(["(?)"] * len(languages))})
+        SELECT key, language, problem FROM (
+            SELECT k.key, k.position, g.language,
+                   -- The first unit with a problem in path order, the top-level one first.
+                   CASE
+                       WHEN l.key_id IS NULL THEN 'missing localization'
+                       WHEN l.has_unit AND (l.state IS NOT 'translated' OR blank(l.value)) THEN {UNIT_PROBLEM.format("l")}
+                       WHEN l.raw IS NULL THEN NULL
+                       ELSE coalesce(
+                           (SELECT {UNIT_PROBLEM.format("v")} || ' (' || v.path || ')'
+                            FROM variations v
+                            WHERE v.key_id = k.id AND v.language = g.language
+                              AND (v.state IS NOT 'translated' OR blank(v.value))
+                            ORDER BY v.path LIMIT 1),
+                           CASE
+                               WHEN NOT l.has_unit AND NOT EXISTS (
+                                   SELECT 1 FROM variations v WHERE v.key_id = k.id AND v.language = g.language
+                               ) THEN 'missing localization'
+                           END)
+                   END AS problem
+            FROM keys k CROSS JOIN langs g
+            LEFT JOIN localizations l ON l.key_id = k.id AND l.language = g.language
+            WHERE {scope}
+              AND (l.key_id IS NULL OR l.raw IS NOT NULL OR l.state IS NOT 'translated' OR blank(l.value))
+        )
+        WHERE problem IS NOT NULL
+        ORDER BY position, language
+        """,
+        languages,
+    )
+    return languages, [tuple(row) for row in rows]
+
+
+def find_inconsistent_keys(conn: sqlite3.Connection) -> List[Dict[str, Any]]:
+    rows = conn.execute(
+        """
+        SELECT k.key, en.value,
+               EXISTS (SELECT 1 FROM localizations z WHERE z.key_id = k.id AND z.language = 'zh-Hans')
+        FROM keys k JOIN localizations en ON en.key_id = k.id AND en.language = 'en'
+        WHERE k.should_translate != 0 AND en.value IS NOT NULL AND en.value != k.key
+        ORDER BY k.position
+        """
+    )
+    return [{"key": key, "en_value": value, "has_zh": bool(has_zh)} for key, value, has_zh in rows]
+
+
+def find_placeholder_problems(conn: sqlite3.Connection) -> List[Tuple[str, str, str]]:
+    rows = conn.execute(
+        """
+        SELECT key, language, problem FROM (
+            SELECT k.key, k.position, l.language, '' AS path,
+                   format_problem(CASE WHEN en.has_unit THEN coalesce(en.value, k.key) ELSE k.key END, l.value) AS problem
+            FROM keys k
+            JOIN localizations l ON l.key_id = k.id AND l.language != 'en'
+            LEFT JOIN localizations en ON en.key_id = k.id AND en.language = 'en'
+            WHERE k.should_translate != 0 AND l.value IS NOT NULL AND l.value != ''
+            UNION ALL
+            -- Nested units compare with the English unit they translate and are skipped without one.
+            SELECT k.key, k.position, v.language, v.path,
+                   format_problem(
+                       CASE WHEN en.key_id IS NOT NULL THEN coalesce(en.value, '') ELSE coalesce(other.value, '') END,
+                       v.value
+                   ) || ' (' || v.path || ')'
+            FROM keys k
+            JOIN variations v ON v.key_id = k.id AND v.language != 'en'
+            LEFT JOIN variations en ON en.key_id = k.id AND en.language = 'en' AND en.path = v.path
+            LEFT JOIN variations other
+                ON other.key_id = k.id AND other.language = 'en' AND other.path = plural_fallback(v.path)
+            WHERE k.should_translate != 0 AND v.value IS NOT NULL AND v.value != ''
+              AND (en.key_id IS NOT NULL OR other.key_id IS NOT NULL)
+        )
+        WHERE problem IS NOT NULL
+        ORDER BY position, language, path
+        """
+    )
+    return [tuple(row) for row in rows]
+
+
+def _check_source(conn: sqlite3.Connection, db_path: str, file_path: str, force: bool) -> bool:
+    """Whether the store may be used for file_path: it holds that catalog, nothing yet, or force is set."""
+    source = store_source(conn)
+    if source is None or force or os.path.abspath(source) == os.path.abspath(file_path):
+        return True
+    print(f"❌ {db_path} holds {source}, not {file_path}; pass --force to use it anyway")
+    return False
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="SQLite store for string catalogs.")
+    parser.add_argument("--db", help="Store location (default: the catalog's store under .build/i18n-store)")
+    commands = parser.add_subparsers(dest="command", required=True)
+    import_parser = commands.add_parser("import", help="Import a catalog, rewriting only changed keys")
+    import_parser.add_argument("file", nargs="?", default=default_file_path())
+    import_parser.add_argument("--force", action="store_true", help="Replace a store imported from another catalog")
+    export_parser = commands.add_parser("export", help="Write the store back to a catalog")
+    export_parser.add_argument("file", nargs="?", default=default_file_path())
+    export_parser.add_argument("--force", action="store_true", help="Write to a catalog other than the imported one")
+    check_parser = commands.add_parser("check", help="Run the untranslated and incomplete checks as queries")
+    check_parser.add_argument("file", nargs="?", default=default_file_path())
+    sql_parser = commands.add_parser("sql", help="Run a query and print the rows as TSV")
+    sql_parser.add_argument("query")
+    sql_parser.add_argument("file", nargs="?", default=default_file_path())
+    args = parser.parse_args()
+
+    db_path = args.db or default_db_path(args.file)
+    conn = connect(db_path)
+    if args.command == "import":
+        if not _check_source(conn, db_path, args.file, args.force):
+            return 1
+        started = time.perf_counter()
+        counts = import_catalog(conn, load_strings(args.file), os.path.abspath(args.file))
+        print(
+            f"✅ Imported {args.file} into {db_path} in {(time.perf_counter() - started) * 1000:.0f} ms: "
+            f"{counts['added']} added, {counts['changed']} changed, {counts['removed']} removed, "
+            f"{counts['unchanged']} unchanged"
+        )
+    elif args.command == "export":
+        if store_source(conn) is None:
+            print(f"❌ {db_path} is empty; import a catalog first")
+            return 1
+        if not _check_source(conn, db_path, args.file, args.force):
+            return 1
+        written = save_strings(args.file, export_catalog(conn))
+        print(f"✅ Exported {db_path} to {args.file}" if written else f"✅ {args.file} is already up to date")
+    elif args.command == "check":
+        untranslated = find_untranslated(conn, DEFAULT_KEEP_LANGUAGES, UNTRANSLATED_EXCEPTIONS)
+        languages, incomplete = find_incomplete(conn)
+        print(f"Languages: {', '.join(languages)}")
+        print(f"Untranslated keys: {len(untranslated)}")
+        print(f"Incomplete cells: {len(incomplete)}")
+        return 1 if untranslated or incomplete else 0
+    elif args.command == "sql":
+        cursor = conn.execute(args.query)
+        if cursor.description:
+            print("\t".join(column[0] for column in cursor.description))
+        for row in cursor:
+            print("\t".join("" if value is None else str(value) for value in row))
+        conn.commit()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
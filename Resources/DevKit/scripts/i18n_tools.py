@@ -6,35 +6,158 @@ These utilities keep the behavior between our translation scripts consistent
 and remove duplication across per-locale entrypoints.
 """
 
+import abc
+import argparse
+import contextlib
+import hashlib
+import io
 import json
 import os
+import re
 import sys
-from typing import Any, Dict, Iterable, List, Optional, Tuple
+from functools import lru_cache
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+import devkit_profile
+import i18n_cache
+import xcstrings_format
+from xcstrings_catalog import Catalog
+from xcstrings_units import (
+    anchor_units,
+    incomplete_reason,
+    is_untranslated,
+    iter_units,
+    set_unit_at,
+    source_unit,
+    unit_at,
+)
 
 # Languages we keep without auto-filling from English
 DEFAULT_KEEP_LANGUAGES = {"ja", "de", "fr", "es", "ko", "zh-Hans"}
 
+# Keys that are format placeholders and never need a translation
+UNTRANSLATED_EXCEPTIONS = {"%@", "%lld"}
+
+# printf-style specifiers as used by String(format:) and String(localized:)
+FORMAT_SPECIFIER = re.compile(
+    r"%(?:(\d+)\$)?[-+#0']*(?:\d+|\*)?(?:\.(?:\d+|\*))?(hh|h|ll|l|q|L|z|t|j)?([@dDiuUxXoOfFeEgGaAcCsSp%])"
+)
+
+# Directories under the project root that never hold our own catalogs
+CATALOG_SEARCH_EXCLUDES = {".build", "Frameworks", "LandingPage", "node_modules"}
+
+
+def project_root() -> str:
+    """Return the absolute path to the repository root."""
+    return os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..", ".."))
+
 
 def default_file_path() -> str:
     """Return the absolute path to FlowDown/Resources/Localizable.xcstrings."""
-    return os.path.abspath(
-        os.path.join(
-            os.path.dirname(__file__),
-            "..",
-            "..",
-            "..",
-            "FlowDown",
-            "Resources",
-            "Localizable.xcstrings",
-        )
-    )
+    return os.path.join(project_root(), "FlowDown", "Resources", "Localizable.xcstrings")
+
+
+def is_default_catalog(file_path: str) -> bool:
+    """Whether file_path is the catalog at default_file_path; neither has to exist."""
+    return os.path.realpath(file_path) == os.path.realpath(default_file_path())
+
+
+def discover_catalogs(root: Optional[str] = None) -> List[str]:
+    """Return every .xcstrings file under the project root, sorted by path."""
+    root = root or project_root()
+    found: List[str] = []
+    for directory, dirs, files in os.walk(root):
+        dirs[:] = [d for d in dirs if not d.startswith(".") and d not in CATALOG_SEARCH_EXCLUDES]
+        found.extend(os.path.join(directory, f) for f in files if f.endswith(".xcstrings"))
+    return sorted(found)
+
+
+def catalog_argument_parser(description: str) -> argparse.ArgumentParser:
+    """Argument parser shared by the per-catalog scripts: one file or --all."""
+    parser = argparse.ArgumentParser(description=description)
+    parser.add_argument("file", nargs="?", default=default_file_path())
+    parser.add_argument("--all", action="store_true", help="process every .xcstrings in the project")
+    parser.add_argument("-j", "--jobs", type=int, default=None, help="worker processes for --all")
+    devkit_profile.add_arguments(parser)
+    return parser
+
+
+def _run_captured(worker: Callable[..., int], file_path: str, args: Tuple[Any, ...]) -> Tuple[int, str]:
+    output = io.StringIO()
+    with contextlib.redirect_stdout(output), contextlib.redirect_stderr(output):
+        try:
+            code = worker(file_path, *args)
+        except SystemExit as exc:
+            code = exc.code if isinstance(exc.code, int) else 1
+        except Exception:
+            # One catalog failing must not take the other reports with it.
+            import traceback
+
+            print(f"❌ Unexpected error while processing {file_path}:")
+            traceback.print_exc(file=output)
+            code = 1
+    return code or 0, output.getvalue()
+
+
+def run_catalogs(
+    worker: Callable[..., int],
+    file_paths: List[str],
+    *args: Any,
+    jobs: Optional[int] = None,
+) -> int:
+    """
+    Run worker(file_path, *args) for each catalog, one per worker process.
+
+    The worker returns an exit code and prints its report; reports, stderr
+    included, are collected and printed as per-file sections in input order.
+    A worker that raises reports its traceback and counts as failed. Returns
+    the combined exit code (non-zero if any catalog failed). The worker must be
+    a module-level function so it can be sent to the pool.
+    """
+    jobs = max(1, min(jobs or os.cpu_count() or 1, len(file_paths)))
+    if jobs == 1:
+        results = [_run_captured(worker, path, args) for path in file_paths]
+    else:
+        # Imported here: the process pool machinery is a large share of startup.
+        from concurrent.futures import ProcessPoolExecutor
+
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            futures = [pool.submit(_run_captured, worker, path, args) for path in file_paths]
+            results = [future.result() for future in futures]
+
+    root = project_root()
+    failed: List[str] = []
+    for path, (code, output) in zip(file_paths, results):
+        name = os.path.relpath(path, root)
+        print(f"==> {name} <==")
+        print(output.rstrip("\n"))
+        print()
+        if code:
+            failed.append(name)
+
+    if failed:
+        print(f"❌ {len(failed)} of {len(file_paths)} catalogs failed: {', '.join(failed)}")
+        return 1
+    print(f"✅ All {len(file_paths)} catalogs OK")
+    return 0
+
+
+def _decode_strings(raw: bytes) -> Dict[str, Any]:
+    return json.loads(raw.decode("utf-8"))
 
 
 def load_strings(file_path: str) -> Dict[str, Any]:
-    """Load the xcstrings JSON with helpful error messages."""
+    """Load the xcstrings JSON with helpful error messages, via the parse cache."""
     try:
-        with open(file_path, "r", encoding="utf-8") as f:
-            return json.load(f)
+        with devkit_profile.phase("load_strings"):
+            data = i18n_cache.load(file_path, _decode_strings)
+            devkit_profile.count("entries", len(data.get("strings", {})))
+            return data
     except FileNotFoundError:
         print(f"❌ File not found: {file_path}")
         sys.exit(1)
@@ -43,16 +166,68 @@ def load_strings(file_path: str) -> Dict[str, Any]:
         sys.exit(1)
 
 
-def save_strings(file_path: str, data: Dict[str, Any]) -> None:
-    """Persist the xcstrings JSON."""
-    with open(file_path, "w", encoding="utf-8") as f:
-        json.dump(
-            data,
-            f,
-            ensure_ascii=False,
-            indent=2,
-            separators=(",", " : "),
-        )
+def load_catalog(file_path: str) -> Catalog:
+    """Load the xcstrings file as a columnar Catalog."""
+    return Catalog.from_data(load_strings(file_path))
+
+
+def _document(data: Any) -> Dict[str, Any]:
+    """The JSON document form of data, which is either that already or a Catalog."""
+    return data.to_data() if isinstance(data, Catalog) else data
+
+
+def save_strings(file_path: str, data: Dict[str, Any]) -> bool:
+    """
+    Persist the xcstrings JSON in Xcode's canonical format.
+
+    Unchanged entries keep their bytes on disk and the write is skipped when
+    nothing changed at all. Accepts a Catalog as well. Returns whether the
+    file was written.
+    """
+    data = _document(data)
+    with devkit_profile.phase("save_strings"):
+        try:
+            with open(file_path, "rb") as f:
+                raw: Optional[bytes] = f.read()
+            devkit_profile.count("bytes_read", len(raw))
+            previous = i18n_cache.load(file_path, _decode_strings)
+        except (OSError, ValueError):
+            raw, previous = None, None
+
+        written = xcstrings_format.write_strings(file_path, data, raw, previous)
+        if written is None:
+            return False
+        digest, order = written
+        if devkit_profile.enabled:
+            devkit_profile.count("bytes_written", os.path.getsize(file_path))
+        strings = data["strings"]
+        # Cache the document in file order so the next save can splice again.
+        i18n_cache.store(file_path, dict(data, strings={key: strings[key] for key in order}), digest)
+        return True
+
+
+@contextlib.contextmanager
+def catalog_lock(file_path: str) -> Iterator[None]:
+    """
+    Hold an exclusive advisory lock around a catalog's load-modify-save.
+
+    Saving replaces the catalog's inode, so the lock is taken on a file
+    under .build/locks instead of on the catalog. Blocks until other
+    holders are done; a no-op where fcntl is unavailable.
+    """
+    if fcntl is None:
+        yield
+        return
+    name = hashlib.sha256(os.path.realpath(file_path).encode("utf-8")).hexdigest()[:32]
+    lock_dir = os.path.join(project_root(), ".build", "locks")
+    os.makedirs(lock_dir, exist_ok=True)
+    with open(os.path.join(lock_dir, f"{name}.lock"), "w") as lock:
+        with devkit_profile.phase("catalog_lock"):
+            fcntl.flock(lock.fileno(), fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock.fileno(), fcntl.LOCK_UN)
 
 
 def should_translate(entry: Dict[str, Any]) -> bool:
@@ -60,13 +235,16 @@ def should_translate(entry: Dict[str, Any]) -> bool:
     return entry.get("shouldTranslate", True) is not False
 
 
-def merge_new_strings(strings: Dict[str, Any], new_strings: Dict[str, Dict[str, str]]) -> int:
+def merge_new_strings(strings: Dict[str, Any], new_strings: Dict[str, Dict[str, Any]]) -> int:
     """
     Ensure explicitly provided translations exist, including English anchors.
     The structure mirrors NEW_STRINGS used by the legacy scripts:
     {
-        "Key": {"es": "Valor", "zh-Hans": "示例"}
+        "Key": {"es": "Valor", "zh-Hans": "示例"},
+        "%lld files": {"de": {"plural.one": "%lld Datei", "plural.other": "%lld Dateien"}}
     }
+    A dict value sets the units at those paths (see xcstrings_units) and
+    keeps the rest of the localization.
     Returns the number of translations applied.
     """
     applied = 0
@@ -87,6 +265,13 @@ def merge_new_strings(strings: Dict[str, Any], new_strings: Dict[str, Dict[str,
         )
 
         for language, value in translations.items():
+            if isinstance(value, dict):
+                loc = locs.setdefault(language, {})
+                for path, text in value.items():
+                    if (unit_at(loc, path) or {}).get("value", "") != text:
+                        applied += 1
+                    set_unit_at(loc, path, {"state": "translated", "value": text}, locs.get("en"))
+                continue
             existing = locs.get(language, {}).get("stringUnit", {}).get("value", "")
             if existing != value:
                 applied += 1
@@ -117,9 +302,15 @@ def update_missing_translations(
     Fill missing English anchors and apply explicit translations.
 
     This intentionally avoids clearing or adding placeholder entries so
-    manual translation work is preserved.
+    manual translation work is preserved. Accepts a Catalog as well.
     """
-    new_strings = new_strings or {}
+    with devkit_profile.phase("update_missing_translations"):
+        return _update_missing_translations(data, new_strings or {})
+
+
+def _update_missing_translations(data: Dict[str, Any], new_strings: Dict[str, Dict[str, str]]) -> Dict[str, int]:
+    if isinstance(data, Catalog):
+        return data.update_missing_translations(new_strings)
     strings = data["strings"]
 
     merged_count = merge_new_strings(strings, new_strings)
@@ -145,15 +336,14 @@ def update_missing_translations(
             }
             counts["added_en"] += 1
 
-        en_unit = locs["en"].setdefault("stringUnit", {})
-        if en_unit.get("state") == "new":
-            if not en_unit.get("value", "").strip():
-                en_unit["value"] = key
-            en_unit["state"] = "translated"
+        if anchor_units(locs["en"], key):
             counts["fixed_en_state"] += 1
-        english_value = en_unit.get("value", key)
+        english_value = (locs["en"].get("stringUnit") or {}).get("value", key)
 
         for language, translation in new_strings.get(key, {}).items():
+            if isinstance(translation, dict):
+                # Units at paths were all set by merge_new_strings.
+                continue
             current_unit = locs.get(language, {}).get("stringUnit", {})
             current_value = current_unit.get("value", "").strip()
             if current_value:
@@ -214,48 +404,659 @@ def apply_translation_map(
     return applied
 
 
-def find_untranslated(
+class AuditCheck(abc.ABC):
+    """
+    A single check run by audit_strings.
+
+    Subclasses look at each entry in `visit` and return their findings from
+    `result` once the walk is over, so every registered check shares one
+    traversal of the catalog.
+    """
+
+    name = ""
+
+    @abc.abstractmethod
+    def visit(self, key: str, entry: Dict[str, Any], locs: Dict[str, Any], translatable: bool) -> None:
+        """Look at one entry; called for every key in catalog order."""
+
+    @abc.abstractmethod
+    def result(self) -> Any:
+        """Return the findings once every entry has been visited."""
+
+
+AUDIT_CHECKS: Dict[str, type] = {}
+
+
+def register_audit_check(cls: type) -> type:
+    """Class decorator that makes a check available to audit_strings by name."""
+    if not cls.name:
+        raise TypeError(f"{cls.__name__} needs a name to be registered")
+    if cls.__abstractmethods__:
+        missing = ", ".join(sorted(cls.__abstractmethods__))
+        raise TypeError(f"{cls.__name__} can't be registered without implementing {missing}")
+    AUDIT_CHECKS[cls.name] = cls
+    return cls
+
+
+@register_audit_check
+class StaleCheck(AuditCheck):
+    """Keys marked extractionState=stale, in catalog order."""
+
+    name = "stale"
+
+    def __init__(self, **_: Any) -> None:
+        self.keys: List[str] = []
+
+    def visit(self, key, entry, locs, translatable):
+        if entry.get("extractionState") == "stale":
+            self.keys.append(key)
+
+    def result(self) -> List[str]:
+        return self.keys
+
+
+@register_audit_check
+class UntranslatedCheck(AuditCheck):
+    """Target languages that are missing or have empty values, in any of their units."""
+
+    name = "untranslated"
+
+    def __init__(
+        self,
+        target_langs: Optional[Iterable[str]] = None,
+        exceptions: Optional[Iterable[str]] = None,
+        changes: Optional[Dict[str, Optional[set]]] = None,
+        **_: Any,
+    ) -> None:
+        self.target_langs = sorted(set(target_langs or DEFAULT_KEEP_LANGUAGES))
+        self.exceptions = set(UNTRANSLATED_EXCEPTIONS if exceptions is None else exceptions)
+        self.changes = changes
+        self.items: List[Dict[str, Any]] = []
+
+    def visit(self, key, entry, locs, translatable):
+        if not translatable or key in self.exceptions:
+            return
+        langs = self.target_langs
+        scope = self.changes.get(key) if self.changes is not None else None
+        if scope is not None:
+            langs = [lang for lang in langs if lang in scope]
+        missing_langs: List[str] = []
+        for lang in langs:
+            loc = locs.get(lang)
+            unit = loc.get("stringUnit") if loc else None
+            # Report if target is missing or empty, in any of its units
+            if unit and len(loc) == 1:
+                if not unit.get("value", "").strip():
+                    missing_langs.append(lang)
+            elif is_untranslated(loc):
+                missing_langs.append(lang)
+        if missing_langs:
+            self.items.append({"key": key, "missing": missing_langs})
+
+    def result(self) -> List[Dict[str, Any]]:
+        return self.items
+
+
+@register_audit_check
+class IncompleteCheck(AuditCheck):
+    """
+    Missing, empty or non-translated units across every language in use.
+
+    Languages are only known once the walk is over, so each entry records
+    its present languages and problems and the report is assembled in
+    `result`. Stale entries are left out when clean_stale is set, matching
+    a report taken after prune_stale_strings. Incremental runs pass the
+    catalog-wide `languages` up front since they only visit changed keys.
+    """
+
+    name = "incomplete"
+
+    def __init__(
+        self,
+        clean_stale: bool = True,
+        languages: Optional[Iterable[str]] = None,
+        changes: Optional[Dict[str, Optional[set]]] = None,
+        **_: Any,
+    ) -> None:
+        self.clean_stale = clean_stale
+        self.fixed_languages = languages is not None
+        self.languages: set = set(languages or ())
+        self.changes = changes
+        self.rows: List[Tuple[str, Any, Optional[Dict[str, str]], Optional[set]]] = []
+        self._interned: Dict[Any, Any] = {}
+
+    def visit(self, key, entry, locs, translatable):
+        if not translatable:
+            return
+        if self.clean_stale and entry.get("extractionState") == "stale":
+            return
+
+        present = frozenset(locs)
+        present = self._interned.setdefault(present, present)
+        if not self.fixed_languages:
+            self.languages |= present
+
+        problems: Optional[Dict[str, str]] = None
+        for lang, loc in locs.items():
+            unit = loc.get("stringUnit")
+            if not unit or len(loc) != 1:
+                reason = incomplete_reason(loc)
+                if reason is None:
+                    continue
+            else:
+                state = unit.get("state")
+                if state != "translated":
+                    reason = f"state: {state}"
+                elif not unit.get("value", "").strip():
+                    reason = "empty value"
+                else:
+                    continue
+            if problems is None:
+                problems = {}
+            problems[lang] = reason
+        scope = self.changes.get(key) if self.changes is not None else None
+        self.rows.append((key, present, problems, scope))
+
+    def result(self) -> Tuple[List[str], List[Tuple[str, str, str]]]:
+        languages = sorted(self.languages)
+        all_languages = frozenset(languages)
+        incomplete: List[Tuple[str, str, str]] = []
+        for key, present, problems, scope in self.rows:
+            if problems is None and present == all_languages:
+                continue
+            for lang in languages:
+                if scope is not None and lang not in scope:
+                    continue
+                if lang not in present:
+                    incomplete.append((key, lang, "missing localization"))
+                elif problems and lang in problems:
+                    incomplete.append((key, lang, problems[lang]))
+        return languages, incomplete
+
+
+@register_audit_check
+class InconsistentKeyCheck(AuditCheck):
+    """Entries whose key differs from the explicit English value."""
+
+    name = "inconsistent"
+
+    def __init__(self, **_: Any) -> None:
+        self.items: List[Dict[str, Any]] = []
+
+    def visit(self, key, entry, locs, translatable):
+        if not translatable:
+            return
+        en = locs.get("en")
+        # If there's no explicit English localization, the key is the English value
+        en_value = en.get("stringUnit", {}).get("value") if en else None
+        if en_value is not None and key != en_value:
+            self.items.append({"key": key, "en_value": en_value, "has_zh": "zh-Hans" in locs})
+
+    def result(self) -> List[Dict[str, Any]]:
+        return self.items
+
+
+@lru_cache(maxsize=None)
+def format_signature(value: str) -> Tuple[Tuple[int, str], ...]:
+    """
+    Return the (argument index, type) pairs of the format specifiers in value.
+
+    Pairs are in order of appearance; unnumbered specifiers take the next
+    argument index and literal %% is skipped. %i is normalized to %d.
+    Memoized, since most catalog values repeat across keys and runs.
+    """
+    signature: List[Tuple[int, str]] = []
+    next_index = 1
+    for match in FORMAT_SPECIFIER.finditer(value):
+        position, length, conversion = match.groups()
+        if conversion == "%":
+            continue
+        if position:
+            index = int(position)
+        else:
+            index = next_index
+            next_index += 1
+        signature.append((index, (length or "") + ("d" if conversion == "i" else conversion)))
+    return tuple(signature)
+
+
+def _describe_signature(signature: Tuple[Tuple[int, str], ...]) -> str:
+    return ", ".join(f"%{kind}" for _, kind in signature) or "none"
+
+
+def compare_format_signatures(
+    expected: Tuple[Tuple[int, str], ...],
+    found: Tuple[Tuple[int, str], ...],
+) -> Optional[str]:
+    """Return why found can't stand in for expected, or None when they agree."""
+    if expected == found:
+        return None
+    expected_args = dict(expected)
+    found_args = dict(found)
+    if expected_args == found_args:
+        return None
+    if len(expected_args) != len(found_args):
+        return (
+            f"specifier count {len(found_args)} != {len(expected_args)} "
+            f"(expected {_describe_signature(expected)}, found {_describe_signature(found)})"
+        )
+    if sorted(expected_args.values()) == sorted(found_args.values()):
+        return (
+            f"specifier order differs (expected {_describe_signature(expected)}, "
+            f"found {_describe_signature(found)}; use positional %1$@ forms to reorder)"
+        )
+    return f"specifier types differ (expected {_describe_signature(expected)}, found {_describe_signature(found)})"
+
+
+@register_audit_check
+class PlaceholderCheck(AuditCheck):
+    """Translations whose format specifiers don't match the English source."""
+
+    name = "placeholders"
+
+    def __init__(self, changes: Optional[Dict[str, Optional[set]]] = None, **_: Any) -> None:
+        self.changes = changes
+        self.items: List[Tuple[str, str, str]] = []
+
+    def visit(self, key, entry, locs, translatable):
+        if not translatable:
+            return
+        en = locs.get("en")
+        en_unit = en.get("stringUnit") if en else None
+        source = en_unit.get("value", key) if en_unit else key
+        expected = format_signature(source)
+        scope = self.changes.get(key) if self.changes is not None else None
+        # English changes invalidate every translation of the key.
+        if scope is not None and "en" in scope:
+            scope = None
+
+        for lang, loc in locs.items():
+            if lang == "en" or (scope is not None and lang not in scope):
+                continue
+            unit = loc.get("stringUnit")
+            if unit and len(loc) == 1:
+                value = unit.get("value")
+                if not value:
+                    continue
+                found = format_signature(value)
+                if found is expected:
+                    continue
+                problem = compare_format_signatures(expected, found)
+                if problem:
+                    self.items.append((key, lang, problem))
+                continue
+            for path, unit in iter_units(loc):
+                value = unit.get("value")
+                if not value:
+                    continue
+                if path:
+                    # Nested units are compared with the English unit they translate, if any.
+                    counterpart = source_unit(en, path)
+                    if counterpart is None:
+                        continue
+                    wanted = format_signature(counterpart.get("value", ""))
+                else:
+                    wanted = expected
+                found = format_signature(value)
+                if found is wanted:
+                    continue
+                problem = compare_format_signatures(wanted, found)
+                if problem:
+                    self.items.append((key, lang, f"{problem} ({path})" if path else problem))
+
+    def result(self) -> List[Tuple[str, str, str]]:
+        return self.items
+
+
+def audit_strings(
     data: Dict[str, Any],
-    target_langs: Optional[Iterable[str]] = None,
-    exceptions: Optional[Iterable[str]] = None,
-) -> List[Dict[str, Any]]:
-    """Return entries where target languages are missing or have empty values."""
-    target_langs = set(target_langs or DEFAULT_KEEP_LANGUAGES)
-    exceptions = set(exceptions or [])
-    strings = data["strings"]
-    untranslated: List[Dict[str, Any]] = []
+    checks: Optional[Iterable[str]] = None,
+    changes: Optional[Dict[str, Optional[set]]] = None,
+    **options: Any,
+) -> Dict[str, Any]:
+    """
+    Run registered checks over the catalog in a single traversal.
 
-    for key, value in strings.items():
-        if not should_translate(value):
+    `checks` selects checks by name (all registered checks by default);
+    keyword options such as target_langs, exceptions and clean_stale are
+    handed to every check. With `changes` (see diff_strings) only those keys
+    and languages are examined. Accepts a Catalog as well. Returns
+    {check name: result}.
+    """
+    names = list(AUDIT_CHECKS) if checks is None else list(checks)
+    active = [AUDIT_CHECKS[name](changes=changes, **options) for name in names]
+
+    strings = _document(data)["strings"]
+    if changes is None:
+        items: Iterable[Tuple[str, Any]] = strings.items()
+    else:
+        items = ((key, strings[key]) for key in changes if key in strings)
+
+    with devkit_profile.phase("audit:" + ",".join(names)):
+        for key, entry in items:
+            locs = entry.get("localizations") or {}
+            translatable = should_translate(entry)
+            for check in active:
+                check.visit(key, entry, locs, translatable)
+        devkit_profile.count("keys_checked", len(strings) if changes is None else len(changes))
+
+        return {check.name: check.result() for check in active}
+
+
+def audit_findings(results: Dict[str, Any]) -> Dict[str, set]:
+    """
+    Flatten audit_strings results into {key: {(check, detail)}}.
+
+    Gives every check's findings one shape, so runs can be compared key by
+    key (e.g. to tell newly broken keys from fixed ones).
+    """
+    findings: Dict[str, set] = {}
+
+    def add(key: str, check: str, detail: str) -> None:
+        findings.setdefault(key, set()).add((check, detail))
+
+    for name, result in results.items():
+        if name == "stale":
+            for key in result:
+                add(key, name, "stale")
+        elif name == "untranslated":
+            for item in result:
+                for lang in item["missing"]:
+                    add(item["key"], name, f"{lang}: missing")
+        elif name == "incomplete":
+            for key, lang, reason in result[1]:
+                add(key, name, f"{lang}: {reason}")
+        elif name == "inconsistent":
+            for item in result:
+                add(item["key"], name, f"English value is {item['en_value']!r}")
+        elif name == "placeholders":
+            for key, lang, problem in result:
+                add(key, name, f"{lang}: {problem}")
+    return findings
+
+
+def _git(file_path: str, *args: str) -> Optional[bytes]:
+    """Run git in the catalog's directory and return its output, or None when it fails."""
+    import subprocess
+
+    directory = os.path.dirname(os.path.abspath(file_path))
+    try:
+        result = subprocess.run(
+            ["git", "-C", directory, *args],
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            check=False,
+        )
+    except OSError:
+        return None
+    if result.returncode != 0:
+        return None
+    return result.stdout
+
+
+def load_revision_blob(file_path: str, revision: str) -> Optional[bytes]:
+    """Return the catalog's bytes as of a git revision, or None when it can't be resolved."""
+    return _git(file_path, "show", f"{revision}:./{os.path.basename(file_path)}")
+
+
+def revision_blob_id(file_path: str, revision: str) -> Optional[str]:
+    """Return the id of the catalog's blob at a git revision, or None when it can't be resolved."""
+    output = _git(file_path, "rev-parse", "--verify", "--quiet", f"{revision}:./{os.path.basename(file_path)}")
+    return output.decode("ascii").strip() if output else None
+
+
+def _decode_revision(raw: Optional[bytes]) -> Optional[Dict[str, Any]]:
+    if raw is None:
+        return None
+    try:
+        return json.loads(raw.decode("utf-8"))
+    except ValueError:
+        return None
+
+
+def load_revision_strings(file_path: str, revision: str) -> Optional[Dict[str, Any]]:
+    """Return the catalog as of a git revision, or None when it can't be resolved."""
+    return _decode_revision(load_revision_blob(file_path, revision))
+
+
+def diff_strings(base: Dict[str, Any], data: Dict[str, Any]) -> Dict[str, Optional[set]]:
+    """
+    Map keys added or modified since `base` to the languages that changed.
+
+    A value of None means the whole entry needs checking: the key is new or
+    something besides its localizations (flags, extraction state) changed.
+    Removed keys are not reported. Keys come back in catalog order.
+    """
+    base_strings = base.get("strings", {})
+    changes: Dict[str, Optional[set]] = {}
+    for key, entry in data["strings"].items():
+        old = base_strings.get(key)
+        if old == entry:
             continue
-        if key in exceptions:
+        if old is None or len(old) != len(entry) or any(
+            old.get(field) != value for field, value in entry.items() if field != "localizations"
+        ):
+            changes[key] = None
             continue
+        old_locs = old.get("localizations") or {}
+        locs = entry.get("localizations") or {}
+        changes[key] = {lang for lang in old_locs.keys() | locs.keys() if old_locs.get(lang) != locs.get(lang)}
+    return changes
 
-        locs = value.get("localizations", {})
-        missing_langs: List[str] = []
 
-        for lang in target_langs:
-            target_unit = locs.get(lang, {}).get("stringUnit", {})
-            target_value = target_unit.get("value", "").strip()
+def checked_languages(strings: Dict[str, Any], clean_stale: bool = True) -> set:
+    """Languages the incomplete check compares every translatable key against."""
+    languages: set = set()
+    for entry in strings.values():
+        if not should_translate(entry):
+            continue
+        if clean_stale and entry.get("extractionState") == "stale":
+            continue
+        languages.update(entry.get("localizations") or ())
+    return languages
 
-            # Report if target is missing or empty
-            if not target_value:
-                missing_langs.append(lang)
 
-        if missing_langs:
-            untranslated.append({"key": key, "missing": sorted(missing_langs)})
+def failing_keys(base: Dict[str, Any], checks: Optional[Iterable[str]] = None, **options: Any) -> List[str]:
+    """Keys with findings in a full audit of `base`, in catalog order."""
+    return list(audit_findings(audit_strings(base, checks=checks, **options)))
+
+
+def audit_changes(
+    data: Dict[str, Any],
+    base: Optional[Dict[str, Any]],
+    checks: Optional[Iterable[str]] = None,
+    failing: Optional[Iterable[str]] = None,
+    **options: Any,
+) -> Tuple[Dict[str, Any], Optional[Dict[str, Optional[set]]]]:
+    """
+    Audit only what changed since `base`, plus every key that fails there.
+
+    Unchanged keys get the same verdict as at the base, so checking the
+    changed keys and those already failing at the base (`failing`, see
+    failing_keys; computed when not given) reports what a full audit does.
+    Falls back to a full audit when there is no base or the set of languages
+    differs, since that changes the verdict for untouched keys as well.
+    Returns (results, changes), where changes is None after a full audit.
+    """
+    data = _document(data)
+    if base is None or "strings" not in base:
+        return audit_strings(data, checks=checks, **options), None
+
+    clean_stale = options.get("clean_stale", True)
+    languages = checked_languages(data["strings"], clean_stale)
+    if languages != checked_languages(base["strings"], clean_stale):
+        return audit_strings(data, checks=checks, **options), None
+
+    if failing is None:
+        failing = failing_keys(base, checks, **options)
+    changes = diff_strings(base, data)
+    for key in failing:
+        # Failing languages may not be the ones that changed; check the whole entry.
+        changes[key] = None
+    strings = data["strings"]
+    changes = {key: changes[key] for key in strings if key in changes}
+    options.setdefault("languages", languages)
+    return audit_strings(data, checks=checks, changes=changes, **options), changes
+
+
+def _entry_index(raw: bytes, document: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """
+    Byte spans and digests of the entries of a catalog in canonical layout.
+
+    An entry whose bytes didn't change didn't change either, so comparing
+    digests finds the changed keys without decoding both revisions. Also
+    records checked_languages with and without stale keys. None when the
+    bytes aren't in the layout xcstrings_format.index_entries reads.
+    """
+    index = xcstrings_format.index_entries(raw)
+    if index is None:
+        return None
+    keys, spans = index
+    view = memoryview(raw)
+    strings = document.get("strings", {})
+    return {
+        "keys": keys,
+        "spans": spans,
+        "digests": [hashlib.sha1(view[start:end]).digest() for start, end in spans],
+        "languages": {clean: sorted(checked_languages(strings, clean)) for clean in (False, True)},
+    }
+
+
+def _read_entries(file_path: str, index: Dict[str, Any], keys: Iterable[str]) -> Dict[str, Any]:
+    """Decode only the given entries of the catalog at file_path, at the spans in its index."""
+    spans = dict(zip(index["keys"], index["spans"]))
+    strings: Dict[str, Any] = {}
+    with open(file_path, "rb") as f:
+        for key in keys:
+            start, end = spans[key]
+            f.seek(start)
+            strings.update(json.loads(b"{" + f.read(end - start) + b"}"))
+    return strings
 
-    return untranslated
+
+def _file_index(file_path: str, data: Optional[Dict[str, Any]] = None) -> Optional[Dict[str, Any]]:
+    """_entry_index of the catalog at file_path (data, when given), cached like its document."""
+
+    def index_file(raw: bytes) -> Optional[Dict[str, Any]]:
+        return _entry_index(raw, _decode_strings(raw) if data is None else data)
+
+    try:
+        return i18n_cache.load(file_path, index_file, kind="entries")
+    except (OSError, ValueError):
+        return None  # load_strings reports unreadable catalogs.
+
+
+def count_strings(file_path: str) -> int:
+    """Number of keys in the catalog at file_path; cheap after an incremental audit_since."""
+    index = _file_index(file_path)
+    return len(index["keys"]) if index is not None else len(load_strings(file_path)["strings"])
+
+
+def audit_since(
+    file_path: str,
+    data: Optional[Dict[str, Any]],
+    revision: Optional[str],
+    checks: Optional[Iterable[str]] = None,
+    **options: Any,
+) -> Dict[str, Any]:
+    """
+    Run audit_strings, limited to keys changed since `revision` or failing there when one is given.
+
+    data is the catalog as saved at file_path, or None to have it read. The
+    changed keys come from comparing the entries' bytes with the revision's
+    blob, whose index and failing keys are cached by blob id, so an
+    incremental run without data only decodes the entries it checks.
+    """
+    blob_id = revision_blob_id(file_path, revision) if revision else None
+    if blob_id is None:
+        if revision:
+            print(f"⚠️ Could not read {file_path} at {revision}, running a full scan")
+        return audit_strings(load_strings(file_path) if data is None else data, checks=checks, **options)
+
+    # A blob never changes, so its index and findings are kept by id.
+    settings = json.dumps({"checks": checks, "options": options}, sort_keys=True, default=sorted)
+    index_name, failing_name = f"entries:{blob_id}", f"failing:{blob_id}:{settings}"
+    base_index = i18n_cache.recall(index_name)
+    failing = i18n_cache.recall(failing_name)
+    base = None
+    if base_index is None or failing is None:
+        raw = _git(file_path, "cat-file", "blob", blob_id)
+        base = _decode_revision(raw)
+        if base is None or "strings" not in base:
+            print(f"⚠️ Could not read {file_path} at {revision}, running a full scan")
+            return audit_strings(load_strings(file_path) if data is None else data, checks=checks, **options)
+        base_index = _entry_index(raw, base)
+        failing = failing_keys(base, checks, **options)
+        if base_index is not None:
+            i18n_cache.remember(index_name, base_index)
+        i18n_cache.remember(failing_name, failing)
+
+    index = _file_index(file_path, data) if base_index is not None else None
+    if index is None:
+        # Not in the canonical layout: compare the decoded documents instead.
+        if data is None:
+            data = load_strings(file_path)
+        if base is None:
+            base = _decode_revision(_git(file_path, "cat-file", "blob", blob_id))
+        results, changes = audit_changes(data, base, checks=checks, failing=failing, **options)
+    else:
+        clean_stale = options.get("clean_stale", True)
+        languages = index["languages"][clean_stale]
+        changes = None
+        if languages == base_index["languages"][clean_stale]:
+            base_digests = dict(zip(base_index["keys"], base_index["digests"]))
+            failing = set(failing)
+            # Whole entries are checked, which reports what a full audit does for them.
+            changes = {
+                key: None
+                for key, digest in zip(index["keys"], index["digests"])
+                if key in failing or base_digests.get(key) != digest
+            }
+        if changes is None:
+            results = audit_strings(load_strings(file_path) if data is None else data, checks=checks, **options)
+        else:
+            if data is None:
+                data = {"strings": _read_entries(file_path, index, changes)}
+            options.setdefault("languages", languages)
+            results = audit_strings(data, checks=checks, changes=changes, **options)
+
+    if changes is not None:
+        print(f"🔎 Checking {len(changes)} keys changed since {revision} or failing there")
+    else:
+        print(f"⚠️ Languages changed since {revision}, running a full scan")
+    return results
+
+
+def find_untranslated(
+    data: Dict[str, Any],
+    target_langs: Optional[Iterable[str]] = None,
+    exceptions: Optional[Iterable[str]] = None,
+) -> List[Dict[str, Any]]:
+    """Return entries where target languages are missing or have empty values."""
+    if isinstance(data, Catalog):
+        return data.find_untranslated(target_langs or DEFAULT_KEEP_LANGUAGES, exceptions or [])
+    return audit_strings(
+        data,
+        checks=["untranslated"],
+        target_langs=target_langs,
+        exceptions=exceptions or [],
+    )["untranslated"]
+
+
+def remove_strings(data: Dict[str, Any], keys: Iterable[str]) -> None:
+    """Delete the given keys from the catalog, a JSON document or a Catalog."""
+    if isinstance(data, Catalog):
+        data.remove(keys)
+        return
+    strings = data["strings"]
+    for key in keys:
+        del strings[key]
 
 
 def prune_stale_strings(data: Dict[str, Any]) -> List[str]:
     """Remove entries marked extractionState=stale; returns removed keys."""
-    strings = data["strings"]
-    removed: List[str] = []
-    for key in list(strings.keys()):
-        if strings[key].get("extractionState") == "stale":
-            removed.append(key)
-            del strings[key]
+    removed = audit_strings(data, checks=["stale"])["stale"]
+    remove_strings(data, removed)
     return removed
 
 
@@ -267,29 +1068,136 @@ def find_incomplete_translations(
     Find missing/empty/non-translated entries.
     Returns (languages, incomplete list, removed_stale_keys)
     """
-    removed = prune_stale_strings(data) if clean_stale else []
-    strings = data["strings"]
-    translatable = {k: v for k, v in strings.items() if should_translate(v)}
+    if isinstance(data, Catalog):
+        removed = data.stale_keys() if clean_stale else []
+        data.remove(removed)
+        languages, incomplete = data.find_incomplete(clean_stale)
+        return languages, incomplete, removed
 
-    languages = sorted(collect_languages(translatable))
-    incomplete: List[Tuple[str, str, str]] = []
+    if not clean_stale:
+        languages, incomplete = audit_strings(data, checks=["incomplete"], clean_stale=False)["incomplete"]
+        return languages, incomplete, []
 
-    for key, value in translatable.items():
-        locs = value.get("localizations", {})
-        for lang in languages:
-            unit = locs.get(lang, {}).get("stringUnit")
-            if not unit:
-                incomplete.append((key, lang, "missing localization"))
-                continue
+    results = audit_strings(data, checks=["stale", "incomplete"], clean_stale=True)
+    removed = results["stale"]
+    remove_strings(data, removed)
+    languages, incomplete = results["incomplete"]
+    return languages, incomplete, removed
 
-            state = unit.get("state")
-            val = unit.get("value", "").strip()
-            if state != "translated":
-                incomplete.append((key, lang, f"state: {state}"))
-            elif not val:
-                incomplete.append((key, lang, "empty value"))
 
-    return languages, incomplete, removed
+def find_inconsistent_keys(data: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Return entries where the key doesn't match the explicit English value."""
+    return audit_strings(data, checks=["inconsistent"])["inconsistent"]
+
+
+def english_value_index(data: Dict[str, Any]) -> Dict[str, List[str]]:
+    """Map each explicit English value to the translatable keys carrying it."""
+    index: Dict[str, List[str]] = {}
+    for key, entry in data["strings"].items():
+        if not should_translate(entry):
+            continue
+        en = (entry.get("localizations") or {}).get("en")
+        en_value = en.get("stringUnit", {}).get("value") if en else None
+        if en_value is not None:
+            index.setdefault(en_value, []).append(key)
+    return index
+
+
+def plan_key_fixes(data: Dict[str, Any]) -> Dict[str, str]:
+    """Return {key: English value} renames for keys that differ from their English value."""
+    renames: Dict[str, str] = {}
+    for en_value, keys in english_value_index(data).items():
+        for key in keys:
+            if key != en_value:
+                renames[key] = en_value
+    # Report in catalog order.
+    return {key: renames[key] for key in data["strings"] if key in renames}
+
+
+def load_key_mapping(file_path: str) -> Dict[str, str]:
+    """
+    Read renames from JSON: either {"old": "new"} or the list of
+    {"old_key": ..., "new_key": ...} records fix_inconsistent_keys.py writes.
+    """
+    with open(file_path, "r", encoding="utf-8") as f:
+        mapping = json.load(f)
+    if isinstance(mapping, dict):
+        return {str(old): str(new) for old, new in mapping.items()}
+    return {item["old_key"]: item["new_key"] for item in mapping}
+
+
+def _rename_cycles(renames: Dict[str, str]) -> List[List[str]]:
+    cycles: List[List[str]] = []
+    done: set = set()
+    for start in renames:
+        path: List[str] = []
+        seen: Dict[str, int] = {}
+        key = start
+        while key in renames and key not in done and key not in seen:
+            seen[key] = len(path)
+            path.append(key)
+            key = renames[key]
+        if key in seen:
+            cycles.append(path[seen[key]:])
+        done.update(path)
+    return cycles
+
+
+def rename_keys(data: Dict[str, Any], renames: Dict[str, str]) -> Dict[str, List[Any]]:
+    """
+    Rename catalog keys in place, all at once.
+
+    Renames are applied simultaneously, so chains (A→B, B→C) and cycles
+    (A→B, B→A) work. A rename is refused when its target is an existing key
+    that stays, or when several keys are renamed to the same target.
+    Untouched keys keep their order; save_strings places renamed keys.
+    Returns {"renamed": [(old, new)], "collisions": [(old, new, reason)],
+    "missing": [old], "cycles": [[key, ...]]}.
+    """
+    with devkit_profile.phase("rename_keys", renames=len(renames)):
+        return _rename_keys(data["strings"], renames)
+
+
+def _rename_keys(strings: Dict[str, Any], renames: Dict[str, str]) -> Dict[str, List[Any]]:
+    active = {old: new for old, new in renames.items() if old != new and old in strings}
+    missing = [old for old, new in renames.items() if old != new and old not in strings]
+
+    target_counts: Dict[str, int] = {}
+    for new in active.values():
+        target_counts[new] = target_counts.get(new, 0) + 1
+
+    collisions: List[Tuple[str, str, str]] = []
+    for old, new in active.items():
+        if target_counts[new] > 1:
+            collisions.append((old, new, "several keys renamed to it"))
+    for old, _, _ in collisions:
+        del active[old]
+
+    # A target is free when it doesn't exist or is renamed away itself.
+    # Refusing a rename keeps its source in place, which blocks any rename
+    # into that source in turn.
+    by_target = {new: old for old, new in active.items()}
+    queue = [old for old, new in active.items() if new in strings and new not in active]
+    while queue:
+        old = queue.pop()
+        if old not in active:
+            continue
+        collisions.append((old, active.pop(old), "key already exists"))
+        blocked = by_target.get(old)
+        if blocked is not None and blocked in active:
+            queue.append(blocked)
+
+    cycles = _rename_cycles(active)
+    entries = {old: strings.pop(old) for old in active}
+    for old, new in active.items():
+        strings[new] = entries[old]
+
+    return {
+        "renamed": list(active.items()),
+        "collisions": collisions,
+        "missing": missing,
+        "cycles": cycles,
+    }
 
 
 def print_update_summary(file_path: str, counts: Dict[str, int]) -> None:
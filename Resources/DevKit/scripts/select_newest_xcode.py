@@ -2,12 +2,26 @@
 
 from __future__ import annotations
 
+import argparse
+import json
+import os
 import plistlib
 import subprocess
 import sys
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
-APPLICATIONS_DIR = Path("/Applications")
+import devkit_profile
+
+APPLICATIONS_DIR = Path(os.environ.get("XCODE_APPLICATIONS_DIR") or "/Applications")
+
+# Parsed Info.plist versions keyed by plist path, valid while its mtime and
+# size match. Set XCODE_METADATA_CACHE=0 to disable or to a path to move it.
+METADATA_CACHE_VERSION = 1
+DEFAULT_METADATA_CACHE = Path.home() / (
+    "Library/Caches/FlowDown" if sys.platform == "darwin" else ".cache/flowdown"
+) / "select-xcode.json"
 
 
 def log(message: str) -> None:
@@ -21,11 +35,11 @@ def version_key(value: str) -> tuple:
     return tuple(parts)
 
 
-def discover_xcodes() -> list[Path]:
-    if not APPLICATIONS_DIR.is_dir():
+def discover_xcodes(applications_dir: Path = APPLICATIONS_DIR) -> list[Path]:
+    if not applications_dir.is_dir():
         return []
     bundles = []
-    for path in APPLICATIONS_DIR.iterdir():
+    for path in applications_dir.iterdir():
         if not path.is_dir() or not path.name.startswith("Xcode") or path.suffix != ".app":
             continue
         if "beta" in path.name.lower():
@@ -35,20 +49,71 @@ def discover_xcodes() -> list[Path]:
     return sorted(bundles, key=lambda p: p.name)
 
 
-def read_metadata(bundle: Path):
-    plist_path = bundle / "Contents/Info.plist"
-    if not plist_path.is_file():
-        log(f"skipping {bundle} (no Info.plist)")
+def metadata_cache_path() -> Path | None:
+    override = os.environ.get("XCODE_METADATA_CACHE")
+    if override == "0":
         return None
+    return Path(override) if override else DEFAULT_METADATA_CACHE
+
+
+def load_metadata_cache(path: Path | None) -> dict:
+    if path is None:
+        return {}
+    try:
+        with path.open("r", encoding="utf-8") as handle:
+            cache = json.load(handle)
+    except (OSError, ValueError):
+        return {}
+    if not isinstance(cache, dict) or cache.get("version") != METADATA_CACHE_VERSION:
+        return {}
+    entries = cache.get("entries")
+    return entries if isinstance(entries, dict) else {}
+
+
+def save_metadata_cache(path: Path | None, entries: dict) -> None:
+    if path is None:
+        return
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as handle:
+                json.dump({"version": METADATA_CACHE_VERSION, "entries": entries}, handle)
+            os.replace(tmp_path, path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+    except OSError:
+        pass
+
+
+def read_metadata(bundle: Path, cache: dict | None = None):
+    plist_path = bundle / "Contents/Info.plist"
     try:
-        with plist_path.open("rb") as handle:
-            plist = plistlib.load(handle)
-    except Exception as exc:  # noqa: BLE001
-        log(f"skipping {bundle} (plist error: {exc})")
+        st = plist_path.stat()
+    except OSError:
+        st = None
+    if st is None or not plist_path.is_file():
+        log(f"skipping {bundle} (no Info.plist)")
         return None
 
-    version = str(plist.get("CFBundleShortVersionString", "")).strip()
-    build = str(plist.get("CFBundleVersion", "")).strip()
+    cache_key = str(plist_path)
+    cached = cache.get(cache_key) if cache is not None else None
+    if cached and cached.get("mtime_ns") == st.st_mtime_ns and cached.get("size") == st.st_size:
+        version = cached.get("version", "")
+        build = cached.get("build", "")
+    else:
+        try:
+            with plist_path.open("rb") as handle:
+                plist = plistlib.load(handle)
+        except Exception as exc:  # noqa: BLE001
+            log(f"skipping {bundle} (plist error: {exc})")
+            return None
+
+        version = str(plist.get("CFBundleShortVersionString", "")).strip()
+        build = str(plist.get("CFBundleVersion", "")).strip()
+        if cache is not None:
+            cache[cache_key] = {"mtime_ns": st.st_mtime_ns, "size": st.st_size, "version": version, "build": build}
 
     if not version:
         log(f"skipping {bundle} (no version)")
@@ -62,19 +127,59 @@ def read_metadata(bundle: Path):
     }
 
 
+def read_all_metadata(bundles: list[Path], cache: dict | None = None) -> list[dict]:
+    """Read the Info.plist of every bundle concurrently, keeping the bundle order."""
+    if not bundles:
+        return []
+    with ThreadPoolExecutor(max_workers=min(8, len(bundles))) as executor:
+        results = executor.map(lambda bundle: read_metadata(bundle, cache), bundles)
+        return [meta for meta in results if meta]
+
+
 def select_newest(candidates):
-    if not candidates:
-        return None
-    return sorted(candidates, key=lambda item: item["sort_key"])[-1]
+    # Single pass; on ties the later candidate wins, as with sorted()[-1].
+    newest = None
+    for item in candidates:
+        if newest is None or item["sort_key"] >= newest["sort_key"]:
+            newest = item
+    return newest
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Select the newest installed release Xcode.")
+    parser.add_argument(
+        "--applications-dir",
+        type=Path,
+        default=APPLICATIONS_DIR,
+        help="Directory containing Xcode*.app bundles (default: $XCODE_APPLICATIONS_DIR or /Applications)",
+    )
+    parser.add_argument(
+        "--dry-run",
+        action="store_true",
+        help="Print the selected Xcode without running xcode-select",
+    )
+    devkit_profile.add_arguments(parser)
+    return parser.parse_args()
 
 
 def main() -> int:
-    bundles = discover_xcodes()
+    args = parse_args()
+    with devkit_profile.phase("discover_xcodes"):
+        bundles = discover_xcodes(args.applications_dir)
     if not bundles:
-        print("[-] no Xcode installations found under /Applications", file=sys.stderr)
+        print(f"[-] no Xcode installations found under {args.applications_dir}", file=sys.stderr)
         return 1
 
-    candidates = [meta for meta in (read_metadata(bundle) for bundle in bundles) if meta]
+    cache_path = metadata_cache_path()
+    cache = load_metadata_cache(cache_path)
+    cached = dict(cache)
+    with devkit_profile.phase("read_metadata", bundles=len(bundles)):
+        candidates = read_all_metadata(bundles, cache)
+    # Keep only installed Xcodes, and skip the write when every read was a hit.
+    plist_paths = {str(bundle / "Contents/Info.plist") for bundle in bundles}
+    cache = {key: value for key, value in cache.items() if key in plist_paths}
+    if cache != cached:
+        save_metadata_cache(cache_path, cache)
     if not candidates:
         print("[-] no Xcode installations with readable versions found", file=sys.stderr)
         return 1
@@ -91,6 +196,8 @@ def main() -> int:
         return 1
 
     log(f"selecting Xcode {newest['version']} (build {newest['build']}) at {xcode_path}")
+    if args.dry_run:
+        return 0
 
     subprocess.run(["sudo", "xcode-select", "-s", str(developer_dir)], check=True)
     selected = subprocess.run(["xcode-select", "-p"], check=True, capture_output=True, text=True)
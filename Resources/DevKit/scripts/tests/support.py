@@ -0,0 +1,28 @@
+"""Shared setup for the DevKit script tests: the scripts directory on sys.path and catalog builders."""
+
+import importlib.util
+import os
+import sys
+from types import ModuleType
+from typing import Any, Dict
+
+SCRIPTS_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if SCRIPTS_DIR not in sys.path:
+    sys.path.insert(0, SCRIPTS_DIR)
+
+
+def script_path(name: str) -> str:
+    return os.path.join(SCRIPTS_DIR, name)
+
+
+def load_script(name: str, module_name: str) -> ModuleType:
+    """Import a script whose file name isn't a module name, such as apple-resign-scan.py."""
+    spec = importlib.util.spec_from_file_location(module_name, script_path(name))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def unit(value: str, state: str = "translated") -> Dict[str, Any]:
+    """A localization holding a single stringUnit."""
+    return {"stringUnit": {"state": state, "value": value}}
@@ -0,0 +1,232 @@
+"""apple-resign-scan.py against synthetic bundles."""
+
+import json
+import os
+import shutil
+import struct
+import subprocess
+import sys
+import tempfile
+import unittest
+
+from support import load_script, script_path
+
+
+resign_scan = load_script("apple-resign-scan.py", "apple_resign_scan")
+
+CPU_TYPE_X86_64 = 0x01000007
+CPU_TYPE_ARM64 = 0x0100000C
+MH_EXECUTE = 2
+
+
+def thin_header(is_64: bool = True, big_endian: bool = False) -> bytes:
+    order = ">" if big_endian else "<"
+    if is_64:
+        return struct.pack(order + "IiiIIIII", 0xFEEDFACF, CPU_TYPE_X86_64, 3, MH_EXECUTE, 0, 0, 0, 0)
+    return struct.pack(order + "IiiIIII", 0xFEEDFACE, 7, 3, MH_EXECUTE, 0, 0, 0)
+
+
+def fat_binary(big_endian: bool = True) -> bytes:
+    """A universal binary with x86_64 and arm64 slices."""
+    order = ">" if big_endian else "<"
+    body = thin_header()
+    header = struct.pack(order + "II", 0xCAFEBABE, 2)
+    header += struct.pack(order + "iiIII", CPU_TYPE_X86_64, 3, 4096, len(body), 12)
+    header += struct.pack(order + "iiIII", CPU_TYPE_ARM64, 0, 8192, len(body), 14)
+    data = bytearray(header.ljust(8192 + len(body), b"\0"))
+    data[4096 : 4096 + len(body)] = body
+    data[8192 : 8192 + len(body)] = body
+    return bytes(data)
+
+
+def java_class(major: int = 52) -> bytes:
+    """A class file: 0xcafebabe, then minor and major version where a fat header has its arch count."""
+    return struct.pack(">IHH", 0xCAFEBABE, 0, major) + b"\0" * 32
+
+
+class BundleTestCase(unittest.TestCase):
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.root)
+
+    def write(self, relative: str, data: bytes = b"") -> str:
+        path = os.path.join(self.root, relative)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "wb") as f:
+            f.write(data)
+        return path
+
+    def make_bundle(self) -> str:
+        app = os.path.join(self.root, "FlowDown.app")
+        self.write("FlowDown.app/Contents/MacOS/FlowDown", thin_header())
+        self.write("FlowDown.app/Contents/Info.plist", b"<plist/>")
+        self.write("FlowDown.app/Contents/Resources/en.lproj/Localizable.strings", b'"a" = "b";')
+        self.write("FlowDown.app/Contents/Resources/helper.jar.class", java_class())
+        self.write("FlowDown.app/Contents/Resources/run.sh", b"#!/bin/sh\n")
+        self.write("FlowDown.app/Contents/Frameworks/libswift.dylib", thin_header(False, True))
+        self.write("FlowDown.app/Contents/Frameworks/Core.framework/Versions/A/Core", fat_binary())
+        self.write(
+            "FlowDown.app/Contents/Frameworks/Sparkle.framework/Versions/B/Updater.app/Contents/MacOS/Updater",
+            thin_header(),
+        )
+        self.write("FlowDown.app/Contents/PlugIns/Widgets.appex/Contents/MacOS/Widgets", thin_header(True, True))
+        self.write("FlowDown.app/Contents/PlugIns/Widgets.appex/Contents/Frameworks/Kit.framework/Kit", thin_header())
+        os.symlink("Versions/A/Core", os.path.join(app, "Contents/Frameworks/Core.framework/Core"))
+        return app
+
+
+class IsMachoTests(BundleTestCase):
+    def test_thin_headers_in_both_byte_orders(self):
+        for is_64 in (True, False):
+            for big_endian in (True, False):
+                with self.subTest(is_64=is_64, big_endian=big_endian):
+                    path = self.write(f"thin-{is_64}-{big_endian}", thin_header(is_64, big_endian))
+                    self.assertTrue(resign_scan.is_macho(path))
+
+    def test_fat_headers_in_both_byte_orders(self):
+        self.assertTrue(resign_scan.is_macho(self.write("fat-be", fat_binary(big_endian=True))))
+        self.assertTrue(resign_scan.is_macho(self.write("fat-le", fat_binary(big_endian=False))))
+        fat_64 = struct.pack(">II", 0xCAFEBABF, 1) + b"\0" * 64
+        self.assertTrue(resign_scan.is_macho(self.write("fat-64", fat_64)))
+
+    def test_java_class_file_is_not_fat(self):
+        self.assertFalse(resign_scan.is_macho(self.write("Main.class", java_class(52))))
+        self.assertFalse(resign_scan.is_macho(self.write("Old", java_class(resign_scan.MAX_FAT_ARCHS))))
+        empty_fat = struct.pack(">II", 0xCAFEBABE, 0)
+        self.assertFalse(resign_scan.is_macho(self.write("empty-fat", empty_fat)))
+
+    def test_truncated_and_foreign_files(self):
+        self.assertFalse(resign_scan.is_macho(self.write("short", thin_header()[:12])))
+        self.assertFalse(resign_scan.is_macho(self.write("magic-only", b"\xca\xfe\xba\xbe")))
+        self.assertFalse(resign_scan.is_macho(self.write("script", b"#!/bin/sh\necho hi\n")))
+        self.assertFalse(resign_scan.is_macho(self.write("empty")))
+        self.assertFalse(resign_scan.is_macho(os.path.join(self.root, "does-not-exist")))
+
+    def test_symlink_to_macho_is_skipped(self):
+        target = self.write("binary", thin_header())
+        link = os.path.join(self.root, "link")
+        os.symlink(target, link)
+        self.assertTrue(resign_scan.is_macho(target))
+        self.assertFalse(resign_scan.is_macho(link))
+
+    def test_non_code_extension_is_not_opened(self):
+        self.assertFalse(resign_scan.is_macho(self.write("icon.png", thin_header())))
+        self.assertFalse(resign_scan.is_macho(self.write("Info.PLIST", thin_header())))
+        self.assertTrue(resign_scan.is_macho(self.write("libfoo.dylib", thin_header())))
+
+
+def file_based_scan(app_path: str) -> list:
+    """The signing order of the scan that classified files with `file`, before is_macho."""
+    all_paths = set()
+    for root, dirs, files in os.walk(app_path):
+        for d in dirs:
+            if d.endswith(".framework") or d.endswith(".app"):
+                all_paths.add(os.path.join(root, d))
+        for f in files:
+            all_paths.add(os.path.join(root, f))
+
+    sorted_paths = sorted(all_paths, key=lambda x: (x.count(os.sep), x), reverse=True)
+    app_paths = []
+    candidates = []
+    for path in sorted_paths:
+        if path.endswith(".framework"):
+            candidates.append(path)
+            continue
+        if path.endswith(".app"):
+            app_paths.append(path)
+            continue
+        if os.path.isfile(path):
+            result = subprocess.run(["file", path], stdout=subprocess.PIPE, text=True, check=False)
+            if "Mach-O" in result.stdout:
+                candidates.append(path)
+    return candidates + app_paths + [app_path]
+
+
+class ScanOrderTests(BundleTestCase):
+    @unittest.skipUnless(shutil.which("file"), "needs file(1)")
+    def test_order_matches_file_based_scan(self):
+        app = self.make_bundle()
+        candidates, app_paths, _ = resign_scan.scan_bundle(app, jobs=4)
+        self.assertEqual(candidates + app_paths + [app], file_based_scan(app))
+
+    def test_order_does_not_depend_on_jobs(self):
+        app = self.make_bundle()
+        self.assertEqual(resign_scan.scan_bundle(app, jobs=1)[:2], resign_scan.scan_bundle(app, jobs=8)[:2])
+
+
+class SigningLevelsTests(BundleTestCase):
+    def plan(self, app):
+        candidates, app_paths, _ = resign_scan.scan_bundle(app, jobs=4)
+        plan = resign_scan.signing_levels(app, candidates, app_paths)
+        relative = [[os.path.relpath(path, app) for path in level] for level in plan]
+        return plan, {path: index for index, level in enumerate(relative) for path in level}
+
+    def assert_signed_after_contents(self, plan):
+        level_of = {path: index for index, level in enumerate(plan) for path in level}
+        for path, level in level_of.items():
+            for other, other_level in level_of.items():
+                if other.startswith(path + os.sep):
+                    self.assertLess(other_level, level, f"{other} must be signed before {path}")
+
+    def test_app_inside_framework_is_signed_before_it(self):
+        app = self.make_bundle()
+        plan, level = self.plan(app)
+        self.assert_signed_after_contents(plan)
+        updater = "Contents/Frameworks/Sparkle.framework/Versions/B/Updater.app"
+        self.assertEqual(level[updater + "/Contents/MacOS/Updater"], 0)
+        self.assertEqual(level[updater], 1)
+        self.assertEqual(level["Contents/Frameworks/Sparkle.framework"], 2)
+        self.assertEqual(level["."], 3)
+        self.assertEqual(plan[-1], [app])
+
+    def test_framework_inside_plugins_is_signed_before_the_app(self):
+        app = self.make_bundle()
+        plan, level = self.plan(app)
+        self.assert_signed_after_contents(plan)
+        kit = "Contents/PlugIns/Widgets.appex/Contents/Frameworks/Kit.framework"
+        self.assertEqual(level[kit + "/Kit"], 0)
+        self.assertEqual(level[kit], 1)
+        self.assertEqual(level["Contents/PlugIns/Widgets.appex/Contents/MacOS/Widgets"], 0)
+        self.assertEqual(level["Contents/Frameworks/libswift.dylib"], 0)
+        self.assertEqual(level["Contents/MacOS/FlowDown"], 0)
+
+    def test_levels_keep_the_flat_order(self):
+        app = self.make_bundle()
+        candidates, app_paths, _ = resign_scan.scan_bundle(app, jobs=4)
+        flat = candidates + app_paths + [app]
+        plan = resign_scan.signing_levels(app, candidates, app_paths)
+        self.assertEqual(sorted(path for level in plan for path in level), sorted(flat))
+        for level in plan:
+            self.assertEqual(level, [path for path in flat if path in level])
+
+    def test_bare_app_is_one_level(self):
+        app = os.path.join(self.root, "Empty.app")
+        os.makedirs(app)
+        self.assertEqual(resign_scan.signing_levels(app, [], []), [[app]])
+
+    def run_plan(self, app, fmt):
+        return subprocess.run(
+            [sys.executable, script_path("apple-resign-scan.py"), app, "--plan", fmt],
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            check=True,
+        ).stdout
+
+    def test_plan_json_output(self):
+        app = self.make_bundle()
+        plan, _ = self.plan(app)
+        self.assertEqual(json.loads(self.run_plan(app, "json")), {"levels": plan})
+
+    def test_plan_nul_output(self):
+        app = self.make_bundle()
+        plan, _ = self.plan(app)
+        expected = b"".join(b"".join(os.fsencode(path) + b"\0" for path in level) + b"\0" for level in plan)
+        output = self.run_plan(app, "nul")
+        self.assertEqual(output, expected)
+        # Levels are the runs between empty records.
+        levels = output.split(b"\0\0")[:-1]
+        self.assertEqual(len(levels), len(plan))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,114 @@
+"""Bundle manifest entries across rescans and re-signs."""
+
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import unittest
+
+from support import load_script, script_path
+
+from bundle_manifest import BundleManifest
+
+resign_scan = load_script("apple-resign-scan.py", "apple_resign_scan")
+
+MACHO = b"\xcf\xfa\xed\xfe" + b"\0" * 60
+
+
+class ManifestTestCase(unittest.TestCase):
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.root)
+        self.app = os.path.join(self.root, "FlowDown.app")
+        self.manifest_path = os.path.join(self.root, "manifest.json")
+        self.binary = self.write("Contents/MacOS/FlowDown", MACHO)
+        self.library = self.write("Contents/Frameworks/libswift.dylib", MACHO)
+        self.resource = self.write("Contents/Resources/model.bin", b"weights")
+
+    def write(self, relative, data):
+        path = os.path.join(self.app, relative)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "wb") as f:
+            f.write(data)
+        return path
+
+    def scan(self):
+        """Scan the bundle with the manifest; returns (candidates, hits, misses)."""
+        manifest = BundleManifest.load(self.manifest_path)
+        candidates, _, _ = resign_scan.scan_bundle(self.app, 2, manifest)
+        manifest.save()
+        return sorted(candidates), manifest.hits, manifest.misses
+
+    def recorded(self):
+        with open(self.manifest_path, encoding="utf-8") as f:
+            return set(json.load(f)["entries"])
+
+    def sign(self, *paths):
+        """Rewrite files the way codesign does: an appended signature in a new inode."""
+        for path in paths:
+            with open(path, "rb") as f:
+                data = f.read()
+            os.unlink(path)
+            with open(path, "wb") as f:
+                f.write(data + b"signature")
+
+
+class RescanTests(ManifestTestCase):
+    def test_unchanged_files_are_hits(self):
+        self.assertEqual(self.scan(), ([self.library, self.binary], 0, 3))
+        self.assertEqual(self.scan(), ([self.library, self.binary], 3, 0))
+
+    def test_changed_file_misses(self):
+        self.scan()
+        self.write("Contents/Resources/model.bin", MACHO)
+        candidates, hits, misses = self.scan()
+        self.assertIn(self.resource, candidates)
+        self.assertEqual((hits, misses), (2, 1))
+
+    def test_removed_files_drop_out(self):
+        self.scan()
+        os.unlink(self.resource)
+        self.scan()
+        self.assertEqual(self.recorded(), {self.binary, self.library})
+
+
+class RefreshTests(ManifestTestCase):
+    def test_signed_files_miss_without_a_refresh(self):
+        self.scan()
+        self.sign(self.binary, self.library)
+        self.assertEqual(self.scan()[1:], (1, 2))
+
+    def test_refresh_after_signing_keeps_the_manifest_valid(self):
+        self.scan()
+        self.sign(self.binary, self.library)
+        manifest = BundleManifest.load(self.manifest_path)
+        self.assertEqual(manifest.refresh([self.binary, self.library, self.app]), 2)
+        manifest.save()
+        self.assertEqual(self.scan(), ([self.library, self.binary], 3, 0))
+
+    def test_refresh_leaves_unknown_paths_alone(self):
+        self.scan()
+        manifest = BundleManifest.load(self.manifest_path)
+        self.assertEqual(manifest.refresh([os.path.join(self.app, "Contents/Info.plist")]), 0)
+        manifest.save()
+        self.assertEqual(self.recorded(), {self.binary, self.library, self.resource})
+
+    def test_refresh_command_reads_nul_separated_paths(self):
+        self.scan()
+        self.sign(self.binary)
+        plan = b"\0".join(os.fsencode(path) for path in (self.binary, self.app)) + b"\0\0"
+        result = subprocess.run(
+            [sys.executable, script_path("bundle_manifest.py"), "refresh", self.manifest_path],
+            input=plan,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+        )
+        self.assertEqual(result.returncode, 0, result.stderr)
+        self.assertIn(b"refreshed 1 of 2 paths", result.stderr)
+        self.assertEqual(self.scan()[1:], (3, 0))
+
+
+if __name__ == "__main__":
+    unittest.main()
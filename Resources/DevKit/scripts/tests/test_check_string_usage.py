@@ -0,0 +1,79 @@
+"""check_string_usage.py on the project tree and on a synthetic one."""
+
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import unittest
+
+from support import script_path
+
+from check_string_usage import cross_reference, discover_sources, scan_source
+from i18n_tools import project_root
+
+
+class DiscoverSourcesTests(unittest.TestCase):
+    def test_only_targets_with_a_catalog_are_scanned(self):
+        root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, root)
+        for path in (
+            "App/Resources/Localizable.xcstrings",
+            "App/Views/Main.swift",
+            "Widgets/InfoPlist.xcstrings",
+            "Widgets/Widget.swift",
+            "Examples/Demo/main.swift",
+            "AppTests/Tests.swift",
+            "App/.build/Generated.swift",
+        ):
+            os.makedirs(os.path.join(root, os.path.dirname(path)), exist_ok=True)
+            open(os.path.join(root, path), "w").close()
+        self.assertEqual(
+            [os.path.relpath(path, root) for path in discover_sources(root)],
+            [os.path.join("App", "Views", "Main.swift"), os.path.join("Widgets", "Widget.swift")],
+        )
+
+
+class CrossReferenceTests(unittest.TestCase):
+    SOURCE = """
+    Text("Settings")
+    let title: String.LocalizationValue = "Agreements"
+    logger.info("Delete \\(name)")
+    Button(String(localized: "Remove \\(count) files")) {}
+    """
+
+    def cross_reference(self, call_sites_only):
+        strings = {key: {} for key in ("Settings", "Agreements", "Delete %@", "Remove %lld files", "Gone")}
+        catalogs = {"App/Localizable.xcstrings": {"strings": strings}}
+        return cross_reference({"App/View.swift": scan_source(self.SOURCE)}, catalogs, call_sites_only)
+
+    def test_any_matching_literal_counts_as_used(self):
+        self.assertEqual(self.cross_reference(False), ([], {"App/Localizable.xcstrings": ["Gone"]}))
+
+    def test_call_sites_only_ignores_other_literals(self):
+        self.assertEqual(
+            self.cross_reference(True),
+            ([], {"App/Localizable.xcstrings": ["Agreements", "Delete %@", "Gone"]}),
+        )
+
+    def test_small_runs_do_not_import_the_process_pool(self):
+        code = "import sys, check_string_usage; sys.exit('concurrent.futures' in sys.modules)"
+        result = subprocess.run([sys.executable, "-c", code], cwd=os.path.dirname(script_path("check_string_usage.py")))
+        self.assertEqual(result.returncode, 0)
+
+
+class CleanTreeTests(unittest.TestCase):
+    def test_project_has_no_findings(self):
+        result = subprocess.run(
+            [sys.executable, script_path("check_string_usage.py")],
+            cwd=project_root(),
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
+            text=True,
+        )
+        self.assertEqual(result.returncode, 0, result.stdout)
+        self.assertNotIn("Examples/", result.stdout)
+
+
+if __name__ == "__main__":
+    unittest.main()
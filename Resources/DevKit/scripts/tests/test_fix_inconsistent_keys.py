@@ -0,0 +1,84 @@
+"""fix_inconsistent_keys.py reports refused renames instead of success."""
+
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import unittest
+
+from support import script_path, unit
+
+from i18n_tools import catalog_lock, fcntl
+
+
+class FixInconsistentKeysTests(unittest.TestCase):
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.root)
+        self.env = dict(os.environ, FLOWDOWN_I18N_CACHE_DIR=os.path.join(self.root, "cache"))
+        self.catalog = os.path.join(self.root, "Localizable.xcstrings")
+
+    def write(self, strings):
+        with open(self.catalog, "w", encoding="utf-8") as f:
+            json.dump({"sourceLanguage": "en", "strings": strings, "version": "1.0"}, f)
+
+    def run_script(self, *args):
+        result = subprocess.run(
+            [sys.executable, script_path("fix_inconsistent_keys.py"), self.catalog, *args],
+            env=self.env,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
+            text=True,
+        )
+        return result.returncode, result.stdout
+
+    def test_consistent_catalog_succeeds(self):
+        self.write({"Done": {"localizations": {"en": unit("Done")}}})
+        code, output = self.run_script()
+        self.assertEqual(code, 0, output)
+        self.assertIn("All keys already match", output)
+
+    def test_all_renames_refused_fails_without_success_message(self):
+        # Both keys want to become "Done", which also exists already.
+        self.write({
+            "Done": {"localizations": {"en": unit("Done")}},
+            "done": {"localizations": {"en": unit("Done")}},
+            "DONE": {"localizations": {"en": unit("Done")}},
+        })
+        code, output = self.run_script("--dry-run")
+        self.assertEqual(code, 1, output)
+        self.assertIn("Skipped 2 of 2 renames", output)
+        self.assertNotIn("All keys already match", output)
+
+    def test_missing_mapping_keys_are_reported(self):
+        self.write({"Done": {"localizations": {"en": unit("Done")}}})
+        mapping = os.path.join(self.root, "mapping.json")
+        with open(mapping, "w", encoding="utf-8") as f:
+            json.dump({"Gone": "Went"}, f)
+        code, output = self.run_script("--mapping", mapping)
+        self.assertEqual(code, 1, output)
+        self.assertIn("'Gone': key not found", output)
+        self.assertNotIn("All keys already match", output)
+
+    @unittest.skipIf(fcntl is None, "needs fcntl")
+    def test_rename_waits_for_the_catalog_lock(self):
+        self.write({"done": {"localizations": {"en": unit("Done")}}})
+        with catalog_lock(self.catalog):
+            process = subprocess.Popen(
+                [sys.executable, script_path("fix_inconsistent_keys.py"), self.catalog],
+                env=self.env,
+                stdout=subprocess.DEVNULL,
+            )
+            with self.assertRaises(subprocess.TimeoutExpired):
+                process.wait(timeout=1)
+            with open(self.catalog, encoding="utf-8") as f:
+                self.assertIn("done", json.load(f)["strings"])
+        self.assertEqual(process.wait(timeout=30), 0)
+        with open(self.catalog, encoding="utf-8") as f:
+            self.assertEqual(list(json.load(f)["strings"]), ["Done"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,128 @@
+"""Invalidation and fallbacks of the i18n parse cache."""
+
+import json
+import os
+import shutil
+import tempfile
+import time
+import unittest
+from unittest import mock
+
+import support  # noqa: F401 (puts the scripts on sys.path)
+
+import i18n_cache
+
+
+class CacheTestCase(unittest.TestCase):
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.root)
+        self.cache = os.path.join(self.root, "cache")
+        env = mock.patch.dict(os.environ, FLOWDOWN_I18N_CACHE_DIR=self.cache, FLOWDOWN_I18N_CACHE="1")
+        env.start()
+        self.addCleanup(env.stop)
+        self.path = os.path.join(self.root, "Localizable.xcstrings")
+        self.decoded = 0
+
+    def decode(self, raw):
+        self.decoded += 1
+        return json.loads(raw)
+
+    def write(self, document, age=None):
+        with open(self.path, "w", encoding="utf-8") as f:
+            json.dump(document, f)
+        if age is not None:
+            stamp = time.time() - age
+            os.utime(self.path, (stamp, stamp))
+
+    def entries(self):
+        return [name for name in os.listdir(self.cache) if name.endswith(".marshal")]
+
+
+class InvalidationTests(CacheTestCase):
+    def test_unchanged_file_hits(self):
+        self.write({"strings": {"a": 1}}, age=60)
+        self.assertEqual(i18n_cache.load(self.path, self.decode), {"strings": {"a": 1}})
+        self.assertEqual(i18n_cache.load(self.path, self.decode), {"strings": {"a": 1}})
+        self.assertEqual(self.decoded, 1)
+
+    def test_same_size_new_mtime_and_content_misses(self):
+        self.write({"strings": {"a": 1}}, age=60)
+        i18n_cache.load(self.path, self.decode)
+        size = os.path.getsize(self.path)
+        self.write({"strings": {"a": 2}}, age=30)
+        self.assertEqual(os.path.getsize(self.path), size)
+        self.assertEqual(i18n_cache.load(self.path, self.decode), {"strings": {"a": 2}})
+        self.assertEqual(self.decoded, 2)
+
+    def test_same_size_content_change_in_the_same_tick_misses(self):
+        # Written within the racy window, so the entry doesn't trust stat data.
+        self.write({"strings": {"a": 1}})
+        i18n_cache.load(self.path, self.decode)
+        st = os.stat(self.path)
+        self.write({"strings": {"a": 2}})
+        os.utime(self.path, ns=(st.st_atime_ns, st.st_mtime_ns))
+        self.assertEqual(i18n_cache.load(self.path, self.decode), {"strings": {"a": 2}})
+        self.assertEqual(self.decoded, 2)
+
+    def test_touched_file_with_same_content_hits(self):
+        self.write({"strings": {"a": 1}}, age=60)
+        i18n_cache.load(self.path, self.decode)
+        os.utime(self.path)
+        self.assertEqual(i18n_cache.load(self.path, self.decode), {"strings": {"a": 1}})
+        self.assertEqual(self.decoded, 1)
+
+
+class CorruptionTests(CacheTestCase):
+    def corrupt(self, transform):
+        self.write({"strings": {"a": 1}}, age=60)
+        i18n_cache.load(self.path, self.decode)
+        (name,) = self.entries()
+        entry = os.path.join(self.cache, name)
+        with open(entry, "rb") as f:
+            blob = f.read()
+        with open(entry, "wb") as f:
+            f.write(transform(blob))
+
+    def test_corrupt_payload_falls_back_to_a_parse(self):
+        self.corrupt(lambda blob: blob[:-3] + b"\xff\xff\xff")
+        self.assertEqual(i18n_cache.load(self.path, self.decode), {"strings": {"a": 1}})
+        self.assertEqual(self.decoded, 2)
+
+    def test_truncated_entry_falls_back_to_a_parse(self):
+        self.corrupt(lambda blob: blob[:2])
+        self.assertEqual(i18n_cache.load(self.path, self.decode), {"strings": {"a": 1}})
+        self.assertEqual(self.decoded, 2)
+        # The entry is rewritten, so the next load hits again.
+        self.assertEqual(i18n_cache.load(self.path, self.decode), {"strings": {"a": 1}})
+        self.assertEqual(self.decoded, 2)
+
+    def test_corrupt_recalled_value_is_a_miss(self):
+        i18n_cache.remember("failing:abc", ["x"])
+        self.assertEqual(i18n_cache.recall("failing:abc"), ["x"])
+        (name,) = self.entries()
+        with open(os.path.join(self.cache, name), "r+b") as f:
+            f.truncate(os.path.getsize(f.name) - 2)
+        self.assertIsNone(i18n_cache.recall("failing:abc"))
+
+
+class EnvironmentTests(CacheTestCase):
+    def test_cache_dir_override_is_used(self):
+        self.assertEqual(i18n_cache.cache_dir(), os.path.abspath(self.cache))
+        self.write({"strings": {}}, age=60)
+        i18n_cache.load(self.path, self.decode)
+        self.assertEqual(len(self.entries()), 1)
+
+    def test_disabled_cache_writes_nothing(self):
+        with mock.patch.dict(os.environ, FLOWDOWN_I18N_CACHE="0"):
+            self.write({"strings": {}}, age=60)
+            i18n_cache.load(self.path, self.decode)
+            i18n_cache.load(self.path, self.decode)
+            i18n_cache.remember("name", 1)
+            self.assertIsNone(i18n_cache.recall("name"))
+        self.assertEqual(self.decoded, 2)
+        self.assertFalse(os.path.exists(self.cache))
+
+
+if __name__ == "__main__":
+    unittest.main()
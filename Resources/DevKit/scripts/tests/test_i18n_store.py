@@ -0,0 +1,113 @@
+"""Catalogs imported into and exported from the SQLite store."""
+
+import contextlib
+import io
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+from unittest import mock
+
+from support import unit
+
+import i18n_store
+import xcstrings_format
+
+
+def catalog(*keys):
+    return {
+        "sourceLanguage": "en",
+        "strings": {key: {"localizations": {"en": unit(key), "de": unit(f"[de] {key}")}} for key in keys},
+        "version": "1.0",
+    }
+
+
+class StoreTestCase(unittest.TestCase):
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.root)
+        patcher = mock.patch.object(i18n_store, "project_root", return_value=self.root)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.app = self.write("FlowDown/Resources/Localizable.xcstrings", catalog(*(f"App {i}" for i in range(20))))
+        self.widgets = self.write("FlowDownWidgets/Localizable.xcstrings", catalog("Widget 1", "Widget 2"))
+
+    def write(self, relative, data):
+        path = os.path.join(self.root, relative)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        xcstrings_format.write_strings(path, data)
+        return path
+
+    def read(self, path):
+        with open(path, "rb") as f:
+            return f.read()
+
+    def run_store(self, *args):
+        output = io.StringIO()
+        with mock.patch.object(sys, "argv", ["i18n_store.py", *args]), contextlib.redirect_stdout(output):
+            code = i18n_store.main()
+        return code, output.getvalue()
+
+
+class SeparateCatalogTests(StoreTestCase):
+    def test_importing_two_catalogs_loses_neither(self):
+        app_bytes, widget_bytes = self.read(self.app), self.read(self.widgets)
+        self.assertIn("20 added, 0 changed, 0 removed", self.run_store("import", self.app)[1])
+        self.assertIn("2 added, 0 changed, 0 removed", self.run_store("import", self.widgets)[1])
+        self.assertIn("0 removed, 20 unchanged", self.run_store("import", self.app)[1])
+
+        self.assertEqual(self.run_store("export", self.app), (0, f"✅ {self.app} is already up to date\n"))
+        self.assertEqual(self.run_store("export", self.widgets), (0, f"✅ {self.widgets} is already up to date\n"))
+        self.assertEqual(self.read(self.app), app_bytes)
+        self.assertEqual(self.read(self.widgets), widget_bytes)
+
+    def test_stores_follow_the_catalog_path(self):
+        self.assertEqual(
+            i18n_store.default_db_path(self.app),
+            os.path.join(self.root, ".build", "i18n-store", "FlowDown", "Resources", "Localizable.sqlite"),
+        )
+        self.assertNotEqual(i18n_store.default_db_path(self.app), i18n_store.default_db_path(self.widgets))
+        outside = os.path.join(tempfile.gettempdir(), "Localizable.xcstrings")
+        self.assertNotIn(os.pardir, os.path.relpath(i18n_store.default_db_path(outside), self.root))
+
+    def test_store_records_its_source(self):
+        self.run_store("import", self.app)
+        conn = i18n_store.connect(i18n_store.default_db_path(self.app))
+        self.addCleanup(conn.close)
+        self.assertEqual(i18n_store.store_source(conn), os.path.abspath(self.app))
+        self.assertEqual(i18n_store.export_catalog(conn), catalog(*(f"App {i}" for i in range(20))))
+
+
+class SourceGuardTests(StoreTestCase):
+    def setUp(self):
+        super().setUp()
+        self.db = os.path.join(self.root, "shared.sqlite")
+        self.run_store("--db", self.db, "import", self.widgets)
+
+    def test_export_refuses_another_catalog(self):
+        before = self.read(self.app)
+        code, output = self.run_store("--db", self.db, "export", self.app)
+        self.assertEqual(code, 1)
+        self.assertIn("pass --force", output)
+        self.assertEqual(self.read(self.app), before)
+
+    def test_export_with_force_writes_the_other_catalog(self):
+        self.assertEqual(self.run_store("--db", self.db, "export", self.app, "--force")[0], 0)
+        self.assertEqual(self.read(self.app), self.read(self.widgets))
+
+    def test_import_refuses_to_replace_another_catalog(self):
+        code, output = self.run_store("--db", self.db, "import", self.app)
+        self.assertEqual(code, 1)
+        self.assertIn("pass --force", output)
+        self.assertIn("0 removed, 2 unchanged", self.run_store("--db", self.db, "import", self.widgets)[1])
+        self.assertIn("20 added, 0 changed, 2 removed", self.run_store("--db", self.db, "import", self.app, "--force")[1])
+
+    def test_empty_store_is_not_exported(self):
+        code, output = self.run_store("--db", os.path.join(self.root, "empty.sqlite"), "export", self.app)
+        self.assertEqual(code, 1)
+        self.assertIn("import a catalog first", output)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,142 @@
+"""Incremental (--base) checks must report what a full run does."""
+
+import contextlib
+import io
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import unittest
+from unittest import mock
+
+from support import SCRIPTS_DIR, script_path, unit
+
+import i18n_tools
+import xcstrings_format
+
+
+MAIN_CATALOG = os.path.join(SCRIPTS_DIR, "..", "..", "..", "FlowDown", "Resources", "Localizable.xcstrings")
+
+LANGUAGES = ("de", "es", "fr", "ja", "ko", "zh-Hans")
+
+CATALOG = {
+    "sourceLanguage": "en",
+    "strings": {
+        "Done": {"localizations": {"en": unit("Done"), **{lang: unit(f"[{lang}] Done") for lang in LANGUAGES}}},
+        # Fails already at the base: German and French are missing.
+        "Open": {"localizations": {"en": unit("Open"), **{lang: unit("x") for lang in ("es", "ja", "ko", "zh-Hans")}}},
+        "Removed": {
+            "extractionState": "stale",
+            "localizations": {"en": unit("Removed"), **{lang: unit("x") for lang in LANGUAGES}},
+        },
+    },
+    "version": "1.0",
+}
+
+
+@unittest.skipUnless(shutil.which("git"), "needs git")
+class IncrementalAuditTests(unittest.TestCase):
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.root)
+        self.env = dict(os.environ, FLOWDOWN_I18N_CACHE_DIR=os.path.join(self.root, "cache"))
+        self.catalog = os.path.join(self.root, "Localizable.xcstrings")
+        xcstrings_format.write_strings(self.catalog, CATALOG)
+        for args in (["init", "-q"], ["add", "Localizable.xcstrings"]):
+            subprocess.run(["git", "-C", self.root, *args], check=True)
+        subprocess.run(
+            ["git", "-C", self.root, "-c", "user.name=t", "-c", "user.email=t@t", "commit", "-qm", "base"],
+            check=True,
+        )
+
+    def run_script(self, script, *args):
+        result = subprocess.run(
+            [sys.executable, script_path(script), self.catalog, *args],
+            env=self.env,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
+            text=True,
+        )
+        return result.returncode, result.stdout
+
+    def reset(self):
+        subprocess.run(["git", "-C", self.root, "checkout", "-q", "--", "Localizable.xcstrings"], check=True)
+
+    def test_exit_codes_match_full_run_on_failing_catalog(self):
+        for script in ("check_untranslated.py", "check_translations.py", "check_placeholders.py"):
+            with self.subTest(script=script):
+                full, _ = self.run_script(script)
+                self.reset()
+                incremental, output = self.run_script(script, "--base", "HEAD")
+                self.reset()
+                self.assertEqual(full, incremental, output)
+        self.assertEqual(self.run_script("check_untranslated.py", "--base", "HEAD")[0], 1)
+
+    def test_incremental_run_reports_unchanged_failures(self):
+        _, output = self.run_script("check_untranslated.py", "--base", "HEAD")
+        self.assertIn("Key: Open", output)
+        self.assertIn("Missing: de, fr", output)
+
+    def test_incremental_run_prunes_unchanged_stale_keys(self):
+        code, output = self.run_script("check_translations.py", "--base", "HEAD")
+        self.assertIn("  - Removed", output)
+        with open(self.catalog, encoding="utf-8") as f:
+            self.assertNotIn("Removed", json.load(f)["strings"])
+        self.assertEqual(code, 1)
+
+    def test_cached_base_findings_give_the_same_result(self):
+        first = self.run_script("check_untranslated.py", "--base", "HEAD")
+        second = self.run_script("check_untranslated.py", "--base", "HEAD")
+        self.assertEqual(first, second)
+
+
+@unittest.skipUnless(shutil.which("git") and os.path.exists(MAIN_CATALOG), "needs git and the main catalog")
+class MainCatalogTests(unittest.TestCase):
+    OPTIONS = {
+        "checks": ["untranslated", "placeholders"],
+        "target_langs": i18n_tools.DEFAULT_KEEP_LANGUAGES,
+        "exceptions": i18n_tools.UNTRANSLATED_EXCEPTIONS,
+    }
+
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.root)
+        env = mock.patch.dict(os.environ, FLOWDOWN_I18N_CACHE_DIR=os.path.join(self.root, "cache"))
+        env.start()
+        self.addCleanup(env.stop)
+        self.catalog = os.path.join(self.root, "Localizable.xcstrings")
+        shutil.copyfile(MAIN_CATALOG, self.catalog)
+        for args in (["init", "-q"], ["add", "Localizable.xcstrings"], ["commit", "-qm", "base"]):
+            subprocess.run(["git", "-C", self.root, "-c", "user.name=t", "-c", "user.email=t@t", *args], check=True)
+
+        # Break two entries the way an edit would, leaving every other entry's bytes alone.
+        with open(self.catalog, encoding="utf-8") as f:
+            data = json.load(f)
+        self.keys = [key for key in data["strings"] if key not in i18n_tools.UNTRANSLATED_EXCEPTIONS][100:102]
+        first, second = (data["strings"][key]["localizations"] for key in self.keys)
+        del first["de"]
+        second["fr"] = unit("%@ %@")
+        with open(self.catalog, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False, indent=2, separators=(",", " : "))
+
+    def audit(self, revision):
+        with contextlib.redirect_stdout(io.StringIO()) as output:
+            results = i18n_tools.audit_since(self.catalog, None, revision, **self.OPTIONS)
+        return results, output.getvalue()
+
+    def test_incremental_run_decodes_only_what_it_checks(self):
+        full, _ = self.audit(None)
+        self.audit("HEAD")  # Index the base blob and the edited file.
+        with mock.patch.object(i18n_tools, "_decode_strings", side_effect=AssertionError("decoded the catalog")):
+            with mock.patch.object(i18n_tools, "load_strings", side_effect=AssertionError("loaded the catalog")):
+                incremental, output = self.audit("HEAD")
+        self.assertEqual(incremental, full)
+        self.assertIn("🔎 Checking", output)
+        self.assertIn({"key": self.keys[0], "missing": ["de"]}, full["untranslated"])
+        self.assertIn((self.keys[1], "fr"), [(key, lang) for key, lang, _ in full["placeholders"]])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,145 @@
+"""Format specifier signatures and the placeholders audit check."""
+
+import unittest
+
+from support import unit
+
+from i18n_tools import audit_strings, compare_format_signatures, format_signature
+
+
+def compare(expected, found):
+    return compare_format_signatures(format_signature(expected), format_signature(found))
+
+
+def placeholders(strings, **options):
+    return audit_strings({"strings": strings}, checks=["placeholders"], **options)["placeholders"]
+
+
+class FormatSignatureTests(unittest.TestCase):
+    def test_sequential_specifiers_take_the_next_index(self):
+        self.assertEqual(format_signature("%@ sent %lld files"), ((1, "@"), (2, "lld")))
+
+    def test_positional_specifiers_keep_their_index(self):
+        self.assertEqual(format_signature("%2$lld files from %1$@"), ((2, "lld"), (1, "@")))
+
+    def test_length_modifiers_are_part_of_the_type(self):
+        self.assertEqual(format_signature("%lld %ld %d %hhu"), ((1, "lld"), (2, "ld"), (3, "d"), (4, "hhu")))
+
+    def test_i_is_normalized_to_d(self):
+        self.assertEqual(format_signature("%i and %lli"), ((1, "d"), (2, "lld")))
+
+    def test_percent_literal_is_skipped(self):
+        self.assertEqual(format_signature("100%% of %@"), ((1, "@"),))
+        self.assertEqual(format_signature("100%%"), ())
+
+    def test_flags_width_and_precision_are_ignored(self):
+        self.assertEqual(format_signature("%.2f %-5@ %08.3lf"), ((1, "f"), (2, "@"), (3, "lf")))
+
+    def test_plain_text_has_no_specifiers(self):
+        self.assertEqual(format_signature("Done"), ())
+
+
+class CompareSignaturesTests(unittest.TestCase):
+    def test_identical_specifiers_agree(self):
+        self.assertIsNone(compare("%@ sent %lld files", "%@ hat %lld Dateien gesendet"))
+
+    def test_positional_reordering_agrees(self):
+        self.assertIsNone(compare("%@ sent %lld files", "%2$lld 个文件由 %1$@ 发送"))
+        self.assertIsNone(compare("%1$@ and %2$@", "%2$@ und %1$@"))
+
+    def test_sequential_reordering_is_reported(self):
+        problem = compare("%@ sent %lld files", "%lld Dateien von %@")
+        self.assertTrue(problem.startswith("specifier order differs"), problem)
+        self.assertIn("use positional %1$@ forms", problem)
+
+    def test_missing_specifier_is_reported(self):
+        self.assertEqual(
+            compare("%@ and %@", "%@"),
+            "specifier count 1 != 2 (expected %@, %@, found %@)",
+        )
+        self.assertEqual(compare("%lld files", "Files"), "specifier count 0 != 1 (expected %lld, found none)")
+
+    def test_extra_specifier_is_reported(self):
+        self.assertTrue(compare("Files", "%lld Dateien").startswith("specifier count 1 != 0"))
+
+    def test_lld_and_d_differ(self):
+        self.assertEqual(compare("%lld files", "%d Dateien"), "specifier types differ (expected %lld, found %d)")
+
+    def test_i_and_d_agree(self):
+        self.assertIsNone(compare("%d files", "%i Dateien"))
+
+    def test_percent_literal_does_not_count(self):
+        self.assertIsNone(compare("100%% done", "100 % fertig"))
+        self.assertIsNone(compare("%lld%% done", "%lld %% fertig"))
+
+
+class PlaceholderCheckTests(unittest.TestCase):
+    def test_reports_mismatches_per_language(self):
+        strings = {
+            "%@ sent %lld files": {
+                "localizations": {
+                    "en": unit("%@ sent %lld files"),
+                    "de": unit("%@ hat %lld Dateien gesendet"),
+                    "fr": unit("%@ a envoyé des fichiers"),
+                    "ja": unit("%2$lld 個のファイルを %1$@ が送信"),
+                    "ko": unit("%lld개 파일을 %@이(가) 보냄"),
+                    "es": unit("%@ envió %d archivos"),
+                    "zh-Hans": unit(""),
+                }
+            }
+        }
+        self.assertEqual(
+            [(lang, problem.split(" (")[0]) for _, lang, problem in placeholders(strings)],
+            [("fr", "specifier count 1 != 2"), ("ko", "specifier order differs"), ("es", "specifier types differ")],
+        )
+
+    def test_key_is_the_source_without_an_english_unit(self):
+        strings = {"%lld files": {"localizations": {"de": unit("Dateien")}}}
+        self.assertEqual(placeholders(strings), [("%lld files", "de", "specifier count 0 != 1 (expected %lld, found none)")])
+
+    def test_non_translatable_keys_are_skipped(self):
+        strings = {"%@": {"shouldTranslate": False, "localizations": {"en": unit("%@"), "de": unit("x")}}}
+        self.assertEqual(placeholders(strings), [])
+
+    def test_plural_units_compare_with_their_english_form(self):
+        strings = {
+            "%lld files": {
+                "localizations": {
+                    "en": {"variations": {"plural": {"one": unit("%lld file"), "other": unit("%lld files")}}},
+                    "ru": {
+                        "variations": {
+                            "plural": {
+                                "one": unit("%lld файл"),
+                                # No English "few": compared with "other".
+                                "few": unit("файла"),
+                                "other": unit("%d файлов"),
+                            }
+                        }
+                    },
+                }
+            }
+        }
+        self.assertEqual(
+            placeholders(strings),
+            [
+                ("%lld files", "ru", "specifier count 0 != 1 (expected %lld, found none) (plural.few)"),
+                ("%lld files", "ru", "specifier types differ (expected %lld, found %d) (plural.other)"),
+            ],
+        )
+
+    def test_changes_limit_the_languages_checked(self):
+        strings = {
+            "%lld files": {
+                "localizations": {"en": unit("%lld files"), "de": unit("Dateien"), "fr": unit("fichiers")}
+            }
+        }
+        self.assertEqual([lang for _, lang, _ in placeholders(strings, changes={"%lld files": {"de"}})], ["de"])
+        # A changed English source puts every translation of the key in scope.
+        self.assertEqual(
+            [lang for _, lang, _ in placeholders(strings, changes={"%lld files": {"en"}})],
+            ["de", "fr"],
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
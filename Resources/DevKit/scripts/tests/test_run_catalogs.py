@@ -0,0 +1,86 @@
+"""run_catalogs keeps every catalog's report when a worker fails, and the project workers it runs."""
+
+import contextlib
+import io
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+from unittest import mock
+
+import support  # noqa: F401 (puts the scripts on sys.path)
+
+import i18n_pipeline
+import i18n_tools
+import update_missing_i18n
+import xcstrings_format
+from i18n_tools import is_default_catalog, run_catalogs
+
+
+def worker(file_path):
+    name = os.path.basename(file_path)
+    if name == "raises":
+        raise OSError("disk full")
+    print(f"checked {name}")
+    print(f"warning for {name}", file=sys.stderr)
+    if name == "exits":
+        sys.exit(1)
+    return 0
+
+
+class RunCatalogsTests(unittest.TestCase):
+    def run_all(self, jobs):
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output):
+            code = run_catalogs(worker, ["/tmp/a", "/tmp/raises", "/tmp/exits", "/tmp/b"], jobs=jobs)
+        return code, output.getvalue()
+
+    def test_exception_in_one_worker_keeps_other_reports(self):
+        for jobs in (1, 2):
+            with self.subTest(jobs=jobs):
+                code, output = self.run_all(jobs)
+                self.assertEqual(code, 1)
+                self.assertIn("checked a", output)
+                self.assertIn("checked b", output)
+                self.assertIn("OSError: disk full", output)
+                self.assertIn("2 of 4 catalogs failed", output)
+                self.assertIn("raises", output.splitlines()[-1])
+                self.assertIn("exits", output.splitlines()[-1])
+
+    def test_stderr_is_part_of_the_report(self):
+        _, output = self.run_all(1)
+        section = output.split("==> ")[1]
+        self.assertIn("warning for a", section)
+
+
+class ProjectWorkerTests(unittest.TestCase):
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.root)
+        patcher = mock.patch.object(i18n_tools, "project_root", return_value=self.root)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.catalog = os.path.join(self.root, "FlowDownWidgets", "Localizable.xcstrings")
+        os.makedirs(os.path.dirname(self.catalog))
+        strings = {"FlowDown": {"shouldTranslate": False, "localizations": {"en": support.unit("FlowDown")}}}
+        xcstrings_format.write_strings(self.catalog, {"sourceLanguage": "en", "strings": strings, "version": "1.0"})
+
+    def test_workers_run_without_the_default_catalog(self):
+        self.assertFalse(os.path.exists(i18n_tools.default_file_path()))
+        for worker in (i18n_pipeline.run_project_pipeline, update_missing_i18n.update_project_catalog):
+            with self.subTest(worker=worker.__name__), contextlib.redirect_stdout(io.StringIO()):
+                self.assertEqual(worker(self.catalog), 0)
+
+    def test_default_catalog_is_matched_through_links(self):
+        default = i18n_tools.default_file_path()
+        self.assertTrue(is_default_catalog(default))
+        self.assertFalse(is_default_catalog(self.catalog))
+        os.makedirs(os.path.dirname(default))
+        os.symlink(default, os.path.join(self.root, "Localizable.xcstrings"))
+        self.assertTrue(is_default_catalog(os.path.join(self.root, "Localizable.xcstrings")))
+        self.assertTrue(is_default_catalog(os.path.join(self.root, "FlowDown", "..", "FlowDown", "Resources", "Localizable.xcstrings")))
+
+
+if __name__ == "__main__":
+    unittest.main()
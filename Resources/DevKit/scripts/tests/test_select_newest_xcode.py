@@ -0,0 +1,171 @@
+"""select_newest_xcode.py against a fake Applications directory."""
+
+import itertools
+import json
+import os
+import plistlib
+import shutil
+import subprocess
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+from support import script_path
+
+import select_newest_xcode
+from select_newest_xcode import (
+    discover_xcodes,
+    read_all_metadata,
+    read_metadata,
+    select_newest,
+    version_key,
+)
+
+
+class FakeApplicationsTestCase(unittest.TestCase):
+    def setUp(self):
+        self.root = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, self.root)
+        self.applications = self.root / "Applications"
+        self.applications.mkdir()
+
+    def install(self, name: str, version: str = None, build: str = "") -> Path:
+        bundle = self.applications / name
+        (bundle / "Contents/Developer").mkdir(parents=True)
+        if version is not None:
+            self.write_plist(bundle, version, build)
+        return bundle
+
+    def write_plist(self, bundle: Path, version: str, build: str = "") -> Path:
+        path = bundle / "Contents/Info.plist"
+        info = {"CFBundleShortVersionString": version}
+        if build:
+            info["CFBundleVersion"] = build
+        with path.open("wb") as handle:
+            plistlib.dump(info, handle)
+        return path
+
+
+class DiscoveryTests(FakeApplicationsTestCase):
+    def test_discovers_release_bundles_by_name(self):
+        self.install("Xcode_16.1.app", "16.1", "16B40")
+        self.install("Xcode.app", "15.4", "15F31d")
+        self.install("Xcode-beta.app", "26.0", "17A5241e")
+        self.install("Simulator.app", "16.0")
+        (self.applications / "Xcode-notes.app").write_text("not a bundle")
+        self.assertEqual(
+            [bundle.name for bundle in discover_xcodes(self.applications)],
+            ["Xcode.app", "Xcode_16.1.app"],
+        )
+
+    def test_missing_directory_finds_nothing(self):
+        self.assertEqual(discover_xcodes(self.root / "missing"), [])
+
+    def test_bundles_without_a_version_are_skipped(self):
+        self.install("Xcode_NoPlist.app")
+        self.install("Xcode_NoVersion.app", "")
+        bundles = discover_xcodes(self.applications)
+        self.assertEqual(len(bundles), 2)
+        self.assertEqual(read_all_metadata(bundles), [])
+
+    def test_script_selects_newest_in_applications_dir(self):
+        self.install("Xcode.app", "15.4", "15F31d")
+        newest = self.install("Xcode_16.10.app", "16.10", "16C5032a")
+        self.install("Xcode_16.9.app", "16.9", "16B40")
+        env = dict(
+            os.environ,
+            XCODE_APPLICATIONS_DIR=str(self.applications),
+            XCODE_METADATA_CACHE=str(self.root / "cache.json"),
+        )
+        result = subprocess.run(
+            [sys.executable, script_path("select_newest_xcode.py"), "--dry-run"],
+            env=env,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
+            text=True,
+        )
+        self.assertEqual(result.returncode, 0, result.stdout)
+        self.assertIn(f"selecting Xcode 16.10 (build 16C5032a) at {newest}", result.stdout)
+        with open(self.root / "cache.json", encoding="utf-8") as handle:
+            self.assertEqual(len(json.load(handle)["entries"]), 3)
+
+
+class MetadataCacheTests(FakeApplicationsTestCase):
+    def test_hit_while_mtime_and_size_match(self):
+        bundle = self.install("Xcode.app", "16.1", "16B40")
+        plist = bundle / "Contents/Info.plist"
+        cache: dict = {}
+        self.assertEqual(read_metadata(bundle, cache)["version"], "16.1")
+        self.assertEqual(cache[str(plist)]["mtime_ns"], plist.stat().st_mtime_ns)
+
+        # Same size and mtime: the cached version is used without parsing.
+        st = plist.stat()
+        self.write_plist(bundle, "16.2", "16B40")
+        os.utime(plist, ns=(st.st_atime_ns, st.st_mtime_ns))
+        self.assertEqual(plist.stat().st_size, st.st_size)
+        self.assertEqual(read_metadata(bundle, cache)["version"], "16.1")
+
+    def test_miss_when_mtime_changes(self):
+        bundle = self.install("Xcode.app", "16.1", "16B40")
+        plist = bundle / "Contents/Info.plist"
+        cache: dict = {}
+        read_metadata(bundle, cache)
+
+        st = plist.stat()
+        self.write_plist(bundle, "16.2", "16B40")
+        os.utime(plist, ns=(st.st_atime_ns, st.st_mtime_ns + 1))
+        self.assertEqual(read_metadata(bundle, cache)["version"], "16.2")
+        self.assertEqual(cache[str(plist)]["version"], "16.2")
+        self.assertEqual(cache[str(plist)]["mtime_ns"], st.st_mtime_ns + 1)
+
+    def test_cache_round_trips_through_its_file(self):
+        bundle = self.install("Xcode.app", "16.1", "16B40")
+        path = self.root / "cache" / "select-xcode.json"
+        cache: dict = {}
+        read_metadata(bundle, cache)
+        select_newest_xcode.save_metadata_cache(path, cache)
+        self.assertEqual(select_newest_xcode.load_metadata_cache(path), cache)
+        path.write_text(json.dumps({"version": 0, "entries": cache}))
+        self.assertEqual(select_newest_xcode.load_metadata_cache(path), {})
+
+
+def sorted_newest(candidates):
+    """The selection before select_newest became a single pass."""
+    if not candidates:
+        return None
+    return sorted(candidates, key=lambda item: item["sort_key"])[-1]
+
+
+class SelectNewestTests(unittest.TestCase):
+    def candidate(self, name, version, build=""):
+        return {
+            "path": Path(name),
+            "version": version,
+            "build": build,
+            "sort_key": (version_key(version), version_key(build) if build else ()),
+        }
+
+    def test_version_key_orders_numerically(self):
+        versions = ["9.4.1", "16", "16.0", "16.1", "16.9", "16.10", "26.0"]
+        self.assertEqual(sorted(reversed(versions), key=version_key), versions)
+
+    def test_ties_match_sorted(self):
+        candidates = [
+            self.candidate("Xcode.app", "16.1", "16B40"),
+            self.candidate("Xcode_16.1.app", "16.1", "16B40"),
+            self.candidate("Xcode_16.1-copy.app", "16.1", "16B40"),
+            self.candidate("Xcode_16.1-nobuild.app", "16.1"),
+            self.candidate("Xcode_15.app", "15.4", "15F31d"),
+        ]
+        for order in itertools.permutations(candidates):
+            order = list(order)
+            with self.subTest(order=[item["path"].name for item in order]):
+                self.assertIs(select_newest(order), sorted_newest(order))
+
+    def test_empty(self):
+        self.assertIsNone(select_newest([]))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,184 @@
+"""Work packages exported by translation_exchange and filled in by a vendor import back losslessly."""
+
+import copy
+import csv
+import glob
+import os
+import shutil
+import tempfile
+import unittest
+import xml.etree.ElementTree as ET
+
+from support import unit
+
+from translation_exchange import PACKAGE_FORMATS, import_translations, read_translations, write_packages
+from xcstrings_units import iter_units, split_unit_id, unit_at, unit_id
+
+LANGUAGES = ["de", "ja", "zh-Hans"]
+
+
+def plural(one, other, state="translated"):
+    return {"variations": {"plural": {"one": unit(one, state), "other": unit(other, state)}}}
+
+
+def substitution(text, one, other):
+    return {
+        "stringUnit": {"state": "translated", "value": text},
+        "substitutions": {
+            "files": {
+                "argNum": 1,
+                "formatSpecifier": "lld",
+                "variations": {"plural": {"one": unit(one), "other": unit(other)}},
+            }
+        },
+    }
+
+
+# Every language of every translatable key is complete.
+COMPLETE = {
+    "sourceLanguage": "en",
+    "strings": {
+        "Open \"%@\", then <save> & quit": {
+            "comment": "Menu item, keep the quotes",
+            "localizations": {
+                "en": unit("Open \"%@\", then <save> & quit"),
+                "de": unit("„%@“ öffnen, dann <sichern> & beenden"),
+                "ja": unit("「%@」を開いて<保存>して終了"),
+                "zh-Hans": unit("打开“%@”，然后<保存>并退出"),
+            },
+        },
+        "%lld files": {
+            "localizations": {
+                "en": plural("%lld file", "%lld files"),
+                "de": plural("%lld Datei", "%lld Dateien"),
+                "ja": plural("%lld 個のファイル", "%lld 個のファイル"),
+                "zh-Hans": plural("%lld 个文件", "%lld 个文件"),
+            },
+        },
+        "Tap to continue": {
+            "localizations": {
+                lang: {"variations": {"device": {"iphone": unit(iphone), "mac": unit(mac)}}}
+                for lang, iphone, mac in (
+                    ("en", "Tap to continue", "Click to continue"),
+                    ("de", "Tippen zum Fortfahren", "Klicken zum Fortfahren"),
+                    ("ja", "タップして続行", "クリックして続行"),
+                    ("zh-Hans", "轻点以继续", "点按以继续"),
+                )
+            },
+        },
+        "%#@files@ in %@": {
+            "comment": "Line one\nLine two",
+            "localizations": {
+                "en": substitution("%#@files@ in %@", "%arg file", "%arg files"),
+                "de": substitution("%#@files@ in %@", "%arg Datei", "%arg Dateien"),
+                "ja": substitution("%@ の %#@files@", "%arg 個のファイル", "%arg 個のファイル"),
+                "zh-Hans": substitution("%@ 中的 %#@files@", "%arg 个文件", "%arg 个文件"),
+            },
+        },
+        "FlowDown": {"shouldTranslate": False, "localizations": {"en": unit("FlowDown")}},
+    },
+    "version": "1.0",
+}
+
+
+def with_gaps():
+    """COMPLETE with missing, empty and unreviewed units for the packages to carry."""
+    data = copy.deepcopy(COMPLETE)
+    strings = data["strings"]
+    menu = strings["Open \"%@\", then <save> & quit"]["localizations"]
+    del menu["de"]
+    menu["ja"]["stringUnit"]["state"] = "needs_review"
+    menu["zh-Hans"]["stringUnit"]["value"] = ""
+    files = strings["%lld files"]["localizations"]
+    del files["ja"]
+    files["de"]["variations"]["plural"]["other"]["stringUnit"]["value"] = " "
+    strings["Tap to continue"]["localizations"]["zh-Hans"]["variations"]["device"]["mac"]["stringUnit"]["state"] = "new"
+    del strings["%#@files@ in %@"]["localizations"]["de"]
+    return data
+
+
+def complete_value(record_id, language):
+    key, path = split_unit_id(record_id)
+    return unit_at(COMPLETE["strings"][key]["localizations"][language], path)["value"]
+
+
+def fill_csv(path):
+    with open(path, encoding="utf-8", newline="") as f:
+        rows = list(csv.reader(f))
+    header = rows[0]
+    key, language, target = header.index("key"), header.index("language"), header.index("target")
+    for row in rows[1:]:
+        row[target] = complete_value(row[key], row[language])
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        csv.writer(f).writerows(rows)
+
+
+def fill_xliff(path):
+    tree = ET.parse(path)
+    root = tree.getroot()
+    namespace = root.tag[: root.tag.index("}") + 1]
+    ET.register_namespace("", namespace[1:-1])
+    if root.get("version") == "2.0":
+        language = root.get("trgLang")
+        for element in root.iter(namespace + "unit"):
+            segment = element.find(namespace + "segment")
+            ET.SubElement(segment, namespace + "target").text = complete_value(element.get("name"), language)
+    else:
+        language = root.find(namespace + "file").get("target-language")
+        for element in root.iter(namespace + "trans-unit"):
+            ET.SubElement(element, namespace + "target").text = complete_value(element.get("id"), language)
+    tree.write(path, encoding="UTF-8", xml_declaration=True)
+
+
+class RoundTripTests(unittest.TestCase):
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.root)
+        self.catalog = os.path.join(self.root, "Localizable.xcstrings")
+
+    def export(self, data, package_format):
+        out_dir = os.path.join(self.root, package_format)
+        os.makedirs(out_dir)
+        counts = write_packages(data, self.catalog, out_dir, package_format, LANGUAGES)
+        return counts, sorted(glob.glob(os.path.join(out_dir, "*." + PACKAGE_FORMATS[package_format].extension)))
+
+    def test_filled_packages_restore_the_complete_catalog(self):
+        for package_format in PACKAGE_FORMATS:
+            with self.subTest(format=package_format):
+                data = with_gaps()
+                counts, packages = self.export(data, package_format)
+                # de: the menu item, the "other" plural form, and the substitution's three units.
+                self.assertEqual(counts, {"de": 5, "ja": 3, "zh-Hans": 2})
+                for path in packages:
+                    (fill_csv if package_format == "csv" else fill_xliff)(path)
+                    report = import_translations(data, read_translations(path))
+                    self.assertEqual((report["conflicts"], report["unknown"], report["skipped"]), ([], 0, 0))
+                self.assertEqual(data, COMPLETE)
+
+    def test_complete_catalog_exports_nothing(self):
+        for package_format in PACKAGE_FORMATS:
+            with self.subTest(format=package_format):
+                self.assertEqual(self.export(copy.deepcopy(COMPLETE), package_format), ({}, []))
+
+    def test_reimporting_current_values_leaves_the_catalog_unchanged(self):
+        path = os.path.join(self.root, "all.csv")
+        english = 0
+        with open(path, "w", encoding="utf-8", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow(["key", "language", "target"])
+            for key, entry in COMPLETE["strings"].items():
+                for language, loc in entry["localizations"].items():
+                    for unit_path, current in iter_units(loc):
+                        writer.writerow([unit_id(key, unit_path), language, current["value"]])
+                        english += language == "en"
+            writer.writerow(["FlowDown", "de", "FlowDown"])
+        data = copy.deepcopy(COMPLETE)
+        report = import_translations(data, read_translations(path))
+        self.assertEqual(data, COMPLETE)
+        self.assertEqual((report["applied"], report["conflicts"]), (0, []))
+        # English and shouldTranslate: false records are skipped rather than applied.
+        self.assertEqual(report["skipped"], english + 1)
+        self.assertEqual(report["languages"]["de"]["unchanged"], 8)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,124 @@
+"""Lookups in the translation memory and its incremental re-indexing."""
+
+import json
+import os
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+from support import unit
+
+import translation_memory
+import xcstrings_format
+from translation_memory import TranslationMemory, index_catalog
+
+
+def entry(english, **translations):
+    locs = {"en": unit(english)}
+    locs.update((lang, unit(value)) for lang, value in translations.items())
+    return {"localizations": locs}
+
+
+STRINGS = {
+    "Reasoning": entry("Reasoning", de="Schlussfolgern"),
+    "Reasoning Budget": entry("Reasoning Budget", de="Denkbudget", ja="推論予算"),
+    "Reasoning Mode": entry("Reasoning Mode", de="Denkmodus"),
+    "Send Message": entry("Send Message", de="Nachricht senden"),
+    "FlowDown": {"shouldTranslate": False, "localizations": {"en": unit("FlowDown")}},
+}
+
+
+class TranslationMemoryTests(unittest.TestCase):
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.root)
+        patcher = mock.patch.object(translation_memory, "project_root", return_value=self.root)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.catalog = os.path.join(self.root, "Localizable.xcstrings")
+        self.strings = json.loads(json.dumps(STRINGS))
+        self.save()
+
+    def save(self, canonical=True):
+        data = {"sourceLanguage": "en", "strings": self.strings, "version": "1.0"}
+        if canonical:
+            xcstrings_format.write_strings(self.catalog, data)
+        else:
+            with open(self.catalog, "w", encoding="utf-8") as f:
+                json.dump(data, f)
+        # A new mtime, as an editor's save would give.
+        os.utime(self.catalog, ns=(0, os.stat(self.catalog).st_mtime_ns + 1_000_000_000))
+
+    def refresh(self, memory):
+        """Refresh memory, returning the keys of the entries it indexed."""
+        indexed = []
+        original = translation_memory.index_entry
+
+        def index_entry(key, value):
+            indexed.append(key)
+            return original(key, value)
+
+        with mock.patch.object(translation_memory, "index_entry", index_entry):
+            memory.refresh([self.catalog])
+        return sorted(indexed)
+
+    def test_search_ranks_by_similarity(self):
+        memory = TranslationMemory()
+        memory.refresh([self.catalog])
+        matches = memory.search("Reasoning Effort", k=3)
+        self.assertEqual([match.key for match in matches], ["Reasoning", "Reasoning Mode", "Reasoning Budget"])
+        self.assertEqual(matches[0].translations, {"de": "Schlussfolgern"})
+        self.assertEqual(memory.search("FlowDown"), [])
+
+    def test_suggest_takes_each_language_from_the_closest_match(self):
+        memory = TranslationMemory()
+        memory.refresh([self.catalog])
+        self.assertEqual(
+            {lang: source for lang, (_, _, source) in memory.suggest("Reasoning Budgets", ["de", "ja", "fr"]).items()},
+            {"de": "Reasoning Budget", "ja": "Reasoning Budget"},
+        )
+
+    def test_only_changed_entries_are_reindexed(self):
+        memory = TranslationMemory()
+        self.assertEqual(self.refresh(memory), sorted(STRINGS))
+        self.assertEqual(self.refresh(memory), [])
+
+        self.strings["Reasoning Mode"]["localizations"]["ja"] = unit("推論モード")
+        del self.strings["Send Message"]
+        self.strings["Send Messages"] = entry("Send Messages", de="Nachrichten senden")
+        self.save()
+        self.assertEqual(self.refresh(memory), ["Reasoning Mode", "Send Messages"])
+        self.assertEqual(memory.sections, {"Localizable.xcstrings": {**index_catalog(self.catalog), "signature": mock.ANY}})
+        self.assertEqual(memory.search("Send Message", k=1)[0].key, "Send Messages")
+        self.assertEqual(memory.search("Reasoning Mode", k=1)[0].translations, {"de": "Denkmodus", "ja": "推論モード"})
+
+    def test_touched_catalog_indexes_nothing(self):
+        memory = TranslationMemory()
+        memory.refresh([self.catalog])
+        self.save()
+        self.assertEqual(self.refresh(memory), [])
+
+    def test_non_canonical_catalog_is_indexed_incrementally(self):
+        self.save(canonical=False)
+        memory = TranslationMemory()
+        self.assertEqual(self.refresh(memory), sorted(STRINGS))
+        self.strings["Reasoning"] = entry("Reasoning", de="Denken")
+        self.save(canonical=False)
+        self.assertEqual(self.refresh(memory), ["Reasoning"])
+        self.assertEqual(memory.search("Reasoning", k=1)[0].translations, {"de": "Denken"})
+
+    def test_index_survives_a_save_and_load(self):
+        path = os.path.join(self.root, "memory.marshal")
+        memory = TranslationMemory()
+        memory.refresh([self.catalog])
+        memory.save(path)
+        loaded = TranslationMemory.load(path)
+        self.assertEqual(loaded.sections, memory.sections)
+        self.assertEqual(self.refresh(loaded), [])
+        self.assertEqual(loaded.refresh([]), ["Localizable.xcstrings"])
+        self.assertEqual(loaded.sections, {})
+
+
+if __name__ == "__main__":
+    unittest.main()
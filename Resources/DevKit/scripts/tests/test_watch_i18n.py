@@ -0,0 +1,102 @@
+"""The findings socket of watch_i18n.py."""
+
+import json
+import os
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+import unittest
+
+from support import script_path
+
+import watch_i18n
+
+
+def query(socket_path, line):
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as client:
+        client.connect(socket_path)
+        client.sendall(line.encode("utf-8") + b"\n")
+        return json.loads(client.makefile("rb").readline())
+
+
+class StubWatcher:
+    def snapshot(self, key=None):
+        return {"file": "stub", "findings": {}}
+
+
+@unittest.skipUnless(hasattr(socket, "AF_UNIX"), "needs Unix sockets")
+class ServeTests(unittest.TestCase):
+    def setUp(self):
+        self.root = tempfile.mkdtemp(dir="/tmp" if os.path.isdir("/tmp") else None)
+        self.addCleanup(shutil.rmtree, self.root)
+        self.path = os.path.join(self.root, "i18n.sock")
+
+    def test_refuses_a_live_socket(self):
+        server = watch_i18n.serve(StubWatcher(), self.path)
+        with self.assertRaises(FileExistsError):
+            watch_i18n.serve(StubWatcher(), self.path)
+        self.assertEqual(query(self.path, "status")["file"], "stub")
+        watch_i18n.close(server, self.path)
+        self.assertFalse(os.path.lexists(self.path))
+
+    def test_replaces_a_stale_socket(self):
+        leftover = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        leftover.bind(self.path)
+        leftover.close()
+        server = watch_i18n.serve(StubWatcher(), self.path)
+        self.addCleanup(watch_i18n.close, server, self.path)
+        self.assertEqual(query(self.path, "status")["file"], "stub")
+
+    def test_refuses_a_path_that_is_not_a_socket(self):
+        with open(self.path, "w") as f:
+            f.write("keep me")
+        with self.assertRaises(FileExistsError):
+            watch_i18n.serve(StubWatcher(), self.path)
+        with open(self.path) as f:
+            self.assertEqual(f.read(), "keep me")
+
+    def test_close_keeps_a_socket_it_did_not_create(self):
+        server = watch_i18n.serve(StubWatcher(), self.path)
+        os.unlink(self.path)
+        other = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.addCleanup(other.close)
+        other.bind(self.path)
+        watch_i18n.close(server, self.path)
+        self.assertTrue(os.path.lexists(self.path))
+
+
+@unittest.skipUnless(hasattr(socket, "AF_UNIX"), "needs Unix sockets")
+class SecondWatcherTests(unittest.TestCase):
+    def test_second_watcher_exits_and_first_keeps_serving(self):
+        root = tempfile.mkdtemp(dir="/tmp" if os.path.isdir("/tmp") else None)
+        self.addCleanup(shutil.rmtree, root)
+        catalog = os.path.join(root, "Localizable.xcstrings")
+        with open(catalog, "w", encoding="utf-8") as f:
+            json.dump({"sourceLanguage": "en", "strings": {}, "version": "1.0"}, f)
+        path = os.path.join(root, "i18n.sock")
+        command = [sys.executable, script_path("watch_i18n.py"), catalog, "--socket", path]
+        env = dict(os.environ, FLOWDOWN_I18N_CACHE_DIR=os.path.join(root, "cache"))
+
+        first = subprocess.Popen(command, env=env, stdout=subprocess.DEVNULL)
+        self.addCleanup(first.wait)
+        self.addCleanup(first.terminate)
+        deadline = time.monotonic() + 30
+        while not os.path.exists(path):
+            self.assertLess(time.monotonic(), deadline, "watcher never opened its socket")
+            time.sleep(0.05)
+
+        second = subprocess.run(command, env=env, stdout=subprocess.PIPE, text=True, timeout=30)
+        self.assertEqual(second.returncode, 1)
+        self.assertIn("another watcher is serving", second.stdout)
+        self.assertIn("findings", query(path, "status"))
+
+        first.terminate()
+        first.wait(timeout=30)
+        self.assertFalse(os.path.exists(path))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,84 @@
+"""The columnar Catalog against the dict-based helpers."""
+
+import json
+import os
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+from support import unit
+
+from i18n_tools import (
+    audit_strings,
+    load_catalog,
+    load_strings,
+    remove_strings,
+    save_strings,
+    update_missing_translations,
+)
+from xcstrings_catalog import Catalog
+
+
+def sample():
+    return {
+        "sourceLanguage": "en",
+        "strings": {
+            "%lld files": {
+                "localizations": {
+                    "en": {"variations": {"plural": {"one": unit("%lld file"), "other": unit("%lld files")}}},
+                    "de": {"variations": {"plural": {"one": unit("%lld Datei"), "other": unit("", "new")}}},
+                }
+            },
+            "Done": {"comment": "Button", "localizations": {"en": unit("Done"), "de": unit("Fertig")}},
+            "Gone": {"extractionState": "stale", "localizations": {"en": unit("Gone")}},
+            "Open": {"localizations": {"en": unit("Open", "new"), "fr": unit(" ")}},
+            "Skip": {"shouldTranslate": False},
+        },
+        "version": "1.0",
+    }
+
+
+class CatalogTests(unittest.TestCase):
+    def test_to_data_round_trips_by_value(self):
+        catalog = Catalog.from_data(sample())
+        len(catalog)  # build the columns
+        data = catalog.to_data()
+        self.assertEqual(data, sample())
+        # Localizations are rebuilt in language order, after the other fields.
+        self.assertEqual(list(data["strings"]["Done"]), ["comment", "localizations"])
+        self.assertEqual(list(data["strings"]["Done"]["localizations"]), ["de", "en"])
+
+    def test_audit_accepts_a_catalog(self):
+        options = {"target_langs": {"de", "fr"}, "exceptions": [], "clean_stale": True}
+        catalog = Catalog.from_data(sample())
+        catalog.remove(["Done"])
+        expected = sample()
+        remove_strings(expected, ["Done"])
+        self.assertEqual(audit_strings(catalog, **options), audit_strings(expected, **options))
+
+    def test_update_and_save_match_the_dict_helpers(self):
+        root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, root)
+        cache = mock.patch.dict(os.environ, FLOWDOWN_I18N_CACHE_DIR=os.path.join(root, "cache"))
+        cache.start()
+        self.addCleanup(cache.stop)
+        new_strings = {"Open": {"de": "Öffnen"}, "Close": {"fr": "Fermer"}}
+        paths = []
+        for name, load in (("dict", load_strings), ("catalog", load_catalog)):
+            path = os.path.join(root, f"{name}.xcstrings")
+            with open(path, "w", encoding="utf-8") as f:
+                json.dump(sample(), f)
+            data = load(path)
+            counts = update_missing_translations(data, new_strings=new_strings)
+            remove_strings(data, ["Gone"])
+            self.assertTrue(save_strings(path, data))
+            paths.append((path, counts))
+        (dict_path, dict_counts), (catalog_path, catalog_counts) = paths
+        self.assertEqual(dict_counts, catalog_counts)
+        with open(dict_path, "rb") as a, open(catalog_path, "rb") as b:
+            self.assertEqual(a.read(), b.read())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,91 @@
+"""Key order of catalogs saved by xcstrings_format."""
+
+import copy
+import glob
+import json
+import os
+import shutil
+import tempfile
+import unittest
+
+from support import SCRIPTS_DIR
+
+import xcstrings_format
+from xcstrings_format import _merge_order, encode_entry, index_entries, sort_key
+
+PROJECT_ROOT = os.path.abspath(os.path.join(SCRIPTS_DIR, "..", "..", ".."))
+REPO_CATALOGS = sorted(
+    path
+    for path in glob.glob(os.path.join(PROJECT_ROOT, "*", "**", "*.xcstrings"), recursive=True)
+    if os.sep + ".build" + os.sep not in path
+)
+
+
+class MergeOrderTests(unittest.TestCase):
+    def test_new_keys_go_to_sorted_position(self):
+        existing = ["Apple", "Cherry", "item 2", "item 10"]
+        self.assertEqual(
+            _merge_order(existing, ["item 3", "Banana", "zebra"]),
+            ["Apple", "Banana", "Cherry", "item 2", "item 3", "item 10", "zebra"],
+        )
+
+    def test_unsorted_catalog_keeps_its_order_and_appends(self):
+        # FlowDown/Resources/InfoPlist.xcstrings lists keys in this order.
+        existing = ["CFBundleName", "FlowDown Model File", "NSCalendarsUsageDescription", "CFBundleDisplayName"]
+        self.assertNotEqual(existing, sorted(existing, key=sort_key))
+        self.assertEqual(
+            _merge_order(existing, ["NSCameraUsageDescription", "Alpha"]),
+            existing + ["Alpha", "NSCameraUsageDescription"],
+        )
+
+    def test_no_added_keys_returns_existing(self):
+        existing = ["b", "a"]
+        self.assertIs(_merge_order(existing, []), existing)
+
+
+@unittest.skipUnless(REPO_CATALOGS, "needs the project's catalogs")
+class RepoCatalogRoundTripTests(unittest.TestCase):
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.root)
+
+    def read(self, path):
+        with open(path, "rb") as f:
+            raw = f.read()
+        return raw, json.loads(raw)
+
+    def test_reencoding_every_entry_reproduces_the_bytes(self):
+        for path in REPO_CATALOGS:
+            with self.subTest(catalog=os.path.relpath(path, PROJECT_ROOT)):
+                raw, data = self.read(path)
+                keys, spans = index_entries(raw)
+                for key, (start, end) in zip(keys, spans):
+                    entry = data["strings"][key]
+                    self.assertEqual(encode_entry(key, entry, copy.deepcopy(entry)), raw[start:end], key)
+
+    def test_editing_every_entry_only_changes_the_edited_lines(self):
+        for path in REPO_CATALOGS:
+            with self.subTest(catalog=os.path.relpath(path, PROJECT_ROOT)):
+                raw, previous = self.read(path)
+                data = copy.deepcopy(previous)
+                edited = 0
+                for entry in data["strings"].values():
+                    for loc in (entry.get("localizations") or {}).values():
+                        unit = loc.get("stringUnit")
+                        if unit:
+                            unit["value"] += " (edited)"
+                            edited += 1
+                            break
+                target = os.path.join(self.root, os.path.basename(path))
+                xcstrings_format.write_strings(target, data, raw, previous)
+                with open(target, "rb") as f:
+                    lines = f.read().split(b"\n")
+                before = raw.split(b"\n")
+                self.assertEqual(len(lines), len(before))
+                changed = [old for old, new in zip(before, lines) if old != new]
+                self.assertEqual(len(changed), edited)
+                self.assertTrue(all(line.lstrip().startswith(b'"value" : ') for line in changed))
+
+
+if __name__ == "__main__":
+    unittest.main()
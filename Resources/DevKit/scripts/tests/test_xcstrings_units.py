@@ -0,0 +1,181 @@
+"""Walking and editing the string units nested in localizations."""
+
+import copy
+import unittest
+
+from support import unit
+
+from xcstrings_units import (
+    incomplete_reason,
+    is_unit_path,
+    is_untranslated,
+    iter_units,
+    plural_fallback,
+    set_unit_at,
+    source_text,
+    split_unit_id,
+    unit_at,
+    unit_id,
+)
+
+
+def plural(**forms):
+    return {"variations": {"plural": {name: unit(value) for name, value in forms.items()}}}
+
+
+# A device variation holding plurals, next to a substitution with its own plural.
+NESTED = {
+    "stringUnit": {"state": "translated", "value": "%#@files@ on %@"},
+    "substitutions": {
+        "files": {
+            "argNum": 1,
+            "formatSpecifier": "lld",
+            "variations": {"plural": {"one": unit("%arg file"), "other": unit("%arg files")}},
+        }
+    },
+    "variations": {
+        "device": {
+            "iphone": plural(one="%lld file on iPhone", other="%lld files on iPhone"),
+            "mac": unit("%lld files on Mac"),
+        }
+    },
+}
+
+
+class IterUnitsTests(unittest.TestCase):
+    def test_plain_unit_has_the_empty_path(self):
+        self.assertEqual(list(iter_units(unit("Done"))), [("", {"state": "translated", "value": "Done"})])
+
+    def test_nested_units_in_document_order(self):
+        self.assertEqual(
+            [(path, found["value"]) for path, found in iter_units(NESTED)],
+            [
+                ("", "%#@files@ on %@"),
+                ("device.iphone.plural.one", "%lld file on iPhone"),
+                ("device.iphone.plural.other", "%lld files on iPhone"),
+                ("device.mac", "%lld files on Mac"),
+                ("substitutions.files.plural.one", "%arg file"),
+                ("substitutions.files.plural.other", "%arg files"),
+            ],
+        )
+
+    def test_malformed_nodes_are_skipped(self):
+        loc = {"variations": {"plural": {"one": "oops", "other": unit("x")}, "device": []}, "substitutions": None}
+        self.assertEqual([path for path, _ in iter_units(loc)], ["plural.other"])
+        self.assertEqual(list(iter_units(None)), [])
+        self.assertEqual(list(iter_units({})), [])
+
+    def test_deep_nesting_does_not_recurse(self):
+        loc = unit("leaf")
+        for _ in range(2000):
+            loc = {"variations": {"device": {"mac": loc}}}
+        (path, _), = iter_units(loc)
+        self.assertEqual(path.count("device.mac"), 2000)
+
+
+class UnitAtTests(unittest.TestCase):
+    def test_finds_units_at_every_depth(self):
+        self.assertEqual(unit_at(NESTED, "")["value"], "%#@files@ on %@")
+        self.assertEqual(unit_at(NESTED, "device.iphone.plural.other")["value"], "%lld files on iPhone")
+        self.assertEqual(unit_at(NESTED, "substitutions.files.plural.one")["value"], "%arg file")
+
+    def test_missing_or_invalid_paths(self):
+        self.assertIsNone(unit_at(NESTED, "device.watch"))
+        self.assertIsNone(unit_at(NESTED, "device.iphone"))
+        self.assertIsNone(unit_at(NESTED, "substitutions.count.plural.one"))
+        self.assertIsNone(unit_at(NESTED, "device"))
+        self.assertIsNone(unit_at(None, ""))
+
+    def test_every_iterated_path_resolves(self):
+        for path, found in iter_units(NESTED):
+            self.assertIs(unit_at(NESTED, path), found)
+
+
+class SetUnitAtTests(unittest.TestCase):
+    def test_replaces_a_plain_unit(self):
+        loc = unit("Alt", "needs_review")
+        set_unit_at(loc, "", {"state": "translated", "value": "Neu"})
+        self.assertEqual(loc, unit("Neu"))
+
+    def test_sets_a_unit_inside_a_substitution_plural(self):
+        loc = copy.deepcopy(NESTED)
+        set_unit_at(loc, "substitutions.files.plural.one", {"state": "translated", "value": "%arg Datei"})
+        self.assertEqual(unit_at(loc, "substitutions.files.plural.one")["value"], "%arg Datei")
+        # Everything else, including the substitution's description, is kept.
+        self.assertEqual(loc["substitutions"]["files"]["argNum"], 1)
+        self.assertEqual(loc["substitutions"]["files"]["formatSpecifier"], "lld")
+        expected = copy.deepcopy(NESTED)
+        expected["substitutions"]["files"]["variations"]["plural"]["one"] = unit("%arg Datei")
+        self.assertEqual(loc, expected)
+
+    def test_creates_a_substitution_from_the_template(self):
+        loc = {"stringUnit": {"state": "translated", "value": "%#@files@ auf %@"}}
+        set_unit_at(loc, "substitutions.files.plural.few", {"state": "translated", "value": "%arg файла"}, NESTED)
+        self.assertEqual(
+            loc["substitutions"],
+            {
+                "files": {
+                    "argNum": 1,
+                    "formatSpecifier": "lld",
+                    "variations": {"plural": {"few": unit("%arg файла")}},
+                }
+            },
+        )
+        self.assertEqual(loc["stringUnit"]["value"], "%#@files@ auf %@")
+
+    def test_creates_nested_variations_in_an_empty_localization(self):
+        loc = {}
+        set_unit_at(loc, "device.iphone.plural.one", {"state": "translated", "value": "%lld Datei"})
+        set_unit_at(loc, "device.iphone.plural.other", {"state": "translated", "value": "%lld Dateien"})
+        self.assertEqual(loc, {"variations": {"device": {"iphone": plural(one="%lld Datei", other="%lld Dateien")}}})
+
+    def test_variations_replace_a_unit_and_back(self):
+        loc = unit("Dateien")
+        set_unit_at(loc, "plural.other", {"state": "translated", "value": "%lld Dateien"})
+        self.assertEqual(loc, plural(other="%lld Dateien"))
+        set_unit_at(loc, "", {"state": "translated", "value": "Dateien"})
+        self.assertEqual(loc, unit("Dateien"))
+
+    def test_substitutions_survive_a_new_top_level_unit(self):
+        loc = copy.deepcopy(NESTED)
+        set_unit_at(loc, "", {"state": "translated", "value": "%#@files@ auf %@"})
+        self.assertNotIn("variations", loc)
+        self.assertEqual(loc["substitutions"], NESTED["substitutions"])
+
+    def test_invalid_path_raises(self):
+        with self.assertRaises(ValueError):
+            set_unit_at({}, "plural", {"state": "translated", "value": "x"})
+
+
+class UnitHelperTests(unittest.TestCase):
+    def test_unit_ids_round_trip(self):
+        for key, path in (("Done", ""), ("%lld files", "plural.one"), ("a|==|b", "substitutions.x.plural.few")):
+            self.assertEqual(split_unit_id(unit_id(key, path)), (key, path))
+        self.assertEqual(unit_id("%lld files", "plural.one"), "%lld files|==|plural.one")
+
+    def test_unit_paths(self):
+        self.assertTrue(is_unit_path(""))
+        self.assertTrue(is_unit_path("substitutions.files.plural.one"))
+        self.assertFalse(is_unit_path("plural"))
+        self.assertFalse(is_unit_path("plural..one"))
+
+    def test_plural_fallback_and_source_text(self):
+        self.assertEqual(plural_fallback("substitutions.files.plural.few"), "substitutions.files.plural.other")
+        self.assertIsNone(plural_fallback("plural.other"))
+        self.assertIsNone(plural_fallback("device.mac"))
+        self.assertEqual(source_text(NESTED, "substitutions.files.plural.few", "key"), "%arg files")
+        self.assertEqual(source_text(NESTED, "device.watch", "key"), "%#@files@ on %@")
+        self.assertEqual(source_text(None, "", "key"), "key")
+
+    def test_completeness_of_nested_units(self):
+        self.assertIsNone(incomplete_reason(NESTED))
+        self.assertFalse(is_untranslated(NESTED))
+        loc = copy.deepcopy(NESTED)
+        set_unit_at(loc, "substitutions.files.plural.other", {"state": "new", "value": ""})
+        self.assertEqual(incomplete_reason(loc), "state: new (substitutions.files.plural.other)")
+        self.assertTrue(is_untranslated(loc))
+        self.assertEqual(incomplete_reason({"variations": {}}), "missing localization")
+
+
+if __name__ == "__main__":
+    unittest.main()
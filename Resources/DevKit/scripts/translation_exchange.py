@@ -0,0 +1,479 @@
+#!/usr/bin/env python3
+"""
+Exchange translations with vendors as CSV, TSV or XLIFF files.
+
+Files are read as a stream, with the csv module or xml.etree.iterparse, so
+the whole mapping is never held in memory. Records are merged into the
+catalog in chunks through merge_new_strings.
+
+CSV and TSV files come in two layouts, told apart by their header:
+    key,language,target[,source,comment,current]   one translation per row
+    key,de,fr,ja,...                               one column per language
+XLIFF 1.2 units are keyed by their resname or id, and XLIFF 2.0 units by
+their name or id. The target language comes from the file.
+
+Work packages for vendors are exported per language from one walk over the
+catalog: every missing, empty or non-translated unit with its English
+source, comment and current value, and an empty target to fill in. A
+filled package imports back unchanged with update_missing_i18n.py --import.
+
+Plural, device and substitution forms are exchanged unit by unit. Their
+key is written as `KEY|==|PATH`, as in Xcode's own XLIFF export, with the
+path from xcstrings_units ("%lld files|==|plural.one"), and imports back to
+that unit. A missing translation is exported with the forms of its English
+source.
+
+Usage:
+    python3 translation_exchange.py export [file] -o packages/ [--format xliff|xliff2|csv] [-j 6]
+"""
+
+import argparse
+import csv
+import os
+import sys
+import xml.etree.ElementTree as ET
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, Iterable, Iterator, List, NamedTuple, Optional, TextIO, Tuple
+from xml.sax.saxutils import escape, quoteattr
+
+import devkit_profile
+from i18n_tools import (
+    DEFAULT_KEEP_LANGUAGES,
+    UNTRANSLATED_EXCEPTIONS,
+    default_file_path,
+    load_strings,
+    merge_new_strings,
+    project_root,
+    should_translate,
+)
+from xcstrings_units import is_unit_path, iter_units, plain_unit, source_text, split_unit_id, unit_at, unit_id
+
+CHUNK_SIZE = 2000
+
+# Columns of the row-per-translation layout; any other header is a language.
+RECORD_COLUMNS = ("key", "language", "source", "comment", "current", "target")
+
+# (key or unit id, language, value)
+Record = Tuple[str, str, str]
+
+
+def file_format(path: str) -> str:
+    lowered = path.lower()
+    if lowered.endswith(".csv"):
+        return "csv"
+    if lowered.endswith(".tsv"):
+        return "tsv"
+    if lowered.endswith((".xlf", ".xliff")):
+        return "xliff"
+    raise ValueError(f"Unsupported translation file {path}; use .csv, .tsv, .xlf or .xliff")
+
+
+def read_delimited(path: str, delimiter: str = ",", language: Optional[str] = None) -> Iterator[Record]:
+    """Yield (key, language, value) from a CSV or TSV file, skipping empty cells."""
+    with open(path, "r", encoding="utf-8-sig", newline="") as f:
+        reader = csv.reader(f, delimiter=delimiter)
+        header = next(reader, None)
+        if header is None:
+            return
+        columns = {name.strip(): index for index, name in enumerate(header)}
+        if "key" not in columns:
+            raise ValueError(f"{path}: the header needs a 'key' column")
+        key_column = columns["key"]
+
+        if "target" in columns:
+            target_column = columns["target"]
+            language_column = columns.get("language")
+            if language_column is None and not language:
+                raise ValueError(f"{path}: no 'language' column; pass the language explicitly")
+            for row in reader:
+                if len(row) <= max(key_column, target_column):
+                    continue
+                lang = row[language_column] if language_column is not None and language_column < len(row) else language
+                if row[key_column] and lang and row[target_column]:
+                    yield row[key_column], lang, row[target_column]
+            return
+
+        languages = [(name, index) for name, index in columns.items() if name not in RECORD_COLUMNS and name]
+        for row in reader:
+            if key_column >= len(row) or not row[key_column]:
+                continue
+            for lang, index in languages:
+                if index < len(row) and row[index]:
+                    yield row[key_column], lang, row[index]
+
+
+def _local_name(tag: str) -> str:
+    return tag.rsplit("}", 1)[-1]
+
+
+def read_xliff(path: str, language: Optional[str] = None) -> Iterator[Record]:
+    """Yield (key, language, value) for every unit with a target in an XLIFF 1.2 or 2.0 file."""
+    target_language = language
+    for event, element in ET.iterparse(path, events=("start", "end")):
+        name = _local_name(element.tag)
+        if event == "start":
+            if name == "xliff" and element.get("trgLang"):
+                target_language = language or element.get("trgLang")
+            elif name == "file" and element.get("target-language"):
+                target_language = language or element.get("target-language")
+            continue
+
+        if name == "trans-unit":
+            key = element.get("resname") or element.get("id")
+            targets = [child for child in element if _local_name(child.tag) == "target"]
+            if element.get("translate") == "no":
+                targets = []
+        elif name == "unit":
+            key = element.get("name") or element.get("id")
+            targets = [
+                target
+                for part in element
+                if _local_name(part.tag) in ("segment", "ignorable")
+                for target in part
+                if _local_name(target.tag) == "target"
+            ]
+        else:
+            continue
+        value = "".join("".join(target.itertext()) for target in targets)
+        element.clear()
+        if not key or not value:
+            continue
+        if not target_language:
+            raise ValueError(f"{path}: no target language in the file; pass the language explicitly")
+        yield key, target_language, value
+
+
+def read_translations(path: str, language: Optional[str] = None) -> Iterator[Record]:
+    """Stream (key, language, value) records from a CSV, TSV or XLIFF file."""
+    kind = file_format(path)
+    if kind == "xliff":
+        return read_xliff(path, language)
+    return read_delimited(path, "\t" if kind == "tsv" else ",", language)
+
+
+def import_translations(
+    data: Dict[str, Any],
+    records: Iterable[Record],
+    overwrite: bool = False,
+    chunk_size: int = CHUNK_SIZE,
+) -> Dict[str, Any]:
+    """
+    Merge records into the catalog in chunks and report what happened.
+
+    An existing translated value that differs from both the English value
+    and the incoming one is a human translation; it is reported as a
+    conflict and kept unless overwrite is set. Keys missing from the
+    catalog, English records, non-translatable keys and malformed unit
+    paths are skipped.
+
+    Returns {"languages": {lang: {"applied", "unchanged", "conflicts"}},
+    "conflicts": [(unit id, lang, current, incoming)], "unknown": n,
+    "skipped": n, "applied": n}.
+    """
+    strings = data["strings"]
+    report: Dict[str, Any] = {"languages": {}, "conflicts": [], "unknown": 0, "skipped": 0, "applied": 0}
+    # key → language → unit path → value, merged as merge_new_strings path dicts
+    chunk: Dict[str, Dict[str, Dict[str, str]]] = {}
+    pending = 0
+
+    with devkit_profile.phase("import_translations"):
+        for record_id, lang, value in records:
+            devkit_profile.count("records")
+            key, path = split_unit_id(record_id)
+            entry = strings.get(key)
+            if entry is None:
+                report["unknown"] += 1
+                continue
+            if lang == "en" or not should_translate(entry) or not is_unit_path(path):
+                report["skipped"] += 1
+                continue
+            locs = entry.get("localizations") or {}
+
+            counts = report["languages"].setdefault(lang, {"applied": 0, "unchanged": 0, "conflicts": 0})
+            pending_value = chunk.get(key, {}).get(lang, {}).get(path)
+            unit = unit_at(locs.get(lang), path) or {}
+            current = pending_value if pending_value is not None else unit.get("value", "")
+            state = "translated" if pending_value is not None else unit.get("state")
+            if current == value and state == "translated":
+                counts["unchanged"] += 1
+                continue
+            if state == "translated" and current.strip() and current != source_text(locs.get("en"), path, key):
+                counts["conflicts"] += 1
+                report["conflicts"].append((unit_id(key, path), lang, current, value))
+                if not overwrite:
+                    continue
+
+            chunk.setdefault(key, {}).setdefault(lang, {})[path] = value
+            counts["applied"] += 1
+            pending += 1
+            if pending >= chunk_size:
+                report["applied"] += merge_new_strings(strings, chunk)
+                chunk, pending = {}, 0
+        if chunk:
+            report["applied"] += merge_new_strings(strings, chunk)
+    return report
+
+
+def print_import_summary(path: str, report: Dict[str, Any], overwrite: bool = False) -> None:
+    print(f"📥 Imported {path}")
+    for lang in sorted(report["languages"]):
+        counts = report["languages"][lang]
+        print(
+            f"   - {lang}: {counts['applied']} applied, {counts['unchanged']} unchanged, "
+            f"{counts['conflicts']} conflicts"
+        )
+    if report["unknown"]:
+        print(f"   - Skipped {report['unknown']} records for keys not in the catalog")
+    if report["skipped"]:
+        print(f"   - Skipped {report['skipped']} English, non-translatable or malformed records")
+    if report["conflicts"]:
+        action = "Replaced" if overwrite else "Kept"
+        print(f"⚠️ {action} {len(report['conflicts'])} existing translations that differ from the import:")
+        for key, lang, current, incoming in report["conflicts"]:
+            print(f"   - {key} [{lang}]: {current!r} → {incoming!r}")
+
+
+class WorkUnit(NamedTuple):
+    key: str
+    language: str
+    path: str
+    source: str
+    comment: str
+    current: str
+
+
+def work_units(
+    data: Dict[str, Any],
+    languages: Iterable[str] = DEFAULT_KEEP_LANGUAGES,
+    exceptions: Optional[Iterable[str]] = None,
+) -> Iterator[WorkUnit]:
+    """
+    Yield the units that need translating, in catalog order, from a single walk.
+
+    A unit needs translating when it is empty or not in the translated
+    state. A language without any units needs every unit its English
+    localization has, so a missing plural gets all of its forms. Stale and
+    non-translatable keys are skipped.
+    """
+    languages = sorted(set(languages) - {"en"})
+    exceptions = set(UNTRANSLATED_EXCEPTIONS if exceptions is None else exceptions)
+    for key, entry in data["strings"].items():
+        if key in exceptions or not should_translate(entry) or entry.get("extractionState") == "stale":
+            continue
+        locs = entry.get("localizations") or {}
+        en = locs.get("en")
+        en_unit = plain_unit(en)
+        if en_unit is not None:
+            source, english_paths = en_unit.get("value", key), [""]
+        else:
+            source = source_text(en, "", key)
+            english_paths = [path for path, _ in iter_units(en)] or [""]
+        comment = entry.get("comment", "")
+        for lang in languages:
+            loc = locs.get(lang)
+            unit = loc.get("stringUnit") if loc else None
+            if unit and len(loc) == 1:
+                current = unit.get("value", "")
+                if unit.get("state") != "translated" or not current.strip():
+                    yield WorkUnit(key, lang, "", source, comment, current)
+                continue
+            units = list(iter_units(loc))
+            if not units:
+                for path in english_paths:
+                    yield WorkUnit(key, lang, path, source_text(en, path, key), comment, "")
+                continue
+            for path, unit in units:
+                current = unit.get("value", "")
+                if unit.get("state") == "translated" and current.strip():
+                    continue
+                yield WorkUnit(key, lang, path, source_text(en, path, key), comment, current)
+
+
+def _text(value: str) -> str:
+    # Carriage returns would be normalized away by the XML parser.
+    return escape(value, {"\r": "&#13;"})
+
+
+class CsvPackage:
+    extension = "csv"
+
+    def __init__(self, f: TextIO, catalog: str, language: str) -> None:
+        self.writer = csv.writer(f)
+        self.writer.writerow(["key", "language", "source", "comment", "current", "target"])
+
+    def write(self, unit: WorkUnit) -> None:
+        self.writer.writerow([unit_id(unit.key, unit.path), unit.language, unit.source, unit.comment, unit.current, ""])
+
+    def close(self) -> None:
+        pass
+
+
+class Xliff12Package:
+    """XLIFF 1.2 as Xcode writes it: the key is the unit id; the current value is an alt-trans."""
+
+    extension = "xliff"
+
+    def __init__(self, f: TextIO, catalog: str, language: str) -> None:
+        self.f = f
+        f.write('<?xml version="1.0" encoding="UTF-8"?>\n')
+        f.write('<xliff xmlns="urn:oasis:names:tc:xliff:document:1.2" version="1.2">\n')
+        f.write(
+            f'  <file original={quoteattr(catalog)} source-language="en" '
+            f'target-language={quoteattr(language)} datatype="plaintext">\n'
+        )
+        f.write("    <body>\n")
+
+    def write(self, unit: WorkUnit) -> None:
+        f = self.f
+        f.write(f'      <trans-unit id={quoteattr(unit_id(unit.key, unit.path))} xml:space="preserve">\n')
+        f.write(f"        <source>{_text(unit.source)}</source>\n")
+        if unit.current:
+            f.write(f"        <alt-trans><target>{_text(unit.current)}</target></alt-trans>\n")
+        if unit.comment:
+            f.write(f"        <note>{_text(unit.comment)}</note>\n")
+        f.write("      </trans-unit>\n")
+
+    def close(self) -> None:
+        self.f.write("    </body>\n  </file>\n</xliff>\n")
+
+
+class Xliff20Package:
+    """XLIFF 2.0; ids must be NMTOKENs there, so the key goes in the unit name."""
+
+    extension = "xliff"
+
+    def __init__(self, f: TextIO, catalog: str, language: str) -> None:
+        self.f = f
+        self.count = 0
+        f.write('<?xml version="1.0" encoding="UTF-8"?>\n')
+        f.write(
+            '<xliff xmlns="urn:oasis:names:tc:xliff:document:2.0" version="2.0" '
+            f'srcLang="en" trgLang={quoteattr(language)}>\n'
+        )
+        f.write(f"  <file id=\"f1\" original={quoteattr(catalog)}>\n")
+
+    def write(self, unit: WorkUnit) -> None:
+        f = self.f
+        self.count += 1
+        f.write(f'    <unit id="u{self.count}" name={quoteattr(unit_id(unit.key, unit.path))} xml:space="preserve">\n')
+        if unit.comment or unit.current:
+            f.write("      <notes>")
+            if unit.comment:
+                f.write(f'<note category="comment">{_text(unit.comment)}</note>')
+            if unit.current:
+                f.write(f'<note category="current">{_text(unit.current)}</note>')
+            f.write("</notes>\n")
+        f.write(f'      <segment state="initial"><source>{_text(unit.source)}</source></segment>\n')
+        f.write("    </unit>\n")
+
+    def close(self) -> None:
+        self.f.write("  </file>\n</xliff>\n")
+
+
+PACKAGE_FORMATS = {"csv": CsvPackage, "xliff": Xliff12Package, "xliff2": Xliff20Package}
+
+
+def package_path(out_dir: str, file_path: str, language: str, package_format: str) -> str:
+    stem = os.path.splitext(os.path.basename(file_path))[0]
+    return os.path.join(out_dir, f"{stem}.{language}.{PACKAGE_FORMATS[package_format].extension}")
+
+
+def write_packages(
+    data: Dict[str, Any],
+    file_path: str,
+    out_dir: str,
+    package_format: str = "xliff",
+    languages: Iterable[str] = DEFAULT_KEEP_LANGUAGES,
+) -> Dict[str, int]:
+    """
+    Stream one package per language from a single walk; returns units per language.
+
+    A package file is only created for languages that have work.
+    """
+    package_class = PACKAGE_FORMATS[package_format]
+    catalog = os.path.relpath(file_path, project_root())
+    files: Dict[str, TextIO] = {}
+    packages: Dict[str, Any] = {}
+    counts: Dict[str, int] = {}
+    try:
+        with devkit_profile.phase("write_packages"):
+            for unit in work_units(data, languages):
+                package = packages.get(unit.language)
+                if package is None:
+                    path = package_path(out_dir, file_path, unit.language, package_format)
+                    files[unit.language] = open(path, "w", encoding="utf-8", newline="")
+                    package = packages[unit.language] = package_class(files[unit.language], catalog, unit.language)
+                package.write(unit)
+                counts[unit.language] = counts.get(unit.language, 0) + 1
+            for package in packages.values():
+                package.close()
+    finally:
+        for f in files.values():
+            f.close()
+    return counts
+
+
+def _export_languages(file_path: str, out_dir: str, package_format: str, languages: List[str]) -> Dict[str, int]:
+    return write_packages(load_strings(file_path), file_path, out_dir, package_format, languages)
+
+
+def export_packages(
+    file_path: str,
+    out_dir: str,
+    package_format: str = "xliff",
+    languages: Iterable[str] = DEFAULT_KEEP_LANGUAGES,
+    jobs: int = 1,
+) -> Dict[str, int]:
+    """
+    Write work packages for languages; returns units per language.
+
+    With jobs > 1 the languages are split over worker processes, each
+    loading the catalog through the parse cache and walking it once for its
+    share of the languages.
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    languages = sorted(set(languages) - {"en"})
+    jobs = max(1, min(jobs, len(languages)))
+    if jobs == 1:
+        return _export_languages(file_path, out_dir, package_format, languages)
+    groups = [languages[index::jobs] for index in range(jobs)]
+    counts: Dict[str, int] = {}
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        futures = [pool.submit(_export_languages, file_path, out_dir, package_format, group) for group in groups]
+        for future in futures:
+            counts.update(future.result())
+    return counts
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Exchange translation work packages with vendors.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    export_parser = commands.add_parser("export", help="Write per-language packages of units needing translation")
+    export_parser.add_argument("file", nargs="?", default=default_file_path())
+    export_parser.add_argument("-o", "--output", required=True, help="Directory for the packages")
+    export_parser.add_argument("--format", choices=sorted(PACKAGE_FORMATS), default="xliff")
+    export_parser.add_argument(
+        "--languages",
+        default=",".join(sorted(DEFAULT_KEEP_LANGUAGES)),
+        help="Comma separated target languages",
+    )
+    export_parser.add_argument("-j", "--jobs", type=int, default=1, help="Worker processes across languages")
+    devkit_profile.add_arguments(export_parser)
+    args = parser.parse_args()
+
+    if not os.path.exists(args.file):
+        print(f"❌ File not found: {args.file}")
+        return 1
+    languages = [lang.strip() for lang in args.languages.split(",") if lang.strip()]
+    counts = export_packages(args.file, args.output, args.format, languages, args.jobs)
+    if not counts:
+        print(f"✅ Nothing to translate in {args.file}")
+        return 0
+    print(f"📦 Wrote work packages for {args.file} to {args.output}")
+    for lang in sorted(counts):
+        print(f"   - {lang}: {counts[lang]} units → {package_path(args.output, args.file, lang, args.format)}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
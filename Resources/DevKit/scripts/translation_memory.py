@@ -0,0 +1,325 @@
+#!/usr/bin/env python3
+"""
+Translation memory over every string catalog in the project.
+
+English values of all translatable keys are indexed by character trigrams.
+A query only scores entries sharing trigrams with it, through the inverted
+index, and ranks them by Dice similarity, so lookups take milliseconds
+instead of comparing against every string. Matches carry the existing
+translations, which gives candidate translations for new keys.
+
+The index is kept per catalog in .build/translation-memory.marshal with a
+digest of every entry. When a catalog's size or mtime changes only the
+entries whose digest changed are decoded and re-indexed.
+
+Usage:
+    python3 translation_memory.py query "Reasoning Effort" [-k 5]
+    python3 translation_memory.py suggest "Reasoning Effort" "Reasoning Summary"
+"""
+
+import argparse
+import hashlib
+import json
+import marshal
+import os
+import re
+import sys
+import tempfile
+from collections import Counter
+from typing import Any, Callable, Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+import xcstrings_format
+from i18n_tools import (
+    DEFAULT_KEEP_LANGUAGES,
+    discover_catalogs,
+    load_strings,
+    project_root,
+    should_translate,
+)
+
+INDEX_FORMAT = 2
+DEFAULT_MIN_SCORE = 0.5
+_WHITESPACE = re.compile(r"\s+")
+
+
+class Match(NamedTuple):
+    score: float
+    catalog: str
+    key: str
+    english: str
+    translations: Dict[str, str]
+
+
+def default_index_path() -> str:
+    return os.path.join(project_root(), ".build", "translation-memory.marshal")
+
+
+def trigrams(text: str) -> set:
+    """Character trigrams of the normalized text, padded so short strings still match."""
+    normalized = " " + _WHITESPACE.sub(" ", text.lower()).strip() + " "
+    return {normalized[i : i + 3] for i in range(len(normalized) - 2)}
+
+
+def index_entry(key: str, entry: Dict[str, Any]) -> Optional[Tuple[str, Dict[str, str], int]]:
+    """(English value, translated values by language, trigram count) of an entry, None if not indexed."""
+    if not should_translate(entry):
+        return None
+    locs = entry.get("localizations") or {}
+    en = locs.get("en")
+    en_unit = en.get("stringUnit") if en else None
+    english = en_unit.get("value", key) if en_unit else key
+    if not english.strip():
+        return None
+    translations: Dict[str, str] = {}
+    for lang, loc in locs.items():
+        unit = loc.get("stringUnit")
+        if lang != "en" and unit and unit.get("state") == "translated" and unit.get("value", "").strip():
+            translations[lang] = unit["value"]
+    return english, translations, len(trigrams(english))
+
+
+def entry_digests(file_path: str) -> Tuple[Dict[str, bytes], Callable[[str], Dict[str, Any]]]:
+    """
+    Digest of every entry of the catalog at file_path, and a function decoding one entry.
+
+    A catalog in canonical layout is only scanned for the entries' byte
+    spans, so entries that are not re-indexed are never decoded. Other
+    layouts are decoded once and digested in their canonical encoding.
+    """
+    with open(file_path, "rb") as f:
+        raw = f.read()
+    index = xcstrings_format.index_entries(raw)
+    if index is None:
+        strings = load_strings(file_path)["strings"]
+        digests = {key: hashlib.sha1(xcstrings_format.encode_entry(key, entry)).digest() for key, entry in strings.items()}
+        return digests, strings.__getitem__
+
+    keys, spans = index
+    view = memoryview(raw)
+    span_of = dict(zip(keys, spans))
+
+    def decode(key: str) -> Dict[str, Any]:
+        start, end = span_of[key]
+        return json.loads(b"{" + raw[start:end] + b"}")[key]
+
+    return {key: hashlib.sha1(view[start:end]).digest() for key, (start, end) in zip(keys, spans)}, decode
+
+
+def update_section(
+    section: Dict[str, Any],
+    digests: Dict[str, bytes],
+    decode: Callable[[str], Dict[str, Any]],
+) -> int:
+    """Re-index the entries of section whose digest changed; returns how many were decoded."""
+    previous = section["digests"]
+    entries: Dict[str, Tuple[str, Dict[str, str], int]] = section["entries"]
+    postings: Dict[str, set] = section["postings"]
+    for key, digest in previous.items():
+        if digests.get(key) == digest:
+            continue
+        indexed = entries.pop(key, None)
+        if indexed is None:
+            continue
+        for gram in trigrams(indexed[0]):
+            keys = postings[gram]
+            keys.discard(key)
+            if not keys:
+                del postings[gram]
+    decoded = 0
+    for key, digest in digests.items():
+        if previous.get(key) == digest:
+            continue
+        decoded += 1
+        indexed = index_entry(key, decode(key))
+        if indexed is None:
+            continue
+        entries[key] = indexed
+        for gram in trigrams(indexed[0]):
+            postings.setdefault(gram, set()).add(key)
+    section["digests"] = digests
+    return decoded
+
+
+def index_catalog(file_path: str) -> Dict[str, Any]:
+    """Build the index section of one catalog: entry digests, indexed entries and trigram postings."""
+    section: Dict[str, Any] = {"digests": {}, "entries": {}, "postings": {}}
+    update_section(section, *entry_digests(file_path))
+    return section
+
+
+class TranslationMemory:
+    """Per-catalog trigram indexes with their catalog file signatures and entry digests."""
+
+    def __init__(self, sections: Optional[Dict[str, Dict[str, Any]]] = None) -> None:
+        self.sections: Dict[str, Dict[str, Any]] = sections or {}
+
+    @classmethod
+    def load(cls, index_path: Optional[str] = None) -> "TranslationMemory":
+        try:
+            with open(index_path or default_index_path(), "rb") as f:
+                stored = marshal.loads(f.read())
+        except (OSError, EOFError, ValueError, TypeError):
+            return cls()
+        if not isinstance(stored, dict) or stored.get("format") != INDEX_FORMAT:
+            return cls()
+        return cls(stored.get("sections") or {})
+
+    def save(self, index_path: Optional[str] = None) -> None:
+        path = index_path or default_index_path()
+        directory = os.path.dirname(path)
+        try:
+            os.makedirs(directory, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+            try:
+                with os.fdopen(fd, "wb") as f:
+                    f.write(marshal.dumps({"format": INDEX_FORMAT, "sections": self.sections}))
+                os.replace(tmp_path, path)
+            except BaseException:
+                os.unlink(tmp_path)
+                raise
+        except (OSError, ValueError):
+            pass
+
+    def refresh(self, catalogs: Iterable[str]) -> List[str]:
+        """Re-index the changed entries of catalogs that changed since they were indexed; returns their names."""
+        root = project_root()
+        seen = set()
+        updated: List[str] = []
+        for file_path in catalogs:
+            name = os.path.relpath(file_path, root)
+            seen.add(name)
+            st = os.stat(file_path)
+            signature = (st.st_size, st.st_mtime_ns)
+            section = self.sections.get(name)
+            if section is not None and tuple(section["signature"]) == signature:
+                continue
+            if section is None:
+                section = self.sections[name] = index_catalog(file_path)
+            else:
+                update_section(section, *entry_digests(file_path))
+            section["signature"] = signature
+            updated.append(name)
+        for name in set(self.sections) - seen:
+            del self.sections[name]
+            updated.append(name)
+        return updated
+
+    def search(self, text: str, k: int = 5, min_score: float = DEFAULT_MIN_SCORE) -> List[Match]:
+        """Return the k most similar English values, best first."""
+        grams = trigrams(text)
+        if not grams:
+            return []
+        matches: List[Match] = []
+        for name, section in self.sections.items():
+            postings = section["postings"]
+            shared: Counter = Counter()
+            for gram in grams:
+                keys = postings.get(gram)
+                if keys:
+                    shared.update(keys)
+            entries = section["entries"]
+            for key, common in shared.items():
+                english, translations, size = entries[key]
+                score = 2 * common / (len(grams) + size)
+                if score >= min_score:
+                    matches.append(Match(score, name, key, english, translations))
+        matches.sort(key=lambda match: (-match.score, match.catalog, match.key))
+        return matches[:k]
+
+    def suggest(
+        self,
+        text: str,
+        languages: Iterable[str] = DEFAULT_KEEP_LANGUAGES,
+        min_score: float = DEFAULT_MIN_SCORE,
+    ) -> Dict[str, Tuple[str, float, str]]:
+        """For each language, the translation of the closest match that has one: (value, score, source key)."""
+        wanted = set(languages)
+        suggestions: Dict[str, Tuple[str, float, str]] = {}
+        for match in self.search(text, k=20, min_score=min_score):
+            for lang in wanted - suggestions.keys():
+                value = match.translations.get(lang)
+                if value:
+                    suggestions[lang] = (value, match.score, match.key)
+            if len(suggestions) == len(wanted):
+                break
+        return suggestions
+
+
+def load_memory(index_path: Optional[str] = None) -> TranslationMemory:
+    """Load the persisted memory and bring it up to date with the project's catalogs."""
+    memory = TranslationMemory.load(index_path)
+    if memory.refresh(discover_catalogs()):
+        memory.save(index_path)
+    return memory
+
+
+def propose_new_strings(
+    memory: TranslationMemory,
+    keys: Iterable[str],
+    languages: Iterable[str] = DEFAULT_KEEP_LANGUAGES,
+    existing: Optional[Dict[str, Dict[str, str]]] = None,
+    min_score: float = DEFAULT_MIN_SCORE,
+) -> Dict[str, Dict[str, Tuple[str, float, str]]]:
+    """
+    Candidate NEW_STRINGS entries for keys, leaving out languages already in existing.
+
+    Returns {key: {lang: (value, score, source key)}}; candidates need a
+    human review before they go into merge_new_strings.
+    """
+    existing = existing or {}
+    proposals: Dict[str, Dict[str, Tuple[str, float, str]]] = {}
+    for key in keys:
+        missing = set(languages) - set(existing.get(key, {})) - {"en"}
+        if not missing:
+            continue
+        suggestions = memory.suggest(key, missing, min_score)
+        if suggestions:
+            proposals[key] = suggestions
+    return proposals
+
+
+def print_proposals(proposals: Dict[str, Dict[str, Tuple[str, float, str]]]) -> None:
+    """Print proposals as a NEW_STRINGS literal, with the source of each candidate."""
+    print("NEW_STRINGS = {")
+    for key, suggestions in proposals.items():
+        print(f"    {key!r}: {{")
+        for lang in sorted(suggestions):
+            value, score, source = suggestions[lang]
+            print(f"        {lang!r}: {value!r},  # {score:.2f} from {source!r}")
+        print("    },")
+    print("}")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Query the project's translation memory.")
+    parser.add_argument("--index", default=None, help="Index file (default: .build/translation-memory.marshal)")
+    parser.add_argument("--min-score", type=float, default=DEFAULT_MIN_SCORE, help="Minimum similarity (0-1)")
+    commands = parser.add_subparsers(dest="command", required=True)
+    query_parser = commands.add_parser("query", help="Show the closest existing strings")
+    query_parser.add_argument("text")
+    query_parser.add_argument("-k", type=int, default=5)
+    suggest_parser = commands.add_parser("suggest", help="Propose NEW_STRINGS entries for keys")
+    suggest_parser.add_argument("keys", nargs="+")
+    args = parser.parse_args()
+
+    memory = load_memory(args.index)
+    if args.command == "query":
+        matches = memory.search(args.text, args.k, args.min_score)
+        if not matches:
+            print(f"No strings similar to {args.text!r}")
+            return 1
+        for match in matches:
+            langs = ", ".join(sorted(match.translations)) or "no translations"
+            print(f"{match.score:.2f}  {match.english!r}  [{match.catalog}] ({langs})")
+        return 0
+
+    proposals = propose_new_strings(memory, args.keys, min_score=args.min_score)
+    if not proposals:
+        print("No candidates found")
+        return 1
+    print_proposals(proposals)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
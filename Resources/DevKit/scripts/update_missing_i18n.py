@@ -2,16 +2,28 @@
 """
 Update missing i18n translations in Localizable.xcstrings.
 This script adds missing English localizations and fixes 'new' state translations.
+With --all every catalog in the project is updated in parallel; NEW_STRINGS
+only ever go into the main Localizable.xcstrings.
+With --suggest nothing is written; NEW_STRINGS keys that lack languages get
+candidate translations from the translation memory instead.
+With --import vendor files (CSV, TSV, XLIFF 1.2/2.0) are streamed into the
+catalog; existing human translations that differ are reported as conflicts
+and kept unless --overwrite is given.
 """
 
 import sys
+from typing import Optional
 
 from i18n_tools import (
     DEFAULT_KEEP_LANGUAGES,
-    default_file_path,
+    catalog_argument_parser,
+    catalog_lock,
+    discover_catalogs,
+    is_default_catalog,
     load_strings,
     print_update_summary,
     save_strings,
+    run_catalogs,
     update_missing_translations,
 )
 
@@ -28,15 +40,90 @@ NEW_STRINGS: dict[str, dict[str, str]] = {
     },
 }
 
-if __name__ == "__main__":
-    file_path = sys.argv[1] if len(sys.argv) > 1 else default_file_path()
 
-    data = load_strings(file_path)
-    counts = update_missing_translations(
-        data,
-        new_strings=NEW_STRINGS,
-        keep_languages=DEFAULT_KEEP_LANGUAGES,
-    )
-    save_strings(file_path, data)
+def update_catalog(file_path: str, new_strings: dict[str, dict[str, str]]) -> int:
+    with catalog_lock(file_path):
+        data = load_strings(file_path)
+        counts = update_missing_translations(
+            data,
+            new_strings=new_strings,
+            keep_languages=DEFAULT_KEEP_LANGUAGES,
+        )
+        save_strings(file_path, data)
 
     print_update_summary(file_path, counts)
+    return 0
+
+
+def import_catalog(
+    file_path: str,
+    import_paths: list[str],
+    language: Optional[str] = None,
+    overwrite: bool = False,
+) -> int:
+    from translation_exchange import import_translations, print_import_summary, read_translations
+
+    with catalog_lock(file_path):
+        data = load_strings(file_path)
+        reports = []
+        for import_path in import_paths:
+            try:
+                records = read_translations(import_path, language)
+                reports.append((import_path, import_translations(data, records, overwrite)))
+            except (OSError, ValueError, SyntaxError) as e:
+                # ElementTree's ParseError is a SyntaxError.
+                print(f"❌ Could not import {import_path}: {e}")
+                return 1
+        counts = update_missing_translations(data, keep_languages=DEFAULT_KEEP_LANGUAGES)
+        counts["applied_translations"] += sum(report["applied"] for _, report in reports)
+        save_strings(file_path, data)
+
+    for import_path, report in reports:
+        print_import_summary(import_path, report, overwrite)
+    print_update_summary(file_path, counts)
+    return 0
+
+
+def suggest_new_strings(new_strings: dict[str, dict[str, str]]) -> int:
+    from translation_memory import load_memory, print_proposals, propose_new_strings
+
+    proposals = propose_new_strings(load_memory(), new_strings, existing=new_strings)
+    if not proposals:
+        print("✅ No candidates needed or found for NEW_STRINGS")
+        return 0
+    print_proposals(proposals)
+    return 0
+
+
+def update_project_catalog(file_path: str) -> int:
+    main_catalog = is_default_catalog(file_path)
+    return update_catalog(file_path, NEW_STRINGS if main_catalog else {})
+
+
+if __name__ == "__main__":
+    parser = catalog_argument_parser("Fill missing English anchors and apply NEW_STRINGS.")
+    parser.add_argument(
+        "--suggest",
+        action="store_true",
+        help="print translation memory candidates for NEW_STRINGS instead of updating",
+    )
+    parser.add_argument(
+        "--import",
+        dest="imports",
+        action="append",
+        metavar="PATH",
+        help="stream translations from a CSV, TSV or XLIFF file (repeatable)",
+    )
+    parser.add_argument("--language", help="target language for imported files that do not name one")
+    parser.add_argument("--overwrite", action="store_true", help="replace differing human translations on import")
+    args = parser.parse_args()
+
+    if args.imports:
+        if args.all:
+            parser.error("--import works on a single catalog")
+        sys.exit(import_catalog(args.file, args.imports, args.language, args.overwrite))
+    if args.suggest:
+        sys.exit(suggest_new_strings(NEW_STRINGS))
+    if args.all:
+        sys.exit(run_catalogs(update_project_catalog, discover_catalogs(), jobs=args.jobs))
+    sys.exit(update_catalog(args.file, NEW_STRINGS))
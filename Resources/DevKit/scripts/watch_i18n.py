@@ -0,0 +1,316 @@
+#!/usr/bin/env python3
+"""
+Keep a catalog in memory and re-check it whenever the file is saved.
+
+The catalog is parsed once, then polled with stat(). On a change only the
+entries whose bytes differ are decoded again and only those keys are
+re-audited, so feedback arrives in milliseconds instead of paying
+interpreter startup and a full parse per run. Each change reports the keys
+that broke and the keys that got fixed since the previous save.
+
+With --socket PATH the current findings are also served over a Unix
+socket. A client sends one line and gets one JSON document back:
+    status        every finding, grouped by key
+    key <KEY>     the findings of a single key
+A watcher refuses to start on a socket another watcher is still serving.
+
+Usage:
+    python3 watch_i18n.py [file] [--checks untranslated,placeholders] [--socket /tmp/i18n.sock]
+"""
+
+import argparse
+import json
+import os
+import signal
+import socket
+import socketserver
+import stat
+import sys
+import threading
+import time
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+import xcstrings_format
+from i18n_tools import (
+    AUDIT_CHECKS,
+    DEFAULT_KEEP_LANGUAGES,
+    UNTRANSLATED_EXCEPTIONS,
+    audit_findings,
+    audit_strings,
+    checked_languages,
+    default_file_path,
+)
+
+DEFAULT_CHECKS = ("untranslated", "placeholders")
+POLL_INTERVAL = 0.1
+
+
+def decode_catalog(
+    raw: bytes,
+    previous: Optional[Dict[str, Any]] = None,
+    previous_spans: Optional[Dict[str, bytes]] = None,
+) -> Tuple[Dict[str, Any], Optional[Dict[str, bytes]], Optional[Set[str]]]:
+    """
+    Decode raw, reusing unchanged entries of a previous decode.
+
+    Returns (data, spans, changed): spans maps each key to the bytes of its
+    entry, and changed lists the keys that are new or whose bytes differ.
+    Files not in Xcode's layout are decoded whole, with spans and changed
+    set to None.
+    """
+    index = xcstrings_format.index_entries(raw)
+    if index is None or not index[0]:
+        return json.loads(raw.decode("utf-8")), None, None
+    keys, positions = index
+
+    # Everything but the entries parses as the document with empty "strings".
+    skeleton = json.loads((raw[: positions[0][0]] + raw[positions[-1][1] :]).decode("utf-8"))
+    if previous is not None and {k: v for k, v in previous.items() if k != "strings"} != {
+        k: v for k, v in skeleton.items() if k != "strings"
+    }:
+        previous, previous_spans = None, None
+    old_strings = previous["strings"] if previous is not None else {}
+    old_spans = previous_spans or {}
+
+    strings: Dict[str, Any] = {}
+    spans: Dict[str, bytes] = {}
+    changed: Set[str] = set()
+    for key, (start, end) in zip(keys, positions):
+        chunk = raw[start:end]
+        spans[key] = chunk
+        if old_spans.get(key) == chunk and key in old_strings:
+            strings[key] = old_strings[key]
+            continue
+        strings[key] = json.loads(b"{" + chunk + b"}")[key]
+        changed.add(key)
+    skeleton["strings"] = strings
+    return skeleton, spans, changed if previous is not None else None
+
+
+class CatalogWatcher:
+    """The resident catalog and its current findings."""
+
+    def __init__(self, file_path: str, checks: List[str], **options: Any) -> None:
+        self.file_path = file_path
+        self.checks = checks
+        self.options = options
+        self.lock = threading.Lock()
+        self.data: Optional[Dict[str, Any]] = None
+        self.spans: Optional[Dict[str, bytes]] = None
+        self.languages: Optional[set] = None
+        self.findings: Dict[str, set] = {}
+        self.signature: Optional[Tuple[int, int]] = None
+        self.updated = 0.0
+
+    def poll(self) -> Optional[Tuple[Dict[str, set], Dict[str, set], float]]:
+        """Re-check the catalog if it changed; returns (broken, fixed, seconds) or None."""
+        try:
+            st = os.stat(self.file_path)
+        except OSError:
+            return None
+        signature = (st.st_size, st.st_mtime_ns)
+        if signature == self.signature:
+            return None
+
+        started = time.perf_counter()
+        try:
+            with open(self.file_path, "rb") as f:
+                raw = f.read()
+            data, spans, changed = decode_catalog(raw, self.data, self.spans)
+        except (OSError, ValueError) as e:
+            # Editors may save in several steps; try again on the next change.
+            print(f"⚠️ Could not read {self.file_path}: {e}")
+            self.signature = signature
+            return None
+
+        strings = data["strings"]
+        languages = checked_languages(strings)
+        findings = dict(self.findings)
+        if changed is None or languages != self.languages:
+            findings = audit_findings(audit_strings(data, checks=self.checks, **self.options))
+        else:
+            removed = self.data["strings"].keys() - strings.keys()
+            for key in removed | changed:
+                findings.pop(key, None)
+            if changed:
+                results = audit_strings(
+                    data,
+                    checks=self.checks,
+                    changes=dict.fromkeys(changed),
+                    languages=languages,
+                    **self.options,
+                )
+                findings.update(audit_findings(results))
+
+        broken: Dict[str, set] = {}
+        fixed: Dict[str, set] = {}
+        for key in findings.keys() | self.findings.keys():
+            new = findings.get(key, set())
+            old = self.findings.get(key, set())
+            if new - old:
+                broken[key] = new - old
+            if old - new:
+                fixed[key] = old - new
+
+        with self.lock:
+            self.data, self.spans, self.languages = data, spans, languages
+            self.findings = findings
+            self.signature = signature
+            self.updated = time.time()
+        return broken, fixed, time.perf_counter() - started
+
+    def snapshot(self, key: Optional[str] = None) -> Dict[str, Any]:
+        with self.lock:
+            keys = [key] if key is not None else sorted(self.findings)
+            return {
+                "file": self.file_path,
+                "updated": self.updated,
+                "findings": {
+                    k: [{"check": check, "detail": detail} for check, detail in sorted(self.findings.get(k, ()))]
+                    for k in keys
+                    if key is not None or self.findings.get(k)
+                },
+            }
+
+
+def _socket_in_use(socket_path: str) -> bool:
+    """Whether something accepts connections on socket_path."""
+    client = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        client.connect(socket_path)
+    except OSError:
+        return False
+    finally:
+        client.close()
+    return True
+
+
+def _identity(path: str) -> Optional[Tuple[int, int]]:
+    try:
+        st = os.lstat(path)
+    except OSError:
+        return None
+    return st.st_dev, st.st_ino
+
+
+class FindingsServer(socketserver.ThreadingUnixStreamServer):
+    daemon_threads = True
+    # (st_dev, st_ino) of the socket file this server bound
+    socket_identity: Optional[Tuple[int, int]] = None
+
+
+def serve(watcher: CatalogWatcher, socket_path: str) -> FindingsServer:
+    """
+    Answer status and key queries on a Unix socket from a background thread.
+
+    A socket left behind by a watcher that is gone is replaced; raises
+    FileExistsError when another watcher is still serving on socket_path or
+    the path is not a socket.
+    """
+
+    class Handler(socketserver.StreamRequestHandler):
+        def handle(self) -> None:
+            line = self.rfile.readline().decode("utf-8").rstrip("\r\n")
+            command, _, argument = line.partition(" ")
+            if command == "status":
+                reply: Dict[str, Any] = watcher.snapshot()
+            elif command == "key" and argument:
+                reply = watcher.snapshot(argument)
+            else:
+                reply = {"error": f"unknown command: {line!r}"}
+            self.wfile.write(json.dumps(reply, ensure_ascii=False).encode("utf-8") + b"\n")
+
+    if os.path.lexists(socket_path):
+        if not stat.S_ISSOCK(os.lstat(socket_path).st_mode):
+            raise FileExistsError(f"{socket_path} exists and is not a socket")
+        if _socket_in_use(socket_path):
+            raise FileExistsError(f"another watcher is serving on {socket_path}")
+        os.unlink(socket_path)
+    server = FindingsServer(socket_path, Handler)
+    # Remembered so close() only removes the socket this server created.
+    server.socket_identity = _identity(socket_path)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def close(server: FindingsServer, socket_path: str) -> None:
+    """Stop the server and remove its socket, unless another process has replaced it."""
+    server.shutdown()
+    server.server_close()
+    if _identity(socket_path) == server.socket_identity:
+        os.unlink(socket_path)
+
+
+def print_changes(broken: Dict[str, set], fixed: Dict[str, set], seconds: float) -> None:
+    stamp = time.strftime("%H:%M:%S")
+    if not broken and not fixed:
+        print(f"[{stamp}] No changes in findings ({seconds * 1000:.0f} ms)")
+        return
+    print(f"[{stamp}] {len(broken)} keys broken, {len(fixed)} fixed ({seconds * 1000:.0f} ms)")
+    for key in sorted(broken):
+        for check, detail in sorted(broken[key]):
+            print(f"  ❌ {key} - {check}: {detail}")
+    for key in sorted(fixed):
+        for check, detail in sorted(fixed[key]):
+            print(f"  ✅ {key} - {check}: {detail}")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Watch a catalog and report findings as it changes.")
+    parser.add_argument("file", nargs="?", default=default_file_path())
+    parser.add_argument(
+        "--checks",
+        default=",".join(DEFAULT_CHECKS),
+        help=f"Comma separated checks out of {', '.join(sorted(AUDIT_CHECKS))}",
+    )
+    parser.add_argument("--interval", type=float, default=POLL_INTERVAL, help="Seconds between stat polls")
+    parser.add_argument("--socket", metavar="PATH", help="Serve findings on this Unix socket")
+    args = parser.parse_args()
+
+    checks = [name.strip() for name in args.checks.split(",") if name.strip()]
+    unknown = [name for name in checks if name not in AUDIT_CHECKS]
+    if unknown:
+        print(f"❌ Unknown checks: {', '.join(unknown)}")
+        return 1
+    if not os.path.exists(args.file):
+        print(f"❌ File not found: {args.file}")
+        return 1
+
+    watcher = CatalogWatcher(
+        args.file,
+        checks,
+        target_langs=DEFAULT_KEEP_LANGUAGES,
+        exceptions=UNTRANSLATED_EXCEPTIONS,
+        clean_stale=True,
+    )
+    initial = watcher.poll()
+    total = sum(len(found) for found in watcher.findings.values())
+    seconds = initial[2] if initial else 0.0
+    print(f"👀 Watching {args.file}: {total} findings in {len(watcher.findings)} keys ({seconds * 1000:.0f} ms)")
+
+    # Leave through the cleanup below when stopped by a service manager too.
+    signal.signal(signal.SIGTERM, lambda *_: sys.exit(0))
+    try:
+        server = serve(watcher, args.socket) if args.socket else None
+    except FileExistsError as e:
+        print(f"❌ Can't serve findings: {e}")
+        return 1
+    if server is not None:
+        print(f"🔌 Serving findings on {args.socket}")
+    try:
+        while True:
+            time.sleep(args.interval)
+            change = watcher.poll()
+            if change is not None:
+                print_changes(*change)
+                sys.stdout.flush()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        if server is not None:
+            close(server, args.socket)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
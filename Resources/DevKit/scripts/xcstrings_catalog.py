@@ -0,0 +1,383 @@
+#!/usr/bin/env python3
+"""
+Columnar in-memory model for .xcstrings catalogs.
+
+The JSON form stores every cell as two nested dicts
+(localizations[lang]["stringUnit"]). Catalog keeps plain string units in
+per-language value and state columns instead, with interned language codes
+and states, a key to row index and a handful of per-row flags. Anything the
+columns can't hold (comments, variations, substitutions, extra unit fields)
+stays in per-row side tables, so to_data() round-trips the document by
+value: entries compare equal, though localizations come back sorted by
+language and after the entry's other fields. Checks and merges read those
+through xcstrings_units, like the dict-based helpers do. The i18n_tools
+audits and saves accept a Catalog in place of the document but go through
+to_data() to do so, which costs more than they save; the checking scripts
+therefore keep working on the document from load_strings.
+
+Columns are built lazily from the decoded document on first use.
+"""
+
+import sys
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from xcstrings_units import anchor_units, incomplete_reason, is_untranslated, set_unit_at, unit_at
+
+_intern = sys.intern
+
+
+def _plain_unit(loc: Any) -> Optional[Tuple[str, str]]:
+    """Return (value, state) when loc is exactly {"stringUnit": {state, value}}."""
+    if type(loc) is not dict or len(loc) != 1:
+        return None
+    unit = loc.get("stringUnit")
+    if type(unit) is not dict or len(unit) != 2:
+        return None
+    value = unit.get("value")
+    state = unit.get("state")
+    if type(value) is not str or type(state) is not str:
+        return None
+    return value, state
+
+
+class Catalog:
+    """
+    A string catalog stored as columns.
+
+    Row i describes keys[i]. For each language, values[lang][i] and
+    states[lang][i] hold its plain string unit, or None when the key has no
+    such unit (absent, or kept verbatim in the row's raw localizations).
+    """
+
+    __slots__ = (
+        "_data",
+        "_document",
+        "keys",
+        "index",
+        "languages",
+        "values",
+        "states",
+        "translatable",
+        "stale",
+        "fields",
+        "raw_locs",
+        "has_locs",
+    )
+
+    def __init__(self, data: Dict[str, Any]) -> None:
+        self._data: Optional[Dict[str, Any]] = data
+        self._document: Dict[str, Any] = {}
+        self.keys: List[str] = []
+        self.index: Dict[str, int] = {}
+        self.languages: List[str] = []
+        self.values: Dict[str, List[Optional[str]]] = {}
+        self.states: Dict[str, List[Optional[str]]] = {}
+        self.translatable: List[bool] = []
+        self.stale: List[bool] = []
+        self.fields: List[Optional[Dict[str, Any]]] = []
+        self.raw_locs: List[Optional[Dict[str, Any]]] = []
+        self.has_locs: List[bool] = []
+
+    @classmethod
+    def from_data(cls, data: Dict[str, Any]) -> "Catalog":
+        """Wrap a decoded document; columns are built on first access."""
+        return cls(data)
+
+    def _materialize(self) -> None:
+        data = self._data
+        if data is None:
+            return
+        self._data = None
+        self._document = {k: v for k, v in data.items() if k != "strings"}
+        for key, entry in data["strings"].items():
+            self._append_row(key, entry)
+
+    def _column(self, lang: str) -> Tuple[List[Optional[str]], List[Optional[str]]]:
+        values = self.values.get(lang)
+        if values is None:
+            lang = _intern(lang)
+            self.languages.append(lang)
+            values = self.values[lang] = [None] * len(self.keys)
+            self.states[lang] = [None] * len(self.keys)
+        return values, self.states[lang]
+
+    def _append_row(self, key: str, entry: Dict[str, Any]) -> int:
+        row = len(self.keys)
+        self.keys.append(key)
+        self.index[key] = row
+        for values in self.values.values():
+            values.append(None)
+        for states in self.states.values():
+            states.append(None)
+
+        fields = {name: value for name, value in entry.items() if name != "localizations"}
+        self.fields.append(fields or None)
+        self.translatable.append(entry.get("shouldTranslate", True) is not False)
+        self.stale.append(entry.get("extractionState") == "stale")
+        self.has_locs.append("localizations" in entry)
+
+        raw: Optional[Dict[str, Any]] = None
+        for lang, loc in (entry.get("localizations") or {}).items():
+            unit = _plain_unit(loc)
+            if unit is None:
+                if raw is None:
+                    raw = {}
+                raw[lang] = loc
+                continue
+            values, states = self._column(lang)
+            values[row] = unit[0]
+            states[row] = _intern(unit[1])
+        self.raw_locs.append(raw)
+        return row
+
+    def __len__(self) -> int:
+        self._materialize()
+        return len(self.keys)
+
+    def __contains__(self, key: object) -> bool:
+        self._materialize()
+        return key in self.index
+
+    def row(self, key: str) -> int:
+        """Return the row of key, adding an empty entry if it doesn't exist."""
+        self._materialize()
+        row = self.index.get(key)
+        if row is None:
+            row = self._append_row(key, {})
+        return row
+
+    def unit(self, row: int, lang: str) -> Optional[Dict[str, Any]]:
+        """Return the stringUnit of a cell as a dict, or None when it has none."""
+        values = self.values.get(lang)
+        if values is not None and values[row] is not None:
+            return {"state": self.states[lang][row], "value": values[row]}
+        raw = self.raw_locs[row]
+        loc = raw.get(lang) if raw else None
+        return loc.get("stringUnit") if isinstance(loc, dict) else None
+
+    def value(self, row: int, lang: str) -> str:
+        """Return the value of a cell's stringUnit, or "" when it has none."""
+        values = self.values.get(lang)
+        if values is not None and values[row] is not None:
+            return values[row]
+        unit = self.unit(row, lang)
+        return unit.get("value", "") if unit else ""
+
+    def localization(self, row: int, lang: str) -> Optional[Dict[str, Any]]:
+        """Return a cell as its JSON localization, or None when the key has none in lang."""
+        values = self.values.get(lang)
+        if values is not None and values[row] is not None:
+            return {"stringUnit": {"state": self.states[lang][row], "value": values[row]}}
+        raw = self.raw_locs[row]
+        return raw.get(lang) if raw else None
+
+    def set_localization(self, row: int, lang: str, loc: Dict[str, Any]) -> None:
+        """Replace a cell with a localization, in the columns when it is a plain unit."""
+        unit = _plain_unit(loc)
+        if unit is not None:
+            self.set_unit(row, lang, unit[0], unit[1])
+            return
+        values = self.values.get(lang)
+        if values is not None:
+            values[row] = None
+            self.states[lang][row] = None
+        if self.raw_locs[row] is None:
+            self.raw_locs[row] = {}
+        self.raw_locs[row][lang] = loc
+        self.has_locs[row] = True
+
+    def has_language(self, row: int, lang: str) -> bool:
+        values = self.values.get(lang)
+        if values is not None and values[row] is not None:
+            return True
+        raw = self.raw_locs[row]
+        return bool(raw) and lang in raw
+
+    def set_unit(self, row: int, lang: str, value: str, state: str = "translated") -> None:
+        """Replace a cell with a plain string unit."""
+        values, states = self._column(lang)
+        values[row] = value
+        states[row] = _intern(state)
+        raw = self.raw_locs[row]
+        if raw and lang in raw:
+            del raw[lang]
+        self.has_locs[row] = True
+
+    def set_translatable(self, row: int) -> None:
+        """Drop an explicit shouldTranslate=false flag."""
+        fields = self.fields[row]
+        if fields and fields.get("shouldTranslate") is False:
+            del fields["shouldTranslate"]
+        self.translatable[row] = True
+
+    def stale_keys(self) -> List[str]:
+        """Keys marked extractionState=stale, in catalog order."""
+        self._materialize()
+        return [key for key, stale in zip(self.keys, self.stale) if stale]
+
+    def remove(self, keys: Iterable[str]) -> None:
+        """Delete rows by key, compacting every column."""
+        self._materialize()
+        doomed = {self.index[key] for key in keys}
+        if not doomed:
+            return
+        keep = [row for row in range(len(self.keys)) if row not in doomed]
+
+        def compact(column: List[Any]) -> List[Any]:
+            return [column[row] for row in keep]
+
+        self.keys = compact(self.keys)
+        self.index = {key: row for row, key in enumerate(self.keys)}
+        for lang in self.languages:
+            self.values[lang] = compact(self.values[lang])
+            self.states[lang] = compact(self.states[lang])
+        self.translatable = compact(self.translatable)
+        self.stale = compact(self.stale)
+        self.fields = compact(self.fields)
+        self.raw_locs = compact(self.raw_locs)
+        self.has_locs = compact(self.has_locs)
+
+    def entry(self, row: int) -> Dict[str, Any]:
+        """Rebuild the JSON entry of a row."""
+        entry: Dict[str, Any] = dict(self.fields[row] or {})
+        if self.has_locs[row]:
+            locs: Dict[str, Any] = {}
+            for lang in self.languages:
+                value = self.values[lang][row]
+                if value is not None:
+                    locs[lang] = {"stringUnit": {"state": self.states[lang][row], "value": value}}
+            raw = self.raw_locs[row]
+            if raw:
+                locs.update(raw)
+            entry["localizations"] = {lang: locs[lang] for lang in sorted(locs)}
+        return entry
+
+    def to_data(self) -> Dict[str, Any]:
+        """Return the catalog in its JSON document form."""
+        if self._data is not None:
+            return self._data
+        data = dict(self._document)
+        data["strings"] = {key: self.entry(row) for row, key in enumerate(self.keys)}
+        return data
+
+    # Checks and merges mirroring the dict-based helpers in i18n_tools.
+
+    def find_untranslated(self, target_langs: Iterable[str], exceptions: Iterable[str]) -> List[Dict[str, Any]]:
+        self._materialize()
+        exceptions = set(exceptions)
+        columns = [(lang, self.values.get(lang)) for lang in sorted(set(target_langs))]
+        untranslated: List[Dict[str, Any]] = []
+        for row, key in enumerate(self.keys):
+            if not self.translatable[row] or key in exceptions:
+                continue
+            missing: List[str] = []
+            for lang, values in columns:
+                value = values[row] if values is not None else None
+                if value is not None:
+                    if not value.strip():
+                        missing.append(lang)
+                elif is_untranslated((self.raw_locs[row] or {}).get(lang)):
+                    missing.append(lang)
+            if missing:
+                untranslated.append({"key": key, "missing": missing})
+        return untranslated
+
+    def find_incomplete(self, clean_stale: bool = True) -> Tuple[List[str], List[Tuple[str, str, str]]]:
+        self._materialize()
+        rows = [
+            row
+            for row in range(len(self.keys))
+            if self.translatable[row] and not (clean_stale and self.stale[row])
+        ]
+
+        present = set()
+        for lang in self.languages:
+            values = self.values[lang]
+            if any(values[row] is not None for row in rows):
+                present.add(lang)
+        for row in rows:
+            if self.raw_locs[row]:
+                present.update(self.raw_locs[row])
+        languages = sorted(present)
+
+        incomplete: List[Tuple[str, str, str]] = []
+        columns = [(lang, self.values.get(lang), self.states.get(lang)) for lang in languages]
+        for row in rows:
+            key = self.keys[row]
+            for lang, values, states in columns:
+                value = values[row] if values is not None else None
+                if value is None:
+                    reason = incomplete_reason((self.raw_locs[row] or {}).get(lang))
+                    if reason is not None:
+                        incomplete.append((key, lang, reason))
+                    continue
+                state = states[row]
+                if state != "translated":
+                    incomplete.append((key, lang, f"state: {state}"))
+                elif not value.strip():
+                    incomplete.append((key, lang, "empty value"))
+        return languages, incomplete
+
+    def merge_new_strings(self, new_strings: Dict[str, Dict[str, Any]]) -> int:
+        applied = 0
+        for key, translations in new_strings.items():
+            row = self.row(key)
+            self.set_translatable(row)
+            self.has_locs[row] = True
+            if not self.has_language(row, "en"):
+                self.set_unit(row, "en", key)
+            for language, value in translations.items():
+                if isinstance(value, dict):
+                    loc = self.localization(row, language) or {}
+                    english = self.localization(row, "en")
+                    for path, text in value.items():
+                        if (unit_at(loc, path) or {}).get("value", "") != text:
+                            applied += 1
+                        set_unit_at(loc, path, {"state": "translated", "value": text}, english)
+                    self.set_localization(row, language, loc)
+                    continue
+                if self.value(row, language) != value:
+                    applied += 1
+                self.set_unit(row, language, value)
+        return applied
+
+    def update_missing_translations(self, new_strings: Dict[str, Dict[str, str]]) -> Dict[str, int]:
+        counts = {
+            "added_en": 0,
+            "fixed_en_state": 0,
+            "applied_translations": self.merge_new_strings(new_strings),
+        }
+
+        for row, key in enumerate(self.keys):
+            if not self.translatable[row]:
+                continue
+            self.has_locs[row] = True
+
+            if not self.has_language(row, "en"):
+                self.set_unit(row, "en", key)
+                counts["added_en"] += 1
+
+            en_values = self.values.get("en")
+            if en_values is None or en_values[row] is None:
+                # Variations and substitutions are fixed where they are.
+                if anchor_units(self.raw_locs[row]["en"], key):
+                    counts["fixed_en_state"] += 1
+            elif self.states["en"][row] == "new":
+                value = en_values[row]
+                self.set_unit(row, "en", value if value.strip() else key)
+                counts["fixed_en_state"] += 1
+            english_value = (self.unit(row, "en") or {}).get("value", key)
+
+            for language, translation in new_strings.get(key, {}).items():
+                if isinstance(translation, dict):
+                    continue
+                current_value = self.value(row, language).strip()
+                if current_value:
+                    if current_value == english_value and translation and translation != english_value:
+                        self.set_unit(row, language, translation)
+                        counts["applied_translations"] += 1
+                    continue
+                self.set_unit(row, language, translation)
+                counts["applied_translations"] += 1
+
+        return counts
@@ -0,0 +1,337 @@
+#!/usr/bin/env python3
+"""
+Canonical Xcode formatting for .xcstrings catalogs.
+
+Xcode writes string catalogs as two-space indented JSON with " : " between
+keys and values, no trailing newline, empty objects spread over two lines,
+and object keys in localized, case-insensitive, numeric order. This module
+reproduces that layout and saves catalogs with the smallest possible diff:
+entries that did not change are copied byte for byte from the file on disk
+and only modified or added entries are re-encoded, modified ones in the
+member order they had on disk.
+"""
+
+import hashlib
+import json
+import os
+import re
+import stat
+import tempfile
+import unicodedata
+from functools import lru_cache
+from json.decoder import scanstring
+from json.encoder import encode_basestring
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+INDENT = "  "
+WRITE_BUFFER_SIZE = 256 * 1024
+
+# Whitespace and ASCII punctuation in the order ICU's root collation uses;
+# they sort before digits, which sort before letters.
+_PUNCTUATION_ORDER = {c: i for i, c in enumerate("\t\n\v\f\r _-,;:!?.'\"()[]{}@*/\\&#%`^+<=>|~$")}
+_SORT_TOKEN = re.compile(r"[0-9]+|[^0-9]")
+
+# Members of the top-level "strings" object start a line with two indents.
+_ENTRY_START = re.compile(rb'\n    "')
+_STRINGS_MEMBER = re.compile(rb'\n  "strings" : \{')
+
+
+def sort_key(key: str) -> Tuple[Any, ...]:
+    """
+    Approximate the order Xcode uses for keys in string catalogs.
+
+    Xcode compares keys with the localized, case-insensitive, numeric
+    ordering from Foundation. Without ICU at hand this follows the root
+    collation closely enough for our catalogs: punctuation before digits,
+    digit runs by value, letters ignoring case and accents, other scripts
+    after Latin and Han ideographs last. Ties fall back to accents, case and
+    finally the raw string so the order stays total.
+    """
+    primary: List[Tuple[int, int]] = []
+    accents: List[int] = []
+    cases: List[bool] = []
+    for token in _SORT_TOKEN.findall(key):
+        if token[0] in "0123456789":
+            primary.append((2, int(token)))
+            continue
+        rank = _PUNCTUATION_ORDER.get(token)
+        if rank is not None:
+            primary.append((0, rank))
+            continue
+        decomposed = unicodedata.normalize("NFD", token)
+        base = decomposed[0]
+        if base.isascii() and base.isalpha():
+            primary.append((3, ord(base.lower())))
+            accents.append(len(decomposed) - 1)
+            cases.append(base.isupper())
+            continue
+        code = ord(token)
+        category = unicodedata.category(token)
+        if category[0] in "PSZ":
+            primary.append((1, code))
+        elif 0x3400 <= code <= 0x9FFF or 0xF900 <= code <= 0xFAFF or code >= 0x20000:
+            primary.append((5, code))
+        else:
+            primary.append((4, code))
+    return (primary, accents, cases, key)
+
+
+_member_sort_key = lru_cache(maxsize=4096)(sort_key)
+
+
+def _member_order(value: Dict[str, Any], template: Any) -> List[str]:
+    """
+    Order the members of an object being re-encoded.
+
+    template is the same object as it was on disk, if there was one. Its
+    members keep their order, since a catalog edited by hand may not be
+    sorted and re-sorting would reorder entries nobody touched; members it
+    doesn't have are merged in like new keys (see _merge_order).
+    """
+    if not isinstance(template, dict) or not template:
+        return sorted(value, key=_member_sort_key)
+    existing = [key for key in template if key in value]
+    if len(existing) == len(value):
+        return existing
+    return _merge_order(existing, [key for key in value if key not in template])
+
+
+def _encode(value: Any, level: int, out: List[str], template: Any = None) -> None:
+    if isinstance(value, dict):
+        if not value:
+            out.append("{\n\n" + INDENT * level + "}")
+            return
+        inner = "\n" + INDENT * (level + 1)
+        out.append("{")
+        first = True
+        if template is None:
+            for key in sorted(value, key=_member_sort_key):
+                out.append(inner if first else "," + inner)
+                first = False
+                out.append(encode_basestring(key))
+                out.append(" : ")
+                _encode(value[key], level + 1, out)
+        else:
+            for key in _member_order(value, template):
+                out.append(inner if first else "," + inner)
+                first = False
+                out.append(encode_basestring(key))
+                out.append(" : ")
+                _encode(value[key], level + 1, out, template.get(key) if isinstance(template, dict) else None)
+        out.append("\n" + INDENT * level + "}")
+    elif isinstance(value, list):
+        if not value:
+            out.append("[\n\n" + INDENT * level + "]")
+            return
+        inner = "\n" + INDENT * (level + 1)
+        out.append("[")
+        for index, item in enumerate(value):
+            out.append(inner if index == 0 else "," + inner)
+            _encode(item, level + 1, out)
+        out.append("\n" + INDENT * level + "]")
+    elif isinstance(value, str):
+        out.append(encode_basestring(value))
+    else:
+        out.append(json.dumps(value))
+
+
+def encode_value(value: Any, level: int = 0, template: Any = None) -> str:
+    """
+    Encode a value as Xcode would at the given nesting level.
+
+    Objects are sorted, except for members they share with template, the
+    value's previous version, which keep the order they had there.
+    """
+    out: List[str] = []
+    _encode(value, level, out, template)
+    return "".join(out)
+
+
+def encode_entry(key: str, entry: Any, template: Any = None) -> bytes:
+    """Encode one member of the "strings" object, without separators; see encode_value for template."""
+    return (INDENT * 2 + encode_basestring(key) + " : " + encode_value(entry, 2, template)).encode("utf-8")
+
+
+def index_entries(raw: bytes) -> Optional[Tuple[List[str], List[Tuple[int, int]]]]:
+    """
+    Locate the members of the top-level "strings" object in canonical bytes.
+
+    Returns (keys, spans) where each span is the (start, end) byte range of
+    `    "key" : {...}` without the separating comma, or None when the file
+    does not use the canonical layout. Only the line structure is scanned;
+    string values can't contain raw newlines, so a line starting with two
+    indents and a quote is always a member of "strings". raw may be any
+    buffer that supports slicing and re, such as an mmap.
+    """
+    header = _STRINGS_MEMBER.search(raw)
+    if header is None:
+        return None
+    body_start = header.end()
+    close = raw.find(b"\n  }", body_start)
+    if close < 0:
+        return None
+
+    keys: List[str] = []
+    spans: List[Tuple[int, int]] = []
+    position = body_start
+    while True:
+        match = _ENTRY_START.search(raw, position, close + 1)
+        if match is None:
+            break
+        start = match.start() + 1
+        line_end = raw.find(b"\n", match.end())
+        try:
+            key, _ = scanstring(raw[match.end() : line_end].decode("utf-8"), 0)
+        except (ValueError, UnicodeDecodeError):
+            return None
+        if spans:
+            spans[-1] = (spans[-1][0], start - 2)
+        keys.append(key)
+        spans.append((start, -1))
+        position = match.end()
+
+    if spans:
+        # The last entry runs up to the newline closing "strings".
+        spans[-1] = (spans[-1][0], close)
+    for start, end in spans:
+        if raw[end - 1 : end] != b"}" or (end < close and raw[end : end + 2] != b",\n"):
+            return None
+    return keys, spans
+
+
+def _merge_order(existing: List[str], added: List[str]) -> List[str]:
+    """
+    Insert new keys into the existing order at their collation position.
+
+    The binary search only means something when the existing keys are in
+    sort_key order, as Xcode leaves them. A catalog edited by hand may not
+    be; its order is kept as it is and the new keys are appended, sorted.
+    """
+    if not added:
+        return existing
+    existing_keys = [sort_key(key) for key in existing]
+    if any(existing_keys[i] > existing_keys[i + 1] for i in range(len(existing_keys) - 1)):
+        return existing + sorted(added, key=sort_key)
+
+    positions: List[Tuple[int, Tuple[Any, ...], str]] = []
+    for key in added:
+        target = sort_key(key)
+        low, high = 0, len(existing)
+        while low < high:
+            middle = (low + high) // 2
+            if existing_keys[middle] <= target:
+                low = middle + 1
+            else:
+                high = middle
+        positions.append((low, target, key))
+    positions.sort(key=lambda item: (item[0], item[1]))
+
+    order: List[str] = []
+    cursor = 0
+    for index, _, key in positions:
+        order.extend(existing[cursor:index])
+        cursor = index
+        order.append(key)
+    order.extend(existing[cursor:])
+    return order
+
+
+def _document_chunks(
+    data: Dict[str, Any],
+    order: List[str],
+    raw: Optional[bytes],
+    previous: Optional[Dict[str, Any]],
+    spans: Optional[Dict[str, Tuple[int, int]]],
+) -> Iterator[bytes]:
+    strings = data["strings"]
+    previous_strings = previous["strings"] if previous is not None else {}
+    view = memoryview(raw) if raw is not None else None
+
+    members = _member_order(data, previous)
+    yield b"{"
+    for index, member in enumerate(members):
+        yield (b"\n" if index == 0 else b",\n") + (INDENT + encode_basestring(member) + " : ").encode("utf-8")
+        if member != "strings":
+            template = previous.get(member) if previous is not None else None
+            yield encode_value(data[member], 1, template).encode("utf-8")
+            continue
+        if not order:
+            yield ("{\n\n" + INDENT + "}").encode("utf-8")
+            continue
+        yield b"{\n"
+        for position, key in enumerate(order):
+            if position:
+                yield b",\n"
+            entry = strings[key]
+            span = spans.get(key) if spans is not None else None
+            template = previous_strings.get(key)
+            if span is not None and template == entry:
+                yield view[span[0] : span[1]]
+            else:
+                yield encode_entry(key, entry, template)
+        yield ("\n" + INDENT + "}").encode("utf-8")
+    yield b"\n}"
+
+
+def write_strings(
+    file_path: str,
+    data: Dict[str, Any],
+    raw: Optional[bytes] = None,
+    previous: Optional[Dict[str, Any]] = None,
+) -> Optional[Tuple[bytes, List[str]]]:
+    """
+    Save data to file_path in canonical form with a minimal diff.
+
+    raw and previous are the current bytes of the file and their decoded
+    form, when it exists. Nothing is written if data equals previous;
+    otherwise unchanged entries are copied from raw and the document is
+    streamed through a buffered writer. Keys already on disk keep their
+    place and new keys go to their sorted position, or after them when the
+    file isn't in sorted order; the same goes for the members of rewritten
+    entries, so editing an entry doesn't reorder its fields. The document goes to a temporary file next
+    to file_path that is fsynced and renamed over it, so readers never see
+    a partial catalog. Returns the SHA-256 of the bytes written and the key
+    order used, or None when the write was skipped.
+    """
+    if previous is not None and previous == data:
+        return None
+
+    strings = data["strings"]
+    spans: Optional[Dict[str, Tuple[int, int]]] = None
+    existing: List[str] = []
+    if previous is not None:
+        previous_strings = previous["strings"]
+        if raw is not None:
+            index = index_entries(raw)
+            if index is not None and index[0] == list(previous_strings):
+                spans = dict(zip(*index))
+        existing = [key for key in previous_strings if key in strings]
+    known = set(existing)
+    order = _merge_order(existing, [key for key in strings if key not in known])
+
+    digest = hashlib.sha256()
+    directory = os.path.dirname(os.path.abspath(file_path))
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".", suffix=".xcstrings.tmp")
+    try:
+        with open(fd, "wb", buffering=WRITE_BUFFER_SIZE) as f:
+            for chunk in _document_chunks(data, order, raw, previous, spans):
+                digest.update(chunk)
+                f.write(chunk)
+            f.flush()
+            os.fsync(f.fileno())
+        os.chmod(tmp_path, _file_mode(file_path))
+        os.replace(tmp_path, file_path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+    return digest.digest(), order
+
+
+def _file_mode(file_path: str) -> int:
+    """Permissions for the rewritten file: those of the current one, else the umask default."""
+    try:
+        return stat.S_IMODE(os.stat(file_path).st_mode)
+    except OSError:
+        umask = os.umask(0)
+        os.umask(umask)
+        return 0o666 & ~umask
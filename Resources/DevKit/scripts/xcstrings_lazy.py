@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+"""
+Read-only, memory-mapped access to .xcstrings catalogs.
+
+open_strings() maps the file and locates every member of "strings" with
+xcstrings_format.index_entries, without decoding any of them. An entry is
+decoded with json.loads only when it is looked up, so showing one key or
+checking a handful of changed keys costs a scan of the line structure
+instead of building the whole document. The result is a Mapping like
+load_strings() returns; find_untranslated, find_inconsistent_keys and
+audit_strings accept it as is.
+
+Entries are decoded again on every access and nothing is cached, so a full
+traversal never holds more than one decoded entry. Files that are not in
+Xcode's canonical layout are decoded whole.
+
+Usage:
+    python3 xcstrings_lazy.py "Reasoning Effort" [more keys...] [--file path]
+"""
+
+import argparse
+import json
+import mmap
+import sys
+from typing import Any, Dict, Iterator, List, Mapping, Optional, Tuple
+
+import xcstrings_format
+from i18n_tools import default_file_path
+from xcstrings_units import iter_units
+
+
+class LazyStrings(Mapping):
+    """The "strings" object of a mapped catalog; entries decode on access."""
+
+    def __init__(self, buffer: Any, keys: List[str], spans: List[Tuple[int, int]]) -> None:
+        self._buffer = buffer
+        self._keys = keys
+        self._spans = dict(zip(keys, spans))
+
+    def __getitem__(self, key: str) -> Dict[str, Any]:
+        start, end = self._spans[key]
+        member = json.loads(b"{" + self._buffer[start:end] + b"}")
+        return member[key]
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._spans
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._keys)
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def raw(self, key: str) -> bytes:
+        """Return the undecoded bytes of an entry, `"key" : {...}`."""
+        start, end = self._spans[key]
+        return self._buffer[start:end]
+
+
+class LazyDocument(Mapping):
+    """A mapped catalog: the top-level members, with "strings" as LazyStrings."""
+
+    def __init__(self, file_path: str) -> None:
+        self.file_path = file_path
+        self._file = open(file_path, "rb")
+        self._map: Optional[mmap.mmap] = None
+        try:
+            self._members = self._index()
+        except BaseException:
+            self.close()
+            raise
+
+    def _index(self) -> Dict[str, Any]:
+        try:
+            self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            # Empty files can't be mapped; let the decoder report them.
+            return json.loads(self._file.read().decode("utf-8"))
+        index = xcstrings_format.index_entries(self._map)
+        if index is None or not index[0]:
+            return json.loads(self._map[:].decode("utf-8"))
+        keys, spans = index
+        # Everything but the entries parses as the document with empty "strings".
+        members = json.loads((self._map[: spans[0][0]] + self._map[spans[-1][1] :]).decode("utf-8"))
+        members["strings"] = LazyStrings(self._map, keys, spans)
+        return members
+
+    def __getitem__(self, name: str) -> Any:
+        return self._members[name]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._members)
+
+    def __len__(self) -> int:
+        return len(self._members)
+
+    def close(self) -> None:
+        """Release the mapping; entries can no longer be decoded afterwards."""
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+        self._file.close()
+
+    def __enter__(self) -> "LazyDocument":
+        return self
+
+    def __exit__(self, *_: Any) -> None:
+        self.close()
+
+
+def open_strings(file_path: str) -> LazyDocument:
+    """Map file_path for lazy reading; use as a context manager or call close()."""
+    return LazyDocument(file_path)
+
+
+def print_entry(key: str, entry: Dict[str, Any]) -> None:
+    print(f"🔑 {key}")
+    if entry.get("comment"):
+        print(f"   comment: {entry['comment']}")
+    if entry.get("shouldTranslate") is False:
+        print("   shouldTranslate: false")
+    for lang, loc in sorted((entry.get("localizations") or {}).items()):
+        units = list(iter_units(loc))
+        if not units:
+            print(f"   {lang:<8} {', '.join(sorted(loc))}")
+        for path, unit in units:
+            label = f"{path} " if path else ""
+            print(f"   {lang:<8} {label}[{unit.get('state')}] {unit.get('value', '')!r}")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Show keys of a catalog in every language without loading it whole.")
+    parser.add_argument("keys", nargs="+")
+    parser.add_argument("--file", default=default_file_path())
+    args = parser.parse_args()
+
+    try:
+        document = open_strings(args.file)
+    except FileNotFoundError:
+        print(f"❌ File not found: {args.file}")
+        return 1
+    except json.JSONDecodeError as e:
+        print(f"❌ JSON decode error in {args.file}: {e}")
+        return 1
+    with document:
+        strings = document["strings"]
+        missing = [key for key in args.keys if key not in strings]
+        for key in args.keys:
+            if key in strings:
+                print_entry(key, strings[key])
+    for key in missing:
+        print(f"❌ Key not found: {key!r}")
+    return 1 if missing else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
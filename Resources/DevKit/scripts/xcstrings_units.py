@@ -0,0 +1,226 @@
+#!/usr/bin/env python3
+"""
+Traversal of the string units inside .xcstrings localizations.
+
+A localization is either a plain stringUnit or a tree that ends in string
+units: plural and device variations, which can nest, and substitutions,
+which carry variations of their own next to a format stringUnit:
+
+    {"variations": {"plural": {"one": {"stringUnit": ...}, "other": ...}}}
+    {"variations": {"device": {"mac": {"variations": {"plural": ...}}}}}
+    {"stringUnit": {"value": "%#@files@"},
+     "substitutions": {"files": {"argNum": 1, "formatSpecifier": "lld",
+                                 "variations": {"plural": ...}}}}
+
+iter_units() walks that tree with an explicit stack and yields every unit
+with its path, so checks, merges and exports treat a plural like a plain
+string at a cost linear in the number of units, however deep the nesting.
+Paths are dotted (kind, name) pairs with "variations" left out: "" for the
+top-level unit, "plural.one", "device.mac.plural.other",
+"substitutions.files.plural.few". Units come in document order, which for
+catalogs in Xcode's layout is also the sorted order of their paths.
+
+Vendor files name a nested unit `KEY|==|PATH`, as Xcode's XLIFF export does.
+"""
+
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+SUBSTITUTIONS = "substitutions"
+UNIT_ID_SEPARATOR = "|==|"
+
+# Fields of a node that hold units or further nodes; the rest (argNum,
+# formatSpecifier) describe a substitution and are copied when it is created.
+_TREE_FIELDS = ("stringUnit", "variations", SUBSTITUTIONS)
+
+
+def plain_unit(loc: Any) -> Optional[Dict[str, Any]]:
+    """Return the unit when loc is nothing but a stringUnit, the common case callers short-cut."""
+    if type(loc) is not dict or len(loc) != 1:
+        return None
+    unit = loc.get("stringUnit")
+    return unit if unit and type(unit) is dict else None
+
+
+def iter_units(loc: Any) -> Iterator[Tuple[str, Dict[str, Any]]]:
+    """Yield (path, stringUnit) for every non-empty unit of a localization."""
+    stack: List[Tuple[str, Any]] = [("", loc)]
+    push = stack.append
+    while stack:
+        path, node = stack.pop()
+        if type(node) is not dict:
+            continue
+        unit = node.get("stringUnit")
+        if unit and type(unit) is dict:
+            yield path, unit
+        # Children are pushed last to first so they pop in document order,
+        # variations before substitutions.
+        prefix = f"{path}." if path else ""
+        substitutions = node.get(SUBSTITUTIONS)
+        if type(substitutions) is dict:
+            for name, child in reversed(substitutions.items()):
+                push((f"{prefix}{SUBSTITUTIONS}.{name}", child))
+        variations = node.get("variations")
+        if type(variations) is dict:
+            for kind, group in reversed(variations.items()):
+                if type(group) is dict:
+                    for name, child in reversed(group.items()):
+                        push((f"{prefix}{kind}.{name}", child))
+
+
+def _steps(path: str) -> List[Tuple[str, str]]:
+    if not is_unit_path(path):
+        raise ValueError(f"Invalid unit path: {path!r}")
+    parts = path.split(".") if path else []
+    return list(zip(parts[::2], parts[1::2]))
+
+
+def is_unit_path(path: str) -> bool:
+    """Whether path is made of (kind, name) pairs, as iter_units produces them."""
+    parts = path.split(".") if path else []
+    return len(parts) % 2 == 0 and all(parts)
+
+
+def _child(node: Any, kind: str, name: str) -> Any:
+    if not isinstance(node, dict):
+        return None
+    group = node.get(SUBSTITUTIONS) if kind == SUBSTITUTIONS else (node.get("variations") or {}).get(kind)
+    return group.get(name) if isinstance(group, dict) else None
+
+
+def unit_at(loc: Any, path: str) -> Optional[Dict[str, Any]]:
+    """Return the stringUnit at path, or None when there is none."""
+    node = loc
+    if path:
+        try:
+            steps = _steps(path)
+        except ValueError:
+            return None
+        for kind, name in steps:
+            node = _child(node, kind, name)
+    unit = node.get("stringUnit") if isinstance(node, dict) else None
+    return unit if unit and isinstance(unit, dict) else None
+
+
+def set_unit_at(loc: Dict[str, Any], path: str, unit: Dict[str, Any], template: Any = None) -> None:
+    """
+    Store unit at path in loc, creating the nodes on the way.
+
+    A node holds either a unit or variations, so whichever of the two was
+    there is replaced; substitutions are kept. New substitution nodes copy
+    their argNum and formatSpecifier from the same node in template,
+    normally the English localization.
+    """
+    node, like = loc, template
+    for kind, name in _steps(path):
+        if kind == SUBSTITUTIONS:
+            group = node.setdefault(SUBSTITUTIONS, {})
+        else:
+            node.pop("stringUnit", None)
+            group = node.setdefault("variations", {}).setdefault(kind, {})
+        like = _child(like, kind, name)
+        child = group.get(name)
+        if not isinstance(child, dict):
+            fields = like.items() if isinstance(like, dict) else ()
+            child = group[name] = {field: value for field, value in fields if field not in _TREE_FIELDS}
+        node = child
+    node.pop("variations", None)
+    node["stringUnit"] = unit
+
+
+def plural_fallback(path: str) -> Optional[str]:
+    """Return the path of the "other" form next to a plural category, if path is one."""
+    head, _, category = path.rpartition(".")
+    if category == "other" or not (head == "plural" or head.endswith(".plural")):
+        return None
+    return f"{head}.other"
+
+
+def source_unit(source: Any, path: str) -> Optional[Dict[str, Any]]:
+    """
+    Return the unit of the source localization that a unit at path translates.
+
+    That is the unit at the same path, or for a plural category the source
+    language doesn't use (such as "few"), its "other" form.
+    """
+    unit = unit_at(source, path)
+    if unit is None:
+        fallback = plural_fallback(path)
+        if fallback is not None:
+            unit = unit_at(source, fallback)
+    return unit
+
+
+def source_text(source: Any, path: str, key: str) -> str:
+    """The source text for the unit at path, falling back to the top-level unit and then the key."""
+    unit = source_unit(source, path) or unit_at(source, "")
+    return unit.get("value", key) if unit else key
+
+
+def incomplete_reason(loc: Any) -> Optional[str]:
+    """
+    Why loc is not a complete translation, or None when it is.
+
+    Reports the first unit that is not translated or has an empty value,
+    with its path for nested units, or "missing localization" when loc
+    holds no units at all.
+    """
+    unit = plain_unit(loc)
+    if unit is not None:
+        return _unit_problem(unit)
+    found = False
+    for path, unit in iter_units(loc):
+        found = True
+        reason = _unit_problem(unit)
+        if reason is not None:
+            return f"{reason} ({path})" if path else reason
+    return None if found else "missing localization"
+
+
+def _unit_problem(unit: Dict[str, Any]) -> Optional[str]:
+    state = unit.get("state")
+    if state != "translated":
+        return f"state: {state}"
+    if not unit.get("value", "").strip():
+        return "empty value"
+    return None
+
+
+def is_untranslated(loc: Any) -> bool:
+    """Whether loc has no units or any unit with an empty value."""
+    unit = plain_unit(loc)
+    if unit is not None:
+        return not unit.get("value", "").strip()
+    found = False
+    for _, unit in iter_units(loc):
+        if not unit.get("value", "").strip():
+            return True
+        found = True
+    return not found
+
+
+def anchor_units(loc: Any, key: str) -> bool:
+    """
+    Mark units in the "new" state as translated, in place; blank values get the key.
+
+    Used on English localizations, which are the source text. Returns
+    whether any unit changed.
+    """
+    changed = False
+    for _, unit in iter_units(loc):
+        if unit.get("state") == "new":
+            if not unit.get("value", "").strip():
+                unit["value"] = key
+            unit["state"] = "translated"
+            changed = True
+    return changed
+
+
+def unit_id(key: str, path: str) -> str:
+    """The id of a unit in vendor files: the key, plus the path for nested units."""
+    return f"{key}{UNIT_ID_SEPARATOR}{path}" if path else key
+
+
+def split_unit_id(identifier: str) -> Tuple[str, str]:
+    """Split a vendor unit id into (key, path)."""
+    key, separator, path = identifier.rpartition(UNIT_ID_SEPARATOR)
+    return (key, path) if separator else (identifier, "")